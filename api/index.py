@@ -1,4 +1,11 @@
-from apps.api.app.main import app
+import os
 
-# Vercel serverless handler
+# Serverless functions only serve HTTP - the scheduler and publisher run as their own roles
+os.environ.setdefault("APP_ROLE", "web")
+
+from apps.api.app.main import create_app
+
+# Vercel serverless handler - feature routers are imported on their first request
+# so a cold start only pays for the routes it actually serves
+app = create_app(lazy_routers=True)
 handler = app
@@ -0,0 +1,38 @@
+"""add media asset renditions
+
+Revision ID: 0030
+Revises: 0029
+Create Date: 2026-01-10
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = '0030'
+down_revision = '0029'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Storage key of the original plus the generated thumbnail / web / platform renditions
+    op.add_column('media_assets', sa.Column('object_key', sa.String(), nullable=True))
+    op.add_column('media_assets', sa.Column('renditions', postgresql.JSON(astext_type=sa.Text()), nullable=True))
+    op.add_column('media_assets', sa.Column('derivatives_status', sa.String(), nullable=True))
+
+    # The retry job scans for assets whose derivatives were never produced
+    op.create_index(
+        'ix_media_assets_derivatives_pending',
+        'media_assets',
+        ['created_at'],
+        postgresql_where=sa.text("derivatives_status = 'pending'"),
+        if_not_exists=True
+    )
+
+
+def downgrade():
+    op.drop_index('ix_media_assets_derivatives_pending', table_name='media_assets', if_exists=True)
+    op.drop_column('media_assets', 'derivatives_status')
+    op.drop_column('media_assets', 'renditions')
+    op.drop_column('media_assets', 'object_key')
@@ -0,0 +1,93 @@
+"""partition audit log by month
+
+Revision ID: 0031
+Revises: 0030
+Create Date: 2026-01-24
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = '0031'
+down_revision = '0030'
+branch_labels = None
+depends_on = None
+
+COLUMNS = "id, tenant_id, entity_type, entity_id, action, field, old_value, new_value, changed_by, changed_at"
+
+
+def upgrade():
+    op.execute("ALTER TABLE audit_log RENAME TO audit_log_unpartitioned")
+    op.execute("ALTER INDEX IF EXISTS audit_log_pkey RENAME TO audit_log_unpartitioned_pkey")
+
+    # The partition key has to be part of the primary key
+    op.execute("""
+        CREATE TABLE audit_log (
+            id uuid NOT NULL DEFAULT gen_random_uuid(),
+            tenant_id text,
+            entity_type text NOT NULL,
+            entity_id uuid NOT NULL,
+            action text NOT NULL,
+            field text,
+            old_value text,
+            new_value text,
+            changed_by text NOT NULL,
+            changed_at timestamptz NOT NULL DEFAULT now(),
+            PRIMARY KEY (id, changed_at)
+        ) PARTITION BY RANGE (changed_at)
+    """)
+
+    # One partition per month from the oldest row through three months ahead (the daily
+    # maintain_audit_log job keeps creating them); anything outside lands in the default partition
+    op.execute("""
+        DO $$
+        DECLARE
+            month date := date_trunc('month', coalesce(
+                (SELECT min(changed_at) FROM audit_log_unpartitioned), now()) AT TIME ZONE 'UTC')::date;
+            last_month date := (date_trunc('month', now() AT TIME ZONE 'UTC') + interval '3 months')::date;
+        BEGIN
+            WHILE month <= last_month LOOP
+                EXECUTE format(
+                    'CREATE TABLE %I PARTITION OF audit_log FOR VALUES FROM (%L) TO (%L)',
+                    'audit_log_y' || to_char(month, 'YYYY') || 'm' || to_char(month, 'MM'),
+                    month::text || ' 00:00+00',
+                    (month + interval '1 month')::date::text || ' 00:00+00'
+                );
+                month := (month + interval '1 month')::date;
+            END LOOP;
+        END $$
+    """)
+    op.execute("CREATE TABLE audit_log_default PARTITION OF audit_log DEFAULT")
+
+    op.execute(f"""
+        INSERT INTO audit_log ({COLUMNS})
+        SELECT {COLUMNS.replace('changed_at', 'coalesce(changed_at, now())')} FROM audit_log_unpartitioned
+    """)
+    op.execute("DROP TABLE audit_log_unpartitioned")
+
+    # Created on the parent, so every partition (present and future) gets them.
+    # History views filter by entity and sort by time; list_audit sorts by time alone.
+    op.create_index('ix_audit_log_entity', 'audit_log', ['entity_type', 'entity_id', 'changed_at'])
+    op.create_index('ix_audit_log_tenant_changed_at', 'audit_log', ['tenant_id', 'changed_at'])
+    op.create_index('ix_audit_log_changed_at', 'audit_log', ['changed_at'])
+
+
+def downgrade():
+    op.execute("ALTER TABLE audit_log RENAME TO audit_log_partitioned")
+    op.execute("ALTER INDEX IF EXISTS audit_log_pkey RENAME TO audit_log_partitioned_pkey")
+    op.execute("""
+        CREATE TABLE audit_log (
+            id uuid PRIMARY KEY DEFAULT gen_random_uuid(),
+            tenant_id text,
+            entity_type text NOT NULL,
+            entity_id uuid NOT NULL,
+            action text NOT NULL,
+            field text,
+            old_value text,
+            new_value text,
+            changed_by text NOT NULL,
+            changed_at timestamptz DEFAULT now()
+        )
+    """)
+    op.execute(f"INSERT INTO audit_log ({COLUMNS}) SELECT {COLUMNS} FROM audit_log_partitioned")
+    op.execute("DROP TABLE audit_log_partitioned CASCADE")
+    op.create_index('ix_audit_log_entity', 'audit_log', ['entity_type', 'entity_id', 'changed_at'])
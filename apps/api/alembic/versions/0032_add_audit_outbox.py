@@ -0,0 +1,43 @@
+"""add audit outbox
+
+Revision ID: 0032
+Revises: 0031
+Create Date: 2026-01-31
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = '0032'
+down_revision = '0031'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # AUDIT_MODE=outbox: rows written here at commit and drained into audit_log in batches.
+    # Unlogged - no WAL on the request path; crash recovery empties it.
+    op.execute("""
+        CREATE UNLOGGED TABLE IF NOT EXISTS audit_outbox (
+            seq bigserial PRIMARY KEY,
+            id uuid NOT NULL DEFAULT gen_random_uuid(),
+            tenant_id text,
+            entity_type text NOT NULL,
+            entity_id uuid NOT NULL,
+            action text NOT NULL,
+            field text,
+            old_value text,
+            new_value text,
+            changed_by text NOT NULL,
+            changed_at timestamptz NOT NULL DEFAULT now()
+        )
+    """)
+
+
+def downgrade():
+    # Move anything not yet drained before dropping the table
+    op.execute("""
+        INSERT INTO audit_log (id, tenant_id, entity_type, entity_id, action, field, old_value, new_value, changed_by, changed_at)
+        SELECT id, tenant_id, entity_type, entity_id, action, field, old_value, new_value, changed_by, changed_at
+        FROM audit_outbox
+    """)
+    op.execute("DROP TABLE IF EXISTS audit_outbox")
@@ -0,0 +1,39 @@
+"""add trigram search indexes
+
+Revision ID: 0033
+Revises: 0032
+Create Date: 2026-02-07
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = '0033'
+down_revision = '0032'
+branch_labels = None
+depends_on = None
+
+# (index, table, search document) - the documents must match app/core/search.py exactly,
+# otherwise the planner cannot use the index for `document ILIKE '%term%'`
+SEARCH_INDEXES = [
+    ('ix_jobs_search_trgm', 'jobs',
+     "address_line1 || ' ' || lot_number || ' ' || community"),
+    ('ix_service_calls_search_trgm', 'service_calls',
+     "customer_name || ' ' || address_line1 || ' ' || coalesce(phone, '')"),
+    ('ix_customers_search_trgm', 'customers',
+     "name || ' ' || coalesce(phone, '') || ' ' || coalesce(email, '') || ' ' || coalesce(address_line1, '')"),
+    ('ix_builders_search_trgm', 'builders',
+     "name"),
+    ('ix_portal_accounts_search_trgm', 'portal_accounts',
+     "login_identifier || ' ' || coalesce(account_number, '')"),
+]
+
+
+def upgrade():
+    op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    for name, table, document in SEARCH_INDEXES:
+        op.execute(f"CREATE INDEX IF NOT EXISTS {name} ON {table} USING gin (({document}) gin_trgm_ops)")
+
+
+def downgrade():
+    for name, _, _ in SEARCH_INDEXES:
+        op.execute(f"DROP INDEX IF EXISTS {name}")
@@ -0,0 +1,45 @@
+"""add partial and composite indexes for hot query shapes
+
+Revision ID: 0034
+Revises: 0033
+Create Date: 2026-02-14
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '0034'
+down_revision = '0033'
+branch_labels = None
+depends_on = None
+
+# Recommended by benchmarks/index_advisor.py (see benchmarks/reports/indexes.md): on the seeded
+# bench data each one replaces a sequential or filtered scan and is at least 1.5x faster.
+# The AutoPoster due index and the notification list indexes were measured too and left out
+# (no gain, or not picked by the planner over ix_notifications_created_at).
+# Partial predicates only match queries that state them with literal constants
+# (crud.overdue_filter and the overdue review request query inline them for that reason).
+INDEXES = [
+    # Overdue scans (api/overdue.py, core/tasks.py): only open work is indexed
+    ('ix_jobs_overdue', 'jobs', ['tenant_id', 'scheduled_end'], "status <> 'Completed'"),
+    ('ix_service_calls_overdue', 'service_calls', ['tenant_id', 'scheduled_end'], "status <> 'Completed'"),
+    ('ix_review_requests_pending', 'review_requests', ['tenant_id', 'created_at'], "status = 'pending'"),
+]
+
+
+def upgrade():
+    # CONCURRENTLY keeps the tables writable while the indexes build; it cannot run in a transaction
+    with op.get_context().autocommit_block():
+        for name, table, columns, where in INDEXES:
+            op.create_index(
+                name, table, columns,
+                postgresql_where=sa.text(where) if where else None,
+                postgresql_concurrently=True,
+                if_not_exists=True,
+            )
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        for name, table, _, _ in reversed(INDEXES):
+            op.drop_index(name, table_name=table, postgresql_concurrently=True, if_exists=True)
@@ -0,0 +1,53 @@
+"""add trigger-maintained notification unread counts
+
+Revision ID: 0035
+Revises: 0034
+Create Date: 2026-02-21
+"""
+from alembic import op
+
+from app.db.notification_counts import SYNC_FUNCTION, TRIGGERS, create_trigger
+
+# revision identifiers, used by Alembic.
+revision = '0035'
+down_revision = '0034'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # One row per recipient: (user_id, tenant_id), the nil UUID standing for tenant-wide
+    # notifications. Badge counts read a few key lookups instead of counting notifications.
+    op.execute("""
+        CREATE TABLE IF NOT EXISTS notification_unread_counts (
+            user_id uuid NOT NULL,
+            tenant_id text NOT NULL,
+            unread integer NOT NULL DEFAULT 0,
+            PRIMARY KEY (user_id, tenant_id)
+        )
+    """)
+
+    # Statement-level triggers with transition tables: one grouped upsert per statement,
+    # so marking 10,000 notifications read is a single counter write per recipient.
+    # SQL shared with models.py's create_all() path, see app/db/notification_counts.py
+    op.execute(SYNC_FUNCTION)
+    for name, event, referencing in TRIGGERS:
+        op.execute(f"DROP TRIGGER IF EXISTS {name} ON notifications")
+        op.execute(create_trigger(name, event, referencing))
+
+    # CREATE TRIGGER holds a lock that blocks notification writes until this migration
+    # commits, so the backfill cannot miss or double count a concurrent change
+    op.execute("DELETE FROM notification_unread_counts")
+    op.execute("""
+        INSERT INTO notification_unread_counts (tenant_id, user_id, unread)
+        SELECT tenant_id, coalesce(user_id, '00000000-0000-0000-0000-000000000000'), count(*)
+        FROM notifications WHERE NOT read
+        GROUP BY 1, 2
+    """)
+
+
+def downgrade():
+    for name, _, _ in reversed(TRIGGERS):
+        op.execute(f"DROP TRIGGER IF EXISTS {name} ON notifications")
+    op.execute("DROP FUNCTION IF EXISTS notification_unread_counts_sync()")
+    op.execute("DROP TABLE IF EXISTS notification_unread_counts")
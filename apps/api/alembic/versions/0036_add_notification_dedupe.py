@@ -0,0 +1,66 @@
+"""add notification dedupe keys and digest counts
+
+Revision ID: 0036
+Revises: 0035
+Create Date: 2026-02-28
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '0036'
+down_revision = '0035'
+branch_labels = None
+depends_on = None
+
+# Must match core/notifications.py dedupe_key()
+DEDUPE_KEY = (
+    "type || ':' || coalesce(entity_type, '') || ':' || entity_id::text || ':' || tenant_id"
+    " || ':' || coalesce(user_id::text, '*')"
+)
+
+
+def upgrade():
+    op.add_column('notifications', sa.Column('dedupe_key', sa.Text(), nullable=True))
+    op.add_column('notifications', sa.Column('occurrences', sa.Integer(), nullable=False, server_default='1'))
+    op.add_column('notifications', sa.Column('first_occurred_at', sa.DateTime(timezone=True), server_default=sa.text('now()')))
+
+    # Compact the history: one digest row per alert, the latest occurrence, carrying the count.
+    # It stays unread if any of its occurrences was; the unread counters follow via triggers (0035).
+    op.execute(f"""
+        WITH alerts AS (
+            SELECT id, {DEDUPE_KEY} AS key,
+                   row_number() OVER w AS rank,
+                   count(*) OVER (PARTITION BY {DEDUPE_KEY}) AS occurrences,
+                   bool_and(read) OVER (PARTITION BY {DEDUPE_KEY}) AS all_read,
+                   min(created_at) OVER (PARTITION BY {DEDUPE_KEY}) AS first_occurred_at
+            FROM notifications
+            WHERE entity_id IS NOT NULL
+            WINDOW w AS (PARTITION BY {DEDUPE_KEY} ORDER BY created_at DESC, id)
+        )
+        UPDATE notifications n
+        SET dedupe_key = alerts.key, occurrences = alerts.occurrences,
+            read = alerts.all_read, first_occurred_at = alerts.first_occurred_at
+        FROM alerts
+        WHERE n.id = alerts.id AND alerts.rank = 1
+    """)
+    op.execute("DELETE FROM notifications WHERE entity_id IS NOT NULL AND dedupe_key IS NULL")
+    op.execute("UPDATE notifications SET first_occurred_at = created_at WHERE entity_id IS NULL")
+
+    op.create_index(
+        'uq_notifications_dedupe_key', 'notifications', ['dedupe_key'],
+        unique=True, postgresql_where=sa.text('dedupe_key IS NOT NULL'), if_not_exists=True
+    )
+    # Retention purge (maintain_notifications): read notifications by age
+    op.create_index(
+        'ix_notifications_read_purge', 'notifications', ['created_at'],
+        postgresql_where=sa.text('read'), if_not_exists=True
+    )
+
+
+def downgrade():
+    op.drop_index('ix_notifications_read_purge', table_name='notifications', if_exists=True)
+    op.drop_index('uq_notifications_dedupe_key', table_name='notifications', if_exists=True)
+    op.drop_column('notifications', 'first_occurred_at')
+    op.drop_column('notifications', 'occurrences')
+    op.drop_column('notifications', 'dedupe_key')
@@ -0,0 +1,31 @@
+"""add rate limit counters
+
+Revision ID: 0037
+Revises: 0036
+Create Date: 2026-03-07
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = '0037'
+down_revision = '0036'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # RATE_LIMIT_BACKEND=postgres: sliding-window counters shared by every worker and replica.
+    # Unlogged - a write per request without WAL; a crash only resets the windows.
+    op.execute("""
+        CREATE UNLOGGED TABLE IF NOT EXISTS rate_limit_counters (
+            key text NOT NULL,
+            window_start bigint NOT NULL,
+            hits integer NOT NULL DEFAULT 0,
+            expires_at bigint NOT NULL,
+            PRIMARY KEY (key, window_start)
+        )
+    """)
+
+
+def downgrade():
+    op.execute("DROP TABLE IF EXISTS rate_limit_counters")
@@ -8,6 +8,8 @@ from uuid import UUID
 from .. import crud, models
 from ..schemas import CustomerCreate, CustomerUpdate, CustomerOut, CustomerWithServiceCalls, ServiceCallOut
 from ..core.auth import get_current_user, CurrentUser
+from ..core import query_profiles
+from ..core.responses import FastJSONResponse
 from ..db.session import get_session
 
 router = APIRouter(prefix="/customers", tags=["customers"])
@@ -23,7 +25,7 @@ async def list_customers(
 ):
     """List all customers for a tenant with optional search"""
     customers = await crud.list_customers(db, tenant_id=tenant_id, search=search, limit=limit, offset=offset)
-    return customers
+    return FastJSONResponse(customers)
 
 @router.get("/{customer_id}", response_model=dict)
 async def get_customer(
@@ -33,7 +35,7 @@ async def get_customer(
     current_user: CurrentUser = Depends(get_current_user)
 ):
     """Get customer details with optional service calls"""
-    customer = await crud.get_customer(db, customer_id)
+    customer = await crud.get_customer(db, customer_id, include_service_calls=include_service_calls)
     if not customer:
         raise HTTPException(status_code=404, detail="Customer not found")
     
@@ -169,7 +171,7 @@ async def get_customer_service_calls(
         limit=1000
     )
     
-    return service_calls
+    return query_profiles.serialize('service_call', 'list', service_calls)
 
 @router.post("/merge", response_model=CustomerOut)
 async def merge_customers(
@@ -1,13 +1,13 @@
 """
 Marketing module endpoints for content management and social media posting
 """
-from fastapi import APIRouter, Depends, HTTPException, status, Query, UploadFile, File
+from fastapi import APIRouter, Depends, HTTPException, status, Query, UploadFile, File, BackgroundTasks, Request, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, and_, or_, func
 from sqlalchemy.orm import selectinload, joinedload
 from sqlalchemy.exc import IntegrityError
 from typing import Optional, List, Dict, Any
-from uuid import UUID
+from uuid import UUID, uuid4
 from datetime import datetime, timezone, timedelta, date
 import os
 
@@ -17,6 +17,8 @@ from .. import schemas_marketing
 from ..core.auth import get_current_user, CurrentUser
 from ..core.tenant_config import validate_tenant_feature, TenantFeature
 from .. import crud
+from ..core import cache, http_cache
+from ..core.responses import FastJSONResponse
 
 router = APIRouter(prefix="/marketing", tags=["marketing"])
 
@@ -141,17 +143,31 @@ DEFAULT_CHANNELS = [
 ]
 
 
+# Channels only change when seeded: cache snapshots sorted by display name (see core/cache.py)
+channel_cache: cache.Cache[str, List[schemas_marketing.MarketingChannel]] = cache.register('marketing_channels', maxsize=1)
+
+
+async def load_channels(db: AsyncSession) -> List[schemas_marketing.MarketingChannel]:
+    """All marketing channels by display name, from the cache when possible"""
+    async def load():
+        result = await db.execute(select(models.MarketingChannel).order_by(models.MarketingChannel.display_name))
+        # An empty table is not cached, so seeding from another process shows up at once
+        return [schemas_marketing.MarketingChannel.model_validate(c) for c in result.scalars()] or None
+
+    return await channel_cache.get_or_load('all', load) or []
+
+
 async def ensure_channels_seeded(db: AsyncSession):
     """Ensure default marketing channels exist in database"""
-    result = await db.execute(select(models.MarketingChannel))
-    existing = result.scalars().all()
-    
-    if len(existing) == 0:
-        # No channels exist, seed them
-        for channel_data in DEFAULT_CHANNELS:
-            channel = models.MarketingChannel(**channel_data)
-            db.add(channel)
-        await db.commit()
+    if await load_channels(db):
+        return
+    
+    # No channels exist, seed them
+    for channel_data in DEFAULT_CHANNELS:
+        channel = models.MarketingChannel(**channel_data)
+        db.add(channel)
+    await cache.invalidate(db, 'marketing_channels')
+    await db.commit()
 
 
 # Optional seed secret: if set, callers must provide it as ?secret=... to the seed endpoint.
@@ -160,15 +176,21 @@ _MARKETING_SEED_SECRET = os.getenv("MARKETING_SEED_SECRET")
 
 @router.get("/channels", response_model=List[schemas_marketing.MarketingChannel])
 async def list_channels(
+    request: Request,
+    response: Response,
     db: AsyncSession = Depends(get_session),
     current_user: CurrentUser = Depends(get_current_user)
 ):
-    """List all available marketing channels"""
-    # Auto-seed channels if none exist
-    await ensure_channels_seeded(db)
+    """List all available marketing channels (ETag / 304 - see core/http_cache.py)"""
+    version = await http_cache.table_version(db, models.MarketingChannel)
+    if version.count == 0:
+        # Auto-seed channels if none exist
+        await ensure_channels_seeded(db)
+        version = await http_cache.table_version(db, models.MarketingChannel)
+    if cached := http_cache.not_modified(request, response, version, http_cache.PRIVATE_SHORT):
+        return cached
     
-    result = await db.execute(select(models.MarketingChannel).order_by(models.MarketingChannel.display_name))
-    return result.scalars().all()
+    return await load_channels(db)
 
 
 @router.post("/seed-channels", response_model=List[schemas_marketing.MarketingChannel])
@@ -187,8 +209,7 @@ async def seed_channels(
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Invalid seed secret")
 
     await ensure_channels_seeded(db)
-    result = await db.execute(select(models.MarketingChannel).order_by(models.MarketingChannel.display_name))
-    return result.scalars().all()
+    return await load_channels(db)
 
 
 # Channel Accounts
@@ -541,57 +562,87 @@ async def create_post_instances_bulk(
 ):
     """Create multiple post instances from a content item"""
     validate_tenant_feature(tenant_id, TenantFeature.MARKETING)
-    # Verify content item exists
+    # Verify content item exists (media assets loaded for the response)
     content_result = await db.execute(
-        select(models.ContentItem).where(models.ContentItem.id == request.content_item_id)
+        select(models.ContentItem)
+        .where(models.ContentItem.id == request.content_item_id)
+        .options(selectinload(models.ContentItem.media_assets))
     )
     content_item = content_result.scalar_one_or_none()
     if not content_item:
         raise HTTPException(status_code=404, detail="Content item not found")
     validate_tenant_feature(content_item.tenant_id, TenantFeature.MARKETING)
     
-    instances = []
-    for channel_account_id in request.channel_account_ids:
-        # Verify channel account exists
-        account_result = await db.execute(
-            select(models.ChannelAccount).where(models.ChannelAccount.id == channel_account_id)
-        )
-        account = account_result.scalar_one_or_none()
-        if not account:
-            raise HTTPException(status_code=404, detail=f"Channel account {channel_account_id} not found")
-        
-        instance = models.PostInstance(
-            tenant_id=tenant_id,
-            content_item_id=request.content_item_id,
-            channel_account_id=channel_account_id,
-            scheduled_for=request.scheduled_for,
-            status='Scheduled' if request.scheduled_for else 'Draft'
-        )
-        db.add(instance)
-        instances.append(instance)
+    # Preserve request order, ignore repeated account IDs
+    channel_account_ids = list(dict.fromkeys(request.channel_account_ids))
+    if not channel_account_ids:
+        return []
     
-    await db.flush()
-    
-    # Audit log for each instance
-    for instance in instances:
-        await crud.write_audit(
-            db, None, 'post_instance', instance.id, 'create', current_user.username
+    # Verify all channel accounts exist in a single query
+    accounts_result = await db.execute(
+        select(models.ChannelAccount).where(models.ChannelAccount.id.in_(channel_account_ids))
+    )
+    accounts = {acc.id: acc for acc in accounts_result.scalars().all()}
+    missing_accounts = [aid for aid in channel_account_ids if aid not in accounts]
+    if missing_accounts:
+        raise HTTPException(
+            status_code=404,
+            detail=f"Channel accounts not found: {', '.join(str(aid) for aid in missing_accounts)}"
         )
     
-    await db.commit()
-    # Re-query all instances with relationships after commit
-    instance_ids = [inst.id for inst in instances]
-    result = await db.execute(
-        select(models.PostInstance)
-        .where(models.PostInstance.id.in_(instance_ids))
-        .options(
-            joinedload(models.PostInstance.content_item), 
-            joinedload(models.PostInstance.channel_account)
+    # Insert all instances with one INSERT ... RETURNING
+    instance_status = 'Scheduled' if request.scheduled_for else 'Draft'
+    post_instances = models.PostInstance.__table__
+    try:
+        result = await db.execute(
+            post_instances.insert()
+            .values([
+                {
+                    'id': uuid4(),
+                    'tenant_id': tenant_id,
+                    'content_item_id': request.content_item_id,
+                    'channel_account_id': channel_account_id,
+                    'scheduled_for': request.scheduled_for,
+                    'status': instance_status,
+                    'posted_manually': False,
+                    'autopost_enabled': False,
+                }
+                for channel_account_id in channel_account_ids
+            ])
+            .returning(*post_instances.c)
         )
-    )
-    loaded_instances = result.unique().scalars().all()
-    # Explicitly serialize while still in async session context
-    return [schemas_marketing.PostInstance.model_validate(instance) for instance in loaded_instances]
+        rows = result.mappings().all()
+        
+        # Audit log for all instances in one multi-row insert
+        await crud.write_audit_many(db, [
+            {
+                'entity_type': 'post_instance',
+                'entity_id': row['id'],
+                'action': 'create',
+                'changed_by': current_user.username,
+            }
+            for row in rows
+        ])
+        
+        await db.commit()
+    except IntegrityError:
+        await db.rollback()
+        raise HTTPException(
+            status_code=400,
+            detail="A post is already scheduled for one of these channel accounts at this time"
+        )
+    
+    # Build the response from the returned rows - no re-query needed
+    content_item_out = schemas_marketing.ContentItem.model_validate(content_item)
+    accounts_out = {aid: schemas_marketing.ChannelAccount.model_validate(acc) for aid, acc in accounts.items()}
+    return [
+        schemas_marketing.PostInstance.model_validate({
+            **row,
+            'content_item': content_item_out,
+            'channel_account': accounts_out[row['channel_account_id']],
+        })
+        for row in rows
+    ]
 
 
 @router.get("/post-instances/{instance_id}", response_model=schemas_marketing.PostInstance)
@@ -870,14 +921,15 @@ async def get_calendar_view(
                 continue
     
     # Return format: if include_unscheduled, return both scheduled and unscheduled
+    # Encoded straight from the validated models with orjson (core/responses.py)
     if include_unscheduled:
-        return {
+        return FastJSONResponse({
             "scheduled": calendar,
             "unscheduled": unscheduled
-        }
+        })
     else:
         # Backward compatibility: return just calendar dict if unscheduled not requested
-        return calendar
+        return FastJSONResponse(calendar)
 
 
 # Content Suggestions
@@ -970,6 +1022,7 @@ async def get_system_health(
 
 @router.post("/media/upload", response_model=schemas_marketing.MediaAsset, status_code=status.HTTP_201_CREATED)
 async def upload_media(
+    background_tasks: BackgroundTasks,
     file: UploadFile = File(...),
     tenant_id: str = Query(..., description="Tenant ID"),
     content_item_id: Optional[UUID] = Query(None, description="Optional content item ID to attach to"),
@@ -977,39 +1030,29 @@ async def upload_media(
     db: AsyncSession = Depends(get_session),
     current_user: CurrentUser = Depends(get_current_user)
 ):
-    """Upload a media file to S3/R2 storage"""
+    """Upload a media file to S3/R2 storage (thumbnails and renditions are generated in the background)"""
     try:
-        from ..core.storage import upload_file, validate_file
-        
-        # Read file content
-        file_content = await file.read()
+        from ..core.storage import upload_stream, get_media_file_type, build_object_key
+        from ..core.media_derivatives import needs_derivatives, generate_media_derivatives
         
-        # Determine file type from mime type
+        # Determine file type from mime type (or extension)
         mime_type = file.content_type
-        if mime_type and mime_type.startswith('image/'):
-            file_type = 'image'
-        elif mime_type and mime_type.startswith('video/'):
-            file_type = 'video'
-        else:
-            # Try to infer from extension
-            file_ext = os.path.splitext(file.filename)[1].lower()
-            if file_ext in ['.jpg', '.jpeg', '.png', '.gif', '.webp']:
-                file_type = 'image'
-            elif file_ext in ['.mp4', '.mov', '.avi']:
-                file_type = 'video'
-            else:
-                raise HTTPException(
-                    status_code=400,
-                    detail="Unsupported file type. Only images and videos are allowed."
-                )
+        file_type = get_media_file_type(mime_type, file.filename)
+        if not file_type:
+            raise HTTPException(
+                status_code=400,
+                detail="Unsupported file type. Only images and videos are allowed."
+            )
         
-        # Upload to storage
-        file_url = upload_file(
-            file_content=file_content,
+        # Stream the spooled upload to storage off the event loop (never read fully into memory)
+        object_key = build_object_key(file.filename, tenant_id, folder="media")
+        file_url, file_size = await upload_stream(
+            file.file,
             file_name=file.filename,
             tenant_id=tenant_id,
             folder="media",
-            mime_type=mime_type
+            mime_type=mime_type,
+            object_key=object_key
         )
         
         # Parse intent tags from comma-separated string
@@ -1024,9 +1067,11 @@ async def upload_media(
             file_name=file.filename,
             file_url=file_url,
             file_type=file_type,
-            file_size=len(file_content),
+            file_size=file_size,
             mime_type=mime_type,
-            intent_tags=tags_list
+            intent_tags=tags_list,
+            object_key=object_key,
+            derivatives_status='pending' if needs_derivatives(mime_type, object_key) else 'skipped'
         )
         db.add(media_asset)
         await db.flush()
@@ -1038,8 +1083,12 @@ async def upload_media(
         
         await db.commit()
         await db.refresh(media_asset)
+        if media_asset.derivatives_status == 'pending':
+            background_tasks.add_task(generate_media_derivatives, media_asset.id)
         return media_asset
     
+    except HTTPException:
+        raise
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
@@ -1047,6 +1096,87 @@ async def upload_media(
             status_code=500,
             detail=f"Failed to upload media: {str(e)}"
         )
+    finally:
+        await file.close()
+
+
+@router.post("/media/upload-url", response_model=schemas_marketing.UploadSlot)
+async def create_media_upload_url(
+    request: schemas_marketing.MediaUploadSlotRequest,
+    current_user: CurrentUser = Depends(get_current_user)
+):
+    """Get a presigned URL to upload a media file directly to S3/R2 (confirm with /media/confirm)"""
+    from ..core.storage import create_upload_slot, get_media_file_type
+    
+    if not get_media_file_type(request.mime_type, request.file_name):
+        raise HTTPException(
+            status_code=400,
+            detail="Unsupported file type. Only images and videos are allowed."
+        )
+    
+    try:
+        slot = create_upload_slot(
+            file_name=request.file_name,
+            tenant_id=request.tenant_id,
+            folder="media",
+            mime_type=request.mime_type,
+            file_size=request.file_size
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return slot
+
+
+@router.post("/media/confirm", response_model=schemas_marketing.MediaAsset, status_code=status.HTTP_201_CREATED)
+async def confirm_media_upload(
+    request: schemas_marketing.MediaUploadConfirm,
+    background_tasks: BackgroundTasks,
+    db: AsyncSession = Depends(get_session),
+    current_user: CurrentUser = Depends(get_current_user)
+):
+    """Finalize a direct upload: verify the object landed in storage and create its MediaAsset"""
+    from ..core.storage import read_upload_token, finalize_upload_async, get_media_file_type
+    from ..core.media_derivatives import needs_derivatives, generate_media_derivatives
+    
+    try:
+        claims = read_upload_token(request.upload_token, folder="media")
+        file_url, file_size = await finalize_upload_async(claims)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    # Confirming the same slot twice (client retry) returns the existing asset
+    existing_result = await db.execute(
+        select(models.MediaAsset).where(models.MediaAsset.file_url == file_url)
+    )
+    existing = existing_result.scalar_one_or_none()
+    if existing:
+        return existing
+    
+    media_asset = models.MediaAsset(
+        tenant_id=claims['tenant_id'],
+        content_item_id=request.content_item_id,
+        file_name=claims['file_name'],
+        file_url=file_url,
+        file_type=get_media_file_type(claims['mime_type'], claims['file_name']),
+        file_size=file_size,
+        mime_type=claims['mime_type'],
+        intent_tags=request.intent_tags or None,
+        object_key=claims['key'],
+        derivatives_status='pending' if needs_derivatives(claims['mime_type'], claims['key']) else 'skipped'
+    )
+    db.add(media_asset)
+    await db.flush()
+    
+    # Audit log
+    await crud.write_audit(
+        db, None, 'media_asset', media_asset.id, 'create', current_user.username
+    )
+    
+    await db.commit()
+    await db.refresh(media_asset)
+    if media_asset.derivatives_status == 'pending':
+        background_tasks.add_task(generate_media_derivatives, media_asset.id)
+    return media_asset
 
 
 # Local SEO Topics (Priority 1)
@@ -1231,12 +1361,18 @@ async def list_offers(
 
 @router.get("/offers/active", response_model=List[schemas_marketing.Offer])
 async def list_active_offers(
+    request: Request,
+    response: Response,
     tenant_id: str = Query(..., description="Tenant ID"),
     db: AsyncSession = Depends(get_session),
     current_user: CurrentUser = Depends(get_current_user)
 ):
     """Get all currently active offers (within valid date range)"""
     today = date.today()
+    # The active set also changes at midnight, hence today in the ETag
+    version = await http_cache.table_version(db, models.Offer, models.Offer.tenant_id == tenant_id)
+    if cached := http_cache.not_modified(request, response, version, extra=(today,)):
+        return cached
     result = await db.execute(
         select(models.Offer).where(
             and_(
@@ -1340,11 +1476,6 @@ async def delete_offer(
 
 # Content Mix Tracking (Phase 2)
 
-def get_week_start(d: date) -> date:
-    """Get the Monday of the week containing the given date"""
-    return d - timedelta(days=d.weekday())
-
-
 @router.get("/content-mix/summary", response_model=List[schemas_marketing.ContentMixSummary])
 async def get_content_mix_summary(
     tenant_id: str = Query(..., description="Tenant ID"),
@@ -1353,112 +1484,10 @@ async def get_content_mix_summary(
     current_user: CurrentUser = Depends(get_current_user)
 ):
     """Get content mix summary for all channel accounts over the specified weeks"""
-    from datetime import date as date_type
-    
-    today = date_type.today()
-    start_week = get_week_start(today - timedelta(weeks=weeks-1))
-    
-    # Get all channel accounts for tenant
-    accounts_result = await db.execute(
-        select(models.ChannelAccount).where(models.ChannelAccount.tenant_id == tenant_id)
-    )
-    accounts = accounts_result.scalars().all()
-    
-    summaries = []
-    for account in accounts:
-        # Calculate actual counts from PostInstances for current week
-        current_week_start = get_week_start(today)
-        current_week_end = current_week_start + timedelta(days=6)
-        
-        # Get post instances with content items for the current week
-        posts_result = await db.execute(
-            select(models.PostInstance)
-            .join(models.ContentItem, models.PostInstance.content_item_id == models.ContentItem.id, isouter=True)
-            .where(
-                and_(
-                    models.PostInstance.tenant_id == tenant_id,
-                    models.PostInstance.channel_account_id == account.id,
-                    models.PostInstance.scheduled_for >= datetime.combine(current_week_start, datetime.min.time()),
-                    models.PostInstance.scheduled_for <= datetime.combine(current_week_end, datetime.max.time())
-                )
-            )
-            .options(joinedload(models.PostInstance.content_item))
-        )
-        posts = posts_result.unique().scalars().all()
-        
-        # Count by category
-        educational_count = 0
-        authority_count = 0
-        promo_count = 0
-        local_count = 0
-        
-        for post in posts:
-            if post.content_item:
-                category = post.content_item.content_category or ''
-                if category in ['diy', 'blog_post', 'educational']:
-                    educational_count += 1
-                elif category in ['team_post', 'authority']:
-                    authority_count += 1
-                elif category in ['coupon', 'promo', 'offer']:
-                    promo_count += 1
-                elif category in ['local', 'local_relevance']:
-                    local_count += 1
-        
-        # Get or default targets (could be stored in tracking table or account config)
-        target_educational = 2
-        target_authority = 1
-        target_promo = 1
-        target_local = 1
-        
-        # Calculate health and warnings
-        warnings = []
-        if promo_count > target_promo + 1:
-            warnings.append(f"Too many promo posts ({promo_count} vs target {target_promo})")
-        if educational_count < target_educational:
-            warnings.append(f"Need more educational content ({educational_count}/{target_educational})")
-        if authority_count < target_authority:
-            warnings.append(f"Need more authority/team content ({authority_count}/{target_authority})")
-        
-        total_actual = educational_count + authority_count + promo_count + local_count
-        total_target = target_educational + target_authority + target_promo + target_local
-        
-        if len(warnings) == 0:
-            overall_health = 'good'
-        elif len(warnings) <= 2:
-            overall_health = 'warning'
-        else:
-            overall_health = 'critical'
-        
-        summary = schemas_marketing.ContentMixSummary(
-            channel_account_id=account.id,
-            channel_account_name=account.name,
-            week_start_date=current_week_start,
-            educational={
-                'actual': educational_count,
-                'target': target_educational,
-                'percentage': (educational_count / target_educational * 100) if target_educational > 0 else 0
-            },
-            authority={
-                'actual': authority_count,
-                'target': target_authority,
-                'percentage': (authority_count / target_authority * 100) if target_authority > 0 else 0
-            },
-            promo={
-                'actual': promo_count,
-                'target': target_promo,
-                'percentage': (promo_count / target_promo * 100) if target_promo > 0 else 0
-            },
-            local_relevance={
-                'actual': local_count,
-                'target': target_local,
-                'percentage': (local_count / target_local * 100) if target_local > 0 else 0
-            },
-            overall_health=overall_health,
-            warnings=warnings
-        )
-        summaries.append(summary)
+    from ..core.content_mix import compute_content_mix
     
-    return summaries
+    summaries = await compute_content_mix(db, tenant_id, weeks)
+    return [schemas_marketing.ContentMixSummary(**summary) for summary in summaries]
 
 
 # Seasonal Events (Phase 3)
@@ -1499,6 +1528,8 @@ async def list_seasonal_events(
 
 @router.get("/seasonal-events/upcoming", response_model=List[schemas_marketing.SeasonalEvent])
 async def get_upcoming_events(
+    request: Request,
+    response: Response,
     tenant_id: str = Query(..., description="Tenant ID"),
     days: int = Query(30, ge=1, le=90, description="Number of days to look ahead"),
     db: AsyncSession = Depends(get_session),
@@ -1508,6 +1539,9 @@ async def get_upcoming_events(
     from datetime import date as date_type
     today = date_type.today()
     future_date = today + timedelta(days=days)
+    version = await http_cache.table_version(db, models.SeasonalEvent, models.SeasonalEvent.tenant_id == tenant_id)
+    if cached := http_cache.not_modified(request, response, version, extra=(today,)):
+        return cached
     
     result = await db.execute(
         select(models.SeasonalEvent).where(
@@ -8,13 +8,13 @@ from sqlalchemy.dialects.postgresql import insert
 from typing import Optional
 from datetime import datetime, timezone, timedelta
 from uuid import uuid4
-import pytz
 import random
 
 from ..db.session import get_session
 from .. import models
 from ..core.auth import get_current_user, CurrentUser
 from .. import crud
+from .marketing import load_channels
 
 router = APIRouter(prefix="/marketing/scheduler", tags=["marketing-scheduler"])
 
@@ -79,6 +79,8 @@ def compute_schedule_datetimes(
     end_date: datetime
 ) -> list[datetime]:
     """Compute target datetimes for an account based on its schedule configuration"""
+    import pytz  # deferred: only the scheduler needs tz data, keep it off the cold-start path
+    
     datetimes = []
     
     # Get schedule config with defaults
@@ -265,11 +267,7 @@ async def topoff_scheduler_logic(
         
         # Determine content categories for this account
         # Check if this is a Google My Business account (or similar that needs category distribution)
-        channel_result = await db.execute(
-            select(models.MarketingChannel)
-            .where(models.MarketingChannel.id == account.channel_id)
-        )
-        channel = channel_result.scalar_one_or_none()
+        channel = next((c for c in await load_channels(db) if c.id == account.channel_id), None)
         is_google_my_business = channel and ('google' in (channel.display_name or '').lower() or 'gmb' in (channel.display_name or '').lower() or channel.key == 'google_business_profile' or channel.key == 'google_my_business')
         
         # Get weighted category selection function
@@ -1,41 +1,34 @@
 """
 Notification endpoints for in-app alerts
 """
-from fastapi import APIRouter, Depends, Query, HTTPException, status
+from fastapi import APIRouter, Depends, Query, HTTPException, Request, status
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, and_, or_
+from sqlalchemy import select, update, func, and_, or_
 from typing import Optional, List
 from uuid import UUID
 from datetime import datetime, timezone
+import asyncio
+import json
 
 from ..db.session import get_session
 from .. import models, schemas
 from ..core.auth import get_current_user, CurrentUser
+from ..core.config import settings
+from ..core import notification_stream
 
 router = APIRouter()
 
 
-@router.get("", response_model=List[schemas.NotificationOut])
-async def list_notifications(
-    read: Optional[bool] = Query(None, description="Filter by read status"),
-    limit: int = Query(50, ge=1, le=100),
-    offset: int = Query(0, ge=0),
-    db: AsyncSession = Depends(get_session),
-    current_user: CurrentUser = Depends(get_current_user)
-):
-    """List notifications for current user"""
-    # Build query based on user_id and tenant_id
+def recipient_filter(current_user: CurrentUser):
+    """Notifications addressed to the user, plus their tenant's tenant-wide ones (None if neither applies)"""
     conditions = []
-    
     if current_user.user_id:
-        from uuid import UUID
         try:
-            user_uuid = UUID(current_user.user_id)
-            conditions.append(models.Notification.user_id == user_uuid)
+            conditions.append(models.Notification.user_id == UUID(current_user.user_id))
         except ValueError:
             pass  # Invalid UUID, skip
-    
-    # If user has tenant_id, also show tenant-wide notifications
+    # Tenant-wide notifications only for users bound to a tenant
     if current_user.tenant_id:
         conditions.append(
             and_(
@@ -43,14 +36,25 @@ async def list_notifications(
                 models.Notification.tenant_id == current_user.tenant_id
             )
         )
-    # If no tenant_id but has user_id, show notifications for this user only
-    # (don't show tenant-wide notifications if tenant_id is None)
-    
     if not conditions:
-        # No conditions met, return empty
+        return None
+    return or_(*conditions) if len(conditions) > 1 else conditions[0]
+
+
+@router.get("", response_model=List[schemas.NotificationOut])
+async def list_notifications(
+    read: Optional[bool] = Query(None, description="Filter by read status"),
+    limit: int = Query(50, ge=1, le=100),
+    offset: int = Query(0, ge=0),
+    db: AsyncSession = Depends(get_session),
+    current_user: CurrentUser = Depends(get_current_user)
+):
+    """List notifications for current user"""
+    recipients = recipient_filter(current_user)
+    if recipients is None:
         return []
     
-    query = select(models.Notification).where(or_(*conditions))
+    query = select(models.Notification).where(recipients)
     
     if read is not None:
         query = query.where(models.Notification.read == read)
@@ -69,39 +73,56 @@ async def get_unread_count(
     db: AsyncSession = Depends(get_session),
     current_user: CurrentUser = Depends(get_current_user)
 ):
-    """Get count of unread notifications for current user"""
-    conditions = []
-    
-    if current_user.user_id:
-        from uuid import UUID
+    """Get count of unread notifications for current user (trigger-maintained counters, see core/notification_stream.py)"""
+    count = await notification_stream.hub.unread(db, current_user.user_id, current_user.tenant_id)
+    return {"count": count}
+
+
+@router.get("/stream")
+async def stream_notifications(
+    request: Request,
+    db: AsyncSession = Depends(get_session),
+    current_user: CurrentUser = Depends(get_current_user)
+):
+    """
+    Server-sent events for the current user: `unread` on connect, then `notification` and `read`
+    events as they are committed (clients re-read /unread-count on each). Replaces polling.
+    """
+    hub = notification_stream.hub
+    subscription = hub.subscribe(current_user.user_id, current_user.tenant_id)
+    try:
+        unread = await hub.unread(db, current_user.user_id, current_user.tenant_id)
+    except Exception:
+        hub.unsubscribe(subscription)
+        raise
+    # Streams stay open for hours - don't pin a pooled connection to them
+    await db.close()
+
+    async def events():
         try:
-            user_uuid = UUID(current_user.user_id)
-            conditions.append(models.Notification.user_id == user_uuid)
-        except ValueError:
-            pass
-    
-    if current_user.tenant_id:
-        conditions.append(
-            and_(
-                models.Notification.user_id.is_(None),
-                models.Notification.tenant_id == current_user.tenant_id
-            )
-        )
-    
-    if not conditions:
-        return {"count": 0}
-    
-    query = select(models.Notification).where(
-        and_(
-            or_(*conditions),
-            models.Notification.read == False
-        )
+            yield f"retry: {settings.notifications_retry_ms}\n"
+            yield sse_message('unread', {'count': unread})
+            while not await request.is_disconnected():
+                try:
+                    message = await asyncio.wait_for(
+                        subscription.queue.get(), timeout=settings.notifications_heartbeat_seconds
+                    )
+                except asyncio.TimeoutError:
+                    yield ": keepalive\n\n"  # Comment line - keeps proxies from closing an idle stream
+                    continue
+                yield sse_message('notification' if message['event'] == 'created' else 'read', message)
+        finally:
+            hub.unsubscribe(subscription)
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
     )
-    
-    result = await db.execute(query)
-    count = len(result.scalars().all())
-    
-    return {"count": count}
+
+
+def sse_message(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
 
 
 @router.post("/{notification_id}/read", response_model=schemas.NotificationOut)
@@ -111,43 +132,32 @@ async def mark_notification_read(
     current_user: CurrentUser = Depends(get_current_user)
 ):
     """Mark a notification as read"""
-    conditions = []
-    if current_user.user_id:
-        from uuid import UUID
-        try:
-            user_uuid = UUID(current_user.user_id)
-            conditions.append(models.Notification.user_id == user_uuid)
-        except ValueError:
-            pass
-    if current_user.tenant_id:
-        conditions.append(
-            and_(
-                models.Notification.user_id.is_(None),
-                models.Notification.tenant_id == current_user.tenant_id
-            )
-        )
-    
-    if not conditions:
+    recipients = recipient_filter(current_user)
+    if recipients is None:
         raise HTTPException(status_code=404, detail="Notification not found")
     
-    from uuid import UUID as UUIDType
-    notif_uuid = UUIDType(str(notification_id))
+    n = models.Notification
+    # Conditional UPDATE: only the request that actually flips the flag announces the read,
+    # so two concurrent clicks don't decrement the counters twice
     result = await db.execute(
-        select(models.Notification).where(
-            and_(
-                models.Notification.id == notif_uuid,
-                or_(*conditions) if len(conditions) > 1 else conditions[0]
-            )
-        )
+        update(n)
+        .where(n.id == notification_id, recipients, n.read == False)
+        .values(read=True)
+        .returning(n.tenant_id, n.user_id)
+        .execution_options(synchronize_session=False)
     )
-    notification = result.scalar_one_or_none()
+    flipped = result.first()
+    if flipped:
+        await notification_stream.announce_read(db, flipped.tenant_id, flipped.user_id, 1)
     
+    result = await db.execute(
+        select(n).where(n.id == notification_id, recipients).execution_options(populate_existing=True)
+    )
+    notification = result.scalar_one_or_none()
     if not notification:
         raise HTTPException(status_code=404, detail="Notification not found")
     
-    notification.read = True
     await db.commit()
-    await db.refresh(notification)
     
     return notification
 
@@ -157,40 +167,32 @@ async def mark_all_read(
     db: AsyncSession = Depends(get_session),
     current_user: CurrentUser = Depends(get_current_user)
 ):
-    """Mark all notifications as read for current user"""
-    conditions = []
-    if current_user.user_id:
-        from uuid import UUID
-        try:
-            user_uuid = UUID(current_user.user_id)
-            conditions.append(models.Notification.user_id == user_uuid)
-        except ValueError:
-            pass
-    if current_user.tenant_id:
-        conditions.append(
-            and_(
-                models.Notification.user_id.is_(None),
-                models.Notification.tenant_id == current_user.tenant_id
-            )
-        )
-    
-    if not conditions:
+    """
+    Mark all notifications as read for current user.
+    One UPDATE, counted in the database: the cost doesn't grow with the number of notifications.
+    """
+    recipients = recipient_filter(current_user)
+    if recipients is None:
         return {"marked_read": 0}
     
-    query = select(models.Notification).where(
-        and_(
-            or_(*conditions) if len(conditions) > 1 else conditions[0],
-            models.Notification.read == False
-        )
+    n = models.Notification.__table__
+    updated = (
+        update(n)
+        .where(recipients, n.c.read == False)
+        .values(read=True)
+        .returning(n.c.user_id)
+        .cte('updated')
     )
-    
-    result = await db.execute(query)
-    notifications = result.scalars().all()
-    
-    for notification in notifications:
-        notification.read = True
+    result = await db.execute(
+        select(
+            func.count().filter(updated.c.user_id.isnot(None)),
+            func.count().filter(updated.c.user_id.is_(None)),
+        ).select_from(updated)
+    )
+    personal_count, broadcast_count = result.one()
+    await notification_stream.announce_read(db, current_user.tenant_id, current_user.user_id, personal_count)
+    await notification_stream.announce_read(db, current_user.tenant_id, None, broadcast_count)
     
     await db.commit()
     
-    return {"marked_read": len(notifications)}
-
+    return {"marked_read": personal_count + broadcast_count}
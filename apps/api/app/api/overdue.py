@@ -3,14 +3,15 @@ Overdue tracking endpoints for accountability
 """
 from fastapi import APIRouter, Depends, Query
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, and_, or_
+from sqlalchemy import select, and_, or_, literal
 from datetime import datetime, timezone, timedelta
 from typing import Optional
 from uuid import UUID
 
 from ..db.session import get_session
-from .. import models
+from .. import crud, models
 from ..core.auth import get_current_user
+from ..core.responses import FastJSONResponse
 
 router = APIRouter()
 
@@ -22,39 +23,42 @@ async def get_overdue_jobs(
     current_user = Depends(get_current_user)
 ):
     """Get jobs that are past their scheduled_end date and not completed"""
-    query = select(models.Job).where(
-        and_(
-            models.Job.scheduled_end.isnot(None),
-            models.Job.scheduled_end < datetime.now(timezone.utc),
-            models.Job.status != 'Completed'
-        )
-    )
+    now = datetime.now(timezone.utc)
+    query = select(
+        models.Job.id,
+        models.Job.community,
+        models.Job.lot_number,
+        models.Job.phase,
+        models.Job.status,
+        models.Job.scheduled_end,
+        models.Job.assigned_to,
+        models.Job.address_line1,
+        models.Job.city,
+    ).where(crud.overdue_filter(models.Job, now))
     
     if tenant_id:
         query = query.where(models.Job.tenant_id == tenant_id)
     
     result = await db.execute(query)
-    jobs = result.scalars().all()
-    
-    # Calculate days overdue for each job
-    overdue_jobs = []
-    for job in jobs:
-        days_overdue = (datetime.now(timezone.utc) - job.scheduled_end).days
-        job_dict = {
-            'id': str(job.id),
-            'community': job.community,
-            'lot_number': job.lot_number,
-            'phase': job.phase,
-            'status': job.status,
-            'scheduled_end': job.scheduled_end.isoformat() if job.scheduled_end else None,
-            'assigned_to': job.assigned_to,
-            'days_overdue': days_overdue,
-            'address_line1': job.address_line1,
-            'city': job.city,
-        }
-        overdue_jobs.append(job_dict)
     
-    return sorted(overdue_jobs, key=lambda x: x['days_overdue'], reverse=True)
+    # Raw row values; UUIDs and datetimes are encoded by orjson (core/responses.py)
+    overdue_jobs = [
+        {
+            'id': row.id,
+            'community': row.community,
+            'lot_number': row.lot_number,
+            'phase': row.phase,
+            'status': row.status,
+            'scheduled_end': row.scheduled_end,
+            'assigned_to': row.assigned_to,
+            'days_overdue': (now - row.scheduled_end).days,
+            'address_line1': row.address_line1,
+            'city': row.city,
+        }
+        for row in result
+    ]
+    overdue_jobs.sort(key=lambda x: x['days_overdue'], reverse=True)
+    return FastJSONResponse(overdue_jobs)
 
 
 @router.get('/service-calls/overdue')
@@ -64,39 +68,41 @@ async def get_overdue_service_calls(
     current_user = Depends(get_current_user)
 ):
     """Get service calls that are past their scheduled_end date and not completed"""
-    query = select(models.ServiceCall).where(
-        and_(
-            models.ServiceCall.scheduled_end.isnot(None),
-            models.ServiceCall.scheduled_end < datetime.now(timezone.utc),
-            models.ServiceCall.status != 'Completed'
-        )
-    )
+    now = datetime.now(timezone.utc)
+    query = select(
+        models.ServiceCall.id,
+        models.ServiceCall.customer_name,
+        models.ServiceCall.issue_description,
+        models.ServiceCall.status,
+        models.ServiceCall.priority,
+        models.ServiceCall.scheduled_end,
+        models.ServiceCall.assigned_to,
+        models.ServiceCall.address_line1,
+        models.ServiceCall.city,
+    ).where(crud.overdue_filter(models.ServiceCall, now))
     
     if tenant_id:
         query = query.where(models.ServiceCall.tenant_id == tenant_id)
     
     result = await db.execute(query)
-    calls = result.scalars().all()
-    
-    # Calculate days overdue for each call
-    overdue_calls = []
-    for call in calls:
-        days_overdue = (datetime.now(timezone.utc) - call.scheduled_end).days
-        call_dict = {
-            'id': str(call.id),
-            'customer_name': call.customer_name,
-            'issue_description': call.issue_description,
-            'status': call.status,
-            'priority': call.priority,
-            'scheduled_end': call.scheduled_end.isoformat() if call.scheduled_end else None,
-            'assigned_to': call.assigned_to,
-            'days_overdue': days_overdue,
-            'address_line1': call.address_line1,
-            'city': call.city,
-        }
-        overdue_calls.append(call_dict)
     
-    return sorted(overdue_calls, key=lambda x: x['days_overdue'], reverse=True)
+    overdue_calls = [
+        {
+            'id': row.id,
+            'customer_name': row.customer_name,
+            'issue_description': row.issue_description,
+            'status': row.status,
+            'priority': row.priority,
+            'scheduled_end': row.scheduled_end,
+            'assigned_to': row.assigned_to,
+            'days_overdue': (now - row.scheduled_end).days,
+            'address_line1': row.address_line1,
+            'city': row.city,
+        }
+        for row in result
+    ]
+    overdue_calls.sort(key=lambda x: x['days_overdue'], reverse=True)
+    return FastJSONResponse(overdue_calls)
 
 
 @router.get('/reviews/requests/overdue')
@@ -110,7 +116,7 @@ async def get_overdue_review_requests(
     
     query = select(models.ReviewRequest).where(
         and_(
-            models.ReviewRequest.status == 'pending',
+            models.ReviewRequest.status == literal('pending', literal_execute=True),  # Inlined to match ix_review_requests_pending
             models.ReviewRequest.created_at < three_days_ago
         )
     )
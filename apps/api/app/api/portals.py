@@ -1,7 +1,7 @@
 """
 Portals Directory API
 """
-from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
 from sqlalchemy.ext.asyncio import AsyncSession
 from typing import Optional, List
 from uuid import UUID
@@ -9,6 +9,7 @@ from uuid import UUID
 from ..db.session import get_session
 from ..core.auth import get_current_user
 from .. import crud, models, schemas
+from ..core import http_cache
 
 router = APIRouter(prefix="/directory", tags=["portals"])
 
@@ -26,12 +27,17 @@ async def create_portal_definition(
 
 @router.get("/portal-definitions", response_model=List[schemas.PortalDefinitionOut])
 async def list_portal_definitions(
+    request: Request,
+    response: Response,
     is_active: Optional[bool] = Query(None),
     category: Optional[str] = Query(None),
     db: AsyncSession = Depends(get_session),
     current_user = Depends(get_current_user)
 ):
-    """List portal definitions"""
+    """List portal definitions (ETag / 304 - see core/http_cache.py)"""
+    version = await http_cache.table_version(db, models.PortalDefinition)
+    if cached := http_cache.not_modified(request, response, version, http_cache.PRIVATE_SHORT):
+        return cached
     definitions = await crud.list_portal_definitions(db, is_active=is_active, category=category)
     return definitions
 
@@ -278,6 +284,19 @@ async def get_suggested_portals(
     )
     return accounts
 
+@router.post("/suggested-portals/batch", response_model=List[schemas.SuggestedPortalsForRecord])
+async def get_suggested_portals_batch(
+    request: schemas.SuggestedPortalsBatchRequest,
+    db: AsyncSession = Depends(get_session),
+    current_user = Depends(get_current_user)
+):
+    """
+    Suggested portal accounts for many jobs or service calls in one call (list views).
+    Same matching as /suggested-portals, fed from each record's tenant, builder, city, phase and
+    (service calls) permit check. Rules scoped on a field the record doesn't state never match.
+    """
+    return await crud.suggest_portals_for_records(db, request.applies_to.value, request.ids)
+
 
 
 
@@ -1,8 +1,9 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from ..db.session import get_session
-from .. import crud_reviews, schemas
+from .. import crud_reviews, models, schemas
+from ..core import http_cache
 
 router = APIRouter(prefix="/public/reviews", tags=["public-reviews"])
 
@@ -20,11 +21,16 @@ async def submit_review(
 
 @router.get("", response_model=list[schemas.ReviewOut])
 async def get_public_reviews(
+    request: Request,
+    response: Response,
     limit: int = 50,
     offset: int = 0,
     db: AsyncSession = Depends(get_session),
 ):
-    """Get public reviews (for display on public review page)"""
+    """Get public reviews (for display on public review page) - cacheable by browsers and CDNs"""
+    version = await http_cache.table_version(db, models.Review, models.Review.is_public == True)
+    if cached := http_cache.not_modified(request, response, version, http_cache.PUBLIC_CDN):
+        return cached
     reviews = await crud_reviews.list_reviews(
         db, tenant_id=None, is_public=True, limit=limit, offset=offset
     )
@@ -16,6 +16,7 @@ from .. schemas import (
 )
 from ..core.auth import create_access_token, get_current_user, CurrentUser
 from ..core.config import settings
+from ..core import http_cache, query_profiles
 from ..core.password import hash_password, verify_password
 from ..db.session import get_session
 from sqlalchemy.ext.asyncio import AsyncSession
@@ -27,196 +28,46 @@ from ..core.tenant_config import validate_tenant_feature, TenantFeature
 from ..schemas import UserCreate, UserUpdate, UserOut
 from uuid import UUID
 
-# Import marketing routes (async-based)
+import importlib
 import logging
 logger = logging.getLogger(__name__)
-marketing_router = None
-marketing_scheduler_router = None
-try:
-    from .marketing import router as marketing_router
-    logger.info("✓ Marketing routes imported successfully")
-except ImportError as e:
-    logger.error(f"✗ Marketing routes import failed (ImportError): {e}", exc_info=True)
-    import traceback
-    logger.error(f"Traceback: {traceback.format_exc()}")
-    marketing_router = None
-except Exception as e:
-    logger.error(f"✗ Marketing routes import failed (Exception): {e}", exc_info=True)
-    import traceback
-    logger.error(f"Traceback: {traceback.format_exc()}")
-    marketing_router = None
-
-try:
-    from .marketing_scheduler import router as marketing_scheduler_router
-    logger.info("✓ Marketing scheduler routes imported successfully")
-except ImportError as e:
-    logger.warning(f"Marketing scheduler routes import failed: {e}")
-    marketing_scheduler_router = None
-except Exception as e:
-    logger.warning(f"Marketing scheduler routes import failed: {e}")
-    marketing_scheduler_router = None
-
-# Import demand signals routes
-demand_signals_router = None
-try:
-    from .demand_signals import router as demand_signals_router
-    logger.info("✓ Demand signals routes imported successfully")
-except ImportError as e:
-    logger.warning(f"Demand signals routes import failed: {e}")
-    demand_signals_router = None
-except Exception as e:
-    logger.warning(f"Demand signals routes import failed: {e}")
-    demand_signals_router = None
-
-# Import review system routes
-try:
-    from .reviews import router as reviews_router
-    from .public_reviews import router as public_reviews_router
-    from .recovery_tickets import router as recovery_tickets_router
-except ImportError:
-    reviews_router = None
-    public_reviews_router = None
-    recovery_tickets_router = None
-
-# Import overdue tracking routes
-try:
-    from .overdue import router as overdue_router
-except ImportError:
-    overdue_router = None
-
-# Import job tasks routes
-try:
-    from .job_tasks import router as job_tasks_router
-except ImportError:
-    job_tasks_router = None
-
-# Import service call workflow routes
-try:
-    from .service_call_workflow import router as service_call_workflow_router
-except ImportError:
-    service_call_workflow_router = None
-
-# Import tech stats routes
-try:
-    from .tech_stats import router as tech_stats_router
-except ImportError:
-    tech_stats_router = None
-
-# Import analytics routes
-try:
-    from .analytics import router as analytics_router
-except ImportError:
-    analytics_router = None
-
-# Import notifications routes
-try:
-    from .notifications import router as notifications_router
-except ImportError:
-    notifications_router = None
-
-# Import signals routes
-try:
-    from .signals import router as signals_router
-except ImportError:
-    signals_router = None
-
-# Import portals directory routes
-try:
-    from .portals import router as portals_router
-except ImportError:
-    portals_router = None
-
-# Import customers routes
-try:
-    from .customers import router as customers_router
-except ImportError:
-    customers_router = None
-
-# Import Google OAuth routes
-try:
-    from .oauth_google import router as oauth_google_router
-except ImportError:
-    oauth_google_router = None
-
-# Import Facebook OAuth routes
-try:
-    from .oauth_facebook import router as oauth_facebook_router
-except ImportError:
-    oauth_facebook_router = None
-
-# Import Instagram OAuth routes
-try:
-    from .oauth_instagram import router as oauth_instagram_router
-except ImportError:
-    oauth_instagram_router = None
-
-from ..core.rate_limit import limiter, get_rate_limit
+
+# Feature routers in mount order: (module, include_router kwargs, path prefixes it serves).
+# They are mounted ahead of the core routes below (so e.g. /jobs/overdue wins over /jobs/{job_id}),
+# either all at startup or on the first request under one of their prefixes (see core/lazy_routers.py).
+ROUTER_MODULES = [
+    ('marketing', {}, ['/marketing']),
+    ('marketing_scheduler', {}, ['/marketing/scheduler']),
+    ('demand_signals', {}, ['/marketing/demand-signals']),
+    ('reviews', {}, ['/reviews']),
+    ('public_reviews', {}, ['/public/reviews']),
+    ('recovery_tickets', {}, ['/recovery-tickets']),
+    ('overdue', {}, ['/jobs/overdue', '/service-calls/overdue', '/reviews/requests/overdue', '/recovery-tickets/overdue']),
+    ('job_tasks', {}, ['/jobs/{job_id}/tasks']),
+    ('service_call_workflow', {}, ['/service-calls/{service_call_id}/workflow']),
+    ('tech_stats', {}, ['/tech-stats']),
+    ('analytics', {}, ['/analytics']),
+    ('notifications', {'prefix': '/notifications', 'tags': ['notifications']}, ['/notifications']),
+    ('signals', {}, ['/signals']),
+    ('portals', {}, ['/directory']),
+    ('customers', {}, ['/customers']),
+    ('search', {}, ['/search']),
+    ('oauth_google', {}, ['/oauth/google']),
+]
+
+
+def load_feature_router(module_name: str) -> Optional[APIRouter]:
+    """Import a feature router module; returns None (and logs) if it fails to import"""
+    try:
+        module = importlib.import_module(f'.{module_name}', __package__)
+    except Exception as e:
+        logger.error(f"✗ {module_name} routes import failed: {e}", exc_info=True)
+        return None
+    logger.info(f"✓ {module_name} routes imported")
+    return module.router
 
 router = APIRouter()
 
-# Include marketing routes if available
-if marketing_router:
-    router.include_router(marketing_router)
-    logger.info("Marketing routes included successfully in main router")
-else:
-    logger.error("Marketing routes NOT included - marketing_router is None. Endpoints will return 404!")
-
-# Include marketing scheduler routes if available
-if marketing_scheduler_router:
-    router.include_router(marketing_scheduler_router)
-    logger.info("Marketing scheduler routes included successfully in main router")
-
-# Include demand signals routes if available
-if demand_signals_router:
-    router.include_router(demand_signals_router)
-    logger.info("Demand signals routes included successfully in main router")
-
-# Include review system routes if available
-if reviews_router:
-    router.include_router(reviews_router)
-if public_reviews_router:
-    router.include_router(public_reviews_router)
-if recovery_tickets_router:
-    router.include_router(recovery_tickets_router)
-
-# Include overdue tracking routes if available
-if overdue_router:
-    router.include_router(overdue_router)
-
-# Include job tasks routes if available
-if job_tasks_router:
-    router.include_router(job_tasks_router)
-
-# Include service call workflow routes if available
-if service_call_workflow_router:
-    router.include_router(service_call_workflow_router)
-
-# Include tech stats routes if available
-if tech_stats_router:
-    router.include_router(tech_stats_router)
-
-# Include analytics routes if available
-if analytics_router:
-    router.include_router(analytics_router)
-
-# Include notifications routes if available
-if notifications_router:
-    router.include_router(notifications_router, prefix="/notifications", tags=["notifications"])
-
-# Include signals routes if available
-if signals_router:
-    router.include_router(signals_router)
-
-# Include portals directory routes if available
-if portals_router:
-    router.include_router(portals_router)
-
-# Include customers routes if available
-if customers_router:
-    router.include_router(customers_router)
-
-if oauth_google_router:
-    router.include_router(oauth_google_router)
 
 class LoginRequest(BaseModel):
     username: str
@@ -364,7 +215,10 @@ async def create_builder(builder_in: BuilderCreate, db: AsyncSession = Depends(g
     return builder
 
 @router.get('/builders')
-async def list_builders(search: Optional[str] = None, limit: int = 25, offset: int = 0, db: AsyncSession = Depends(get_session)):
+async def list_builders(request: Request, response: Response, search: Optional[str] = None, limit: int = 25, offset: int = 0, db: AsyncSession = Depends(get_session)):
+    version = await http_cache.table_version(db, models.Builder)
+    if cached := http_cache.not_modified(request, response, version):
+        return cached
     builders = await crud.list_builders(db, search, limit, offset)
     return builders
 
@@ -523,14 +377,18 @@ async def create_job(job_in: JobCreate, db: AsyncSession = Depends(get_session),
     return job
 
 @router.get('/jobs')
-async def list_jobs(tenant_id: Optional[str] = 'all_county', status: Optional[str] = None, builder_id: Optional[UUID] = None, community: Optional[str] = None, lot: Optional[str] = None, search: Optional[str] = None, scheduled_date: Optional[str] = None, limit: int = 25, offset: int = 0, db: AsyncSession = Depends(get_session)):
+async def list_jobs(tenant_id: Optional[str] = 'all_county', status: Optional[str] = None, builder_id: Optional[UUID] = None, community: Optional[str] = None, lot: Optional[str] = None, search: Optional[str] = None, scheduled_date: Optional[str] = None, limit: int = 25, offset: int = 0, profile: str = 'list', db: AsyncSession = Depends(get_session)):
+    """profile: 'list' (slim JobListItem rows), 'detail' or 'export' (every column) - see core/query_profiles.py"""
     if tenant_id:
         try:
             validate_tenant_feature(tenant_id, TenantFeature.JOBS)
         except ValueError as e:
             raise HTTPException(status_code=400, detail=str(e))
-    jobs = await crud.list_jobs(db, tenant_id, status, builder_id, community, lot, search, scheduled_date, limit, offset)
-    return jobs
+    try:
+        jobs = await crud.list_jobs(db, tenant_id, status, builder_id, community, lot, search, scheduled_date, limit, offset, profile)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return query_profiles.serialize('job', profile, jobs)
 
 @router.get('/jobs/{id}', response_model=JobOut)
 async def get_job(id: UUID, db: AsyncSession = Depends(get_session)):
@@ -598,14 +456,18 @@ async def create_service_call(sc_in: ServiceCallCreate, db: AsyncSession = Depen
     return sc
 
 @router.get('/service-calls')
-async def list_service_calls(tenant_id: Optional[str] = 'h2o', status: Optional[str] = None, builder_id: Optional[UUID] = None, customer_id: Optional[UUID] = None, search: Optional[str] = None, assigned_to: Optional[str] = None, scheduled_date: Optional[str] = None, limit: int = 25, offset: int = 0, db: AsyncSession = Depends(get_session)):
+async def list_service_calls(tenant_id: Optional[str] = 'h2o', status: Optional[str] = None, builder_id: Optional[UUID] = None, customer_id: Optional[UUID] = None, search: Optional[str] = None, assigned_to: Optional[str] = None, scheduled_date: Optional[str] = None, limit: int = 25, offset: int = 0, profile: str = 'list', db: AsyncSession = Depends(get_session)):
+    """profile: 'list' (slim ServiceCallListItem rows), 'detail' or 'export' (every column) - see core/query_profiles.py"""
     if tenant_id:
         try:
             validate_tenant_feature(tenant_id, TenantFeature.SERVICE_CALLS)
         except ValueError as e:
             raise HTTPException(status_code=400, detail=str(e))
-    scs = await crud.list_service_calls(db, tenant_id, status, builder_id, search, assigned_to, scheduled_date, customer_id, limit, offset)
-    return scs
+    try:
+        scs = await crud.list_service_calls(db, tenant_id, status, builder_id, search, assigned_to, scheduled_date, customer_id, limit, offset, profile)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return query_profiles.serialize('service_call', profile, scs)
 
 @router.get('/service-calls/{id}', response_model=ServiceCallOut)
 async def get_service_call(id: UUID, db: AsyncSession = Depends(get_session)):
@@ -0,0 +1,36 @@
+"""
+Unified search endpoint (dispatch type-ahead)
+"""
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional
+
+from ..db.session import get_session
+from ..core import search as search_index
+from ..core.auth import get_current_user, CurrentUser
+from ..schemas import SearchHitOut
+
+router = APIRouter(tags=["search"])
+
+
+@router.get('/search', response_model=List[SearchHitOut])
+async def search(
+    q: str = Query(..., min_length=search_index.MIN_TERM_LENGTH, max_length=200, description="Search term"),
+    tenant_id: Optional[str] = Query(None, description="Limit tenant-scoped entities to this tenant"),
+    types: Optional[List[str]] = Query(None, description=f"Entity types to search: {', '.join(search_index.ENTITY_TYPES)}"),
+    limit: int = Query(20, ge=1, le=100),
+    db: AsyncSession = Depends(get_session),
+    current_user: CurrentUser = Depends(get_current_user)
+):
+    """Ranked matches across jobs, service calls, customers, builders and portal accounts"""
+    if current_user.tenant_id:
+        if tenant_id and tenant_id != current_user.tenant_id:
+            raise HTTPException(status_code=403, detail="Access denied")
+        tenant_id = current_user.tenant_id
+
+    if types:
+        unknown = [t for t in types if t not in search_index.SOURCES]
+        if unknown:
+            raise HTTPException(status_code=400, detail=f"Unknown entity types: {', '.join(unknown)}")
+
+    return await search_index.search(db, q.strip(), tenant_id=tenant_id, entity_types=types, limit=limit)
@@ -307,22 +307,19 @@ async def upload_paperwork_photos(
         raise HTTPException(status_code=403, detail="Access denied to this service call")
     
     try:
-        from ..core.storage import upload_file, validate_file
+        from ..core.storage import upload_stream, validate_upload, get_file_size
         
         uploaded_urls = []
         
         for file in files:
-            # Read file content
-            file_content = await file.read()
-            
-            # Validate file
-            is_valid, error_msg = validate_file(file_content, file.content_type)
+            # Validate file (size taken from the spooled temp file, not read into memory)
+            is_valid, error_msg = validate_upload(get_file_size(file.file), file.content_type)
             if not is_valid:
                 raise HTTPException(status_code=400, detail=f"Invalid file {file.filename}: {error_msg}")
             
-            # Upload to storage
-            file_url = upload_file(
-                file_content=file_content,
+            # Stream to storage off the event loop
+            file_url, _ = await upload_stream(
+                file.file,
                 file_name=file.filename or "paperwork.jpg",
                 tenant_id=service_call.tenant_id,
                 folder="paperwork",
@@ -333,6 +330,8 @@ async def upload_paperwork_photos(
         
         return {"urls": uploaded_urls, "photo_urls": uploaded_urls}  # Support both field names
         
+    except HTTPException:
+        raise
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
@@ -340,4 +339,72 @@ async def upload_paperwork_photos(
             status_code=500,
             detail=f"Failed to upload paperwork photos: {str(e)}"
         )
+    finally:
+        for file in files:
+            await file.close()
+
 
+
+@router.post("/paperwork-upload-urls", response_model=List[schemas.UploadSlot])
+async def create_paperwork_upload_urls(
+    service_call_id: UUID,
+    request: schemas.PaperworkUploadRequest,
+    db: AsyncSession = Depends(get_session),
+    current_user: CurrentUser = Depends(get_current_user)
+):
+    """Get presigned URLs to upload paperwork photos directly to S3/R2 (confirm with /paperwork-confirm)"""
+    result = await db.execute(select(models.ServiceCall).where(models.ServiceCall.id == service_call_id))
+    service_call = result.scalar_one_or_none()
+    if not service_call:
+        raise HTTPException(status_code=404, detail="Service call not found")
+    
+    if current_user.tenant_id and service_call.tenant_id != current_user.tenant_id:
+        raise HTTPException(status_code=403, detail="Access denied to this service call")
+    
+    from ..core.storage import create_upload_slot
+    
+    slots = []
+    for spec in request.files:
+        try:
+            slots.append(create_upload_slot(
+                file_name=spec.file_name or "paperwork.jpg",
+                tenant_id=service_call.tenant_id,
+                folder="paperwork",
+                mime_type=spec.mime_type,
+                file_size=spec.file_size
+            ))
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=f"Invalid file {spec.file_name}: {str(e)}")
+    return slots
+
+
+@router.post("/paperwork-confirm", response_model=dict)
+async def confirm_paperwork_uploads(
+    service_call_id: UUID,
+    request: schemas.PaperworkUploadConfirm,
+    db: AsyncSession = Depends(get_session),
+    current_user: CurrentUser = Depends(get_current_user)
+):
+    """Verify directly uploaded paperwork photos and return their URLs"""
+    result = await db.execute(select(models.ServiceCall).where(models.ServiceCall.id == service_call_id))
+    service_call = result.scalar_one_or_none()
+    if not service_call:
+        raise HTTPException(status_code=404, detail="Service call not found")
+    
+    if current_user.tenant_id and service_call.tenant_id != current_user.tenant_id:
+        raise HTTPException(status_code=403, detail="Access denied to this service call")
+    
+    from ..core.storage import read_upload_token, finalize_upload_async
+    
+    uploaded_urls = []
+    for upload_token in request.upload_tokens:
+        try:
+            claims = read_upload_token(upload_token, folder="paperwork")
+            if claims['tenant_id'] != service_call.tenant_id:
+                raise ValueError("Upload token belongs to another tenant")
+            file_url, _ = await finalize_upload_async(claims)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        uploaded_urls.append(file_url)
+    
+    return {"urls": uploaded_urls, "photo_urls": uploaded_urls}  # Same shape as /upload-paperwork
@@ -10,6 +10,7 @@ from datetime import datetime, timedelta
 from ..db.session import get_session
 from .. import models
 from ..core.auth import get_current_user, CurrentUser
+from ..core.responses import FastJSONResponse
 
 router = APIRouter(prefix="/tech-stats", tags=["tech-stats"])
 
@@ -145,7 +146,7 @@ async def get_all_tech_stats(
     # Sort by scheduled + completed count (descending)
     stats_list.sort(key=lambda x: (x["scheduled"] + x["completed"]), reverse=True)
     
-    return stats_list
+    return FastJSONResponse(stats_list)
 
 
 @router.get("/{username}")
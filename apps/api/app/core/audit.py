@@ -0,0 +1,337 @@
+"""
+Audit log write path and maintenance
+
+crud.write_audit() only buffers entries on the session; at commit the whole buffer is written
+in one multi-row INSERT, so an update that touches ten fields costs one statement instead of
+ten. A rollback discards the buffer together with the changes it described.
+
+AUDIT_MODE picks where that commit-time write goes:
+    sync     straight into audit_log, inside the request transaction (default)
+    outbox   into the unlogged audit_outbox table - still atomic with the change, but without
+             WAL, partition routing or index upkeep; AuditDrainer moves rows into audit_log
+    memory   into an in-process buffer after the commit succeeds; AuditDrainer flushes it.
+             When the buffer is full the rows are written synchronously instead, so nothing is dropped
+
+Async modes trade a short delay (AUDIT_DRAIN_INTERVAL) before history shows up for request
+latency. Unlogged tables are emptied by crash recovery and the memory buffer dies with its
+process, so rows not yet drained are lost on a crash - use sync where every row must survive.
+
+audit_log is range-partitioned by month on changed_at (migration 0031). The daily
+maintain_audit_log job creates upcoming partitions and, when AUDIT_RETENTION_MONTHS is set,
+archives expired months to storage as gzipped CSV before dropping them.
+"""
+import asyncio
+import gzip
+import io
+import logging
+import re
+import uuid
+from collections import deque
+from datetime import date, datetime, timezone
+from typing import List, Optional
+
+from sqlalchemy import event, text
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from . import metrics
+from .config import settings
+
+logger = logging.getLogger(__name__)
+
+BUFFER_KEY = 'audit_buffer'
+COMMITTING_KEY = 'audit_committing'
+DEFAULT_PARTITION = 'audit_log_default'
+ARCHIVE_PREFIX = 'audit-archive'
+AUDIT_MODES = ('sync', 'outbox', 'memory')
+_PARTITION_NAME = re.compile(r'^audit_log_y(\d{4})m(\d{2})$')
+
+# Committed rows waiting for the drainer (AUDIT_MODE=memory)
+_memory_buffer: deque = deque()
+
+audit_rows_drained = metrics.registry.register(metrics.Counter(
+    'audit_rows_drained_total', 'Audit rows moved into audit_log by the drainer', ('mode',)
+))
+audit_sync_fallbacks = metrics.registry.register(metrics.Counter(
+    'audit_sync_fallback_rows_total', 'Audit rows written synchronously because the memory buffer was full'
+))
+metrics.registry.register(metrics.Gauge(
+    'audit_memory_buffer_rows', 'Committed audit rows waiting in the memory buffer',
+    callback=lambda: {(): len(_memory_buffer)}
+))
+
+
+def audit_row(entry: dict) -> dict:
+    # id and changed_at are set here so rows keep their identity and time however late they are drained
+    return {
+        'id': uuid.uuid4(),
+        'tenant_id': entry.get('tenant_id'),
+        'entity_type': entry['entity_type'],
+        'entity_id': entry['entity_id'],
+        'action': entry['action'],
+        'field': entry.get('field'),
+        'old_value': entry.get('old_value'),
+        'new_value': entry.get('new_value'),
+        'changed_by': entry['changed_by'],
+        'changed_at': datetime.now(timezone.utc),
+    }
+
+
+def record(db: AsyncSession, entries: List[dict]):
+    """Buffer audit entries until the session commits"""
+    db.info.setdefault(BUFFER_KEY, []).extend(audit_row(entry) for entry in entries)
+
+
+def insert_statement(rows: List[dict], table=None):
+    from .. import models
+
+    table = table if table is not None else models.AuditLog.__table__
+    return table.insert().values(rows)
+
+
+def write_rows(session: Session, rows: List[dict], mode: str):
+    """Commit-time write of a session's buffered rows (sync Session - called from the before_commit hook)"""
+    from .. import models
+
+    if mode == 'outbox':
+        session.execute(insert_statement(rows, models.AuditOutbox.__table__))
+    elif mode == 'memory' and len(_memory_buffer) + len(rows) <= settings.audit_buffer_size:
+        # Handed to the buffer only once the commit has succeeded (after_commit)
+        session.info[COMMITTING_KEY] = rows
+    else:
+        if mode == 'memory':
+            audit_sync_fallbacks.inc(len(rows))
+        session.execute(insert_statement(rows))
+
+
+async def flush(db: AsyncSession):
+    """Write buffered entries into audit_log now (inside the current transaction) instead of at commit"""
+    rows = db.info.pop(BUFFER_KEY, None)
+    if rows:
+        await db.execute(insert_statement(rows))
+
+
+@event.listens_for(Session, 'before_commit')
+def _write_buffer_before_commit(session: Session):
+    # Runs inside the AsyncSession's greenlet, so the sync execute() is safe here
+    rows = session.info.pop(BUFFER_KEY, None)
+    if rows:
+        write_rows(session, rows, settings.audit_mode)
+
+
+@event.listens_for(Session, 'after_commit')
+def _hand_rows_to_memory_buffer(session: Session):
+    rows = session.info.pop(COMMITTING_KEY, None)
+    if rows:
+        _memory_buffer.extend(rows)
+
+
+@event.listens_for(Session, 'after_transaction_end')
+def _discard_buffer_after_rollback(session: Session, transaction):
+    # After a commit the buffers are already empty; after a rollback their entries describe undone changes
+    if transaction.parent is None:
+        session.info.pop(BUFFER_KEY, None)
+        session.info.pop(COMMITTING_KEY, None)
+
+
+# Drainer
+
+DRAIN_OUTBOX_SQL = text("""
+    WITH batch AS (
+        DELETE FROM audit_outbox
+        WHERE seq IN (SELECT seq FROM audit_outbox ORDER BY seq LIMIT :limit FOR UPDATE SKIP LOCKED)
+        RETURNING id, tenant_id, entity_type, entity_id, action, field, old_value, new_value, changed_by, changed_at
+    )
+    INSERT INTO audit_log (id, tenant_id, entity_type, entity_id, action, field, old_value, new_value, changed_by, changed_at)
+    SELECT id, tenant_id, entity_type, entity_id, action, field, old_value, new_value, changed_by, changed_at FROM batch
+""")
+
+
+async def drain_outbox(limit: int) -> int:
+    """Move up to `limit` rows from audit_outbox into audit_log in one statement (safe to run in several processes)"""
+    from ..db.session import AsyncSessionLocal
+
+    async with AsyncSessionLocal() as db:
+        result = await db.execute(DRAIN_OUTBOX_SQL, {'limit': limit})
+        await db.commit()
+    return result.rowcount or 0
+
+
+async def drain_memory(limit: int) -> int:
+    """Insert up to `limit` buffered rows; they go back to the front of the buffer if the insert fails"""
+    from ..db.session import AsyncSessionLocal
+
+    rows = [_memory_buffer.popleft() for _ in range(min(limit, len(_memory_buffer)))]
+    if not rows:
+        return 0
+    try:
+        async with AsyncSessionLocal() as db:
+            await db.execute(insert_statement(rows))
+            await db.commit()
+    except Exception:
+        _memory_buffer.extendleft(reversed(rows))
+        raise
+    return len(rows)
+
+
+class AuditDrainer:
+    """Background task moving outbox / memory-buffer rows into audit_log in large batches"""
+
+    def __init__(self, mode: Optional[str] = None):
+        self.mode = mode or settings.audit_mode
+        self._stop = asyncio.Event()
+
+    async def drain_once(self) -> int:
+        drain = drain_outbox if self.mode == 'outbox' else drain_memory
+        drained = await drain(settings.audit_drain_batch)
+        if drained:
+            audit_rows_drained.inc(drained, mode=self.mode)
+        return drained
+
+    async def run_forever(self):
+        logger.info(f"✓ Audit drainer started (mode={self.mode})")
+        while not self._stop.is_set():
+            try:
+                # A full batch means there is more waiting - go again without sleeping
+                if await self.drain_once() >= settings.audit_drain_batch:
+                    continue
+            except Exception as e:
+                logger.error(f"Error draining audit rows: {e}", exc_info=True)
+            try:
+                await asyncio.wait_for(self._stop.wait(), timeout=settings.audit_drain_interval)
+            except asyncio.TimeoutError:
+                pass
+
+    async def stop(self, timeout: float):
+        """Stop the loop, then drain what is left (up to `timeout` seconds)"""
+        self._stop.set()
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        try:
+            while loop.time() < deadline and await self.drain_once():
+                pass
+        except Exception as e:
+            logger.warning(f"⚠ Final audit drain failed: {e}")
+        if self.mode == 'memory' and _memory_buffer:
+            logger.warning(f"⚠ {len(_memory_buffer)} audit rows still buffered at shutdown were lost")
+
+
+# Partitions
+
+def month_start(value: date) -> date:
+    return date(value.year, value.month, 1)
+
+
+def add_months(value: date, months: int) -> date:
+    index = value.year * 12 + value.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def month_start_at(month: date) -> datetime:
+    return datetime(month.year, month.month, 1, tzinfo=timezone.utc)
+
+
+def partition_name(month: date) -> str:
+    return f"audit_log_y{month.year}m{month.month:02d}"
+
+
+async def is_partitioned(db: AsyncSession) -> bool:
+    result = await db.execute(text(
+        "SELECT EXISTS (SELECT 1 FROM pg_partitioned_table WHERE partrelid = to_regclass('audit_log'))"
+    ))
+    return bool(result.scalar())
+
+
+async def list_partitions(db: AsyncSession) -> List[date]:
+    """Months that have their own partition (the default partition is not included)"""
+    result = await db.execute(text(
+        "SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid "
+        "WHERE i.inhparent = to_regclass('audit_log')"
+    ))
+    months = []
+    for (name,) in result.all():
+        match = _PARTITION_NAME.match(name)
+        if match:
+            months.append(date(int(match.group(1)), int(match.group(2)), 1))
+    return sorted(months)
+
+
+async def ensure_partitions(db: AsyncSession, months_ahead: int = 3) -> List[str]:
+    """Create partitions for this month and the next `months_ahead` months"""
+    existing = set(await list_partitions(db))
+    current = month_start(datetime.now(timezone.utc).date())
+    created = []
+    for offset in range(months_ahead + 1):
+        month = add_months(current, offset)
+        if month in existing:
+            continue
+        name = partition_name(month)
+        # Fails if the default partition already holds rows for this month - the job runs months ahead to avoid that
+        await db.execute(text(
+            f"CREATE TABLE IF NOT EXISTS {name} PARTITION OF audit_log "
+            f"FOR VALUES FROM ('{month.isoformat()} 00:00+00') TO ('{add_months(month, 1).isoformat()} 00:00+00')"
+        ))
+        created.append(name)
+    return created
+
+
+# Retention
+
+async def archive_range(db: AsyncSession, start: date, end: date) -> Optional[str]:
+    """Upload audit rows with start <= changed_at < end as gzipped CSV; returns the storage key, None if empty"""
+    from .storage import put_bytes
+
+    connection = await db.connection()
+    raw = await connection.get_raw_connection()
+    buffer = io.BytesIO()
+    await raw.driver_connection.copy_from_query(
+        "SELECT * FROM audit_log WHERE changed_at >= $1 AND changed_at < $2 ORDER BY changed_at",
+        month_start_at(start),
+        month_start_at(end),
+        output=buffer,
+        format='csv',
+        header=True
+    )
+    data = buffer.getvalue()
+    if data.count(b'\n') <= 1:  # header only
+        return None
+    key = f"{ARCHIVE_PREFIX}/{partition_name(start)}.csv.gz"
+    await asyncio.to_thread(put_bytes, gzip.compress(data), key, 'application/gzip')
+    return key
+
+
+async def apply_retention(db: AsyncSession, retention_months: int, archive: bool = True) -> List[str]:
+    """
+    Archive (optionally) and remove audit months older than `retention_months`.
+    Partitions are dropped whole; stray rows in the default partition, or in an unpartitioned
+    table (e.g. a create_all test database), are deleted.
+    """
+    cutoff = add_months(month_start(datetime.now(timezone.utc).date()), -retention_months)
+    if await is_partitioned(db):
+        partition_months = set(await list_partitions(db))
+        loose_rows_table = DEFAULT_PARTITION
+    else:
+        partition_months = set()
+        loose_rows_table = 'audit_log'
+
+    result = await db.execute(text(
+        f"SELECT DISTINCT date_trunc('month', changed_at AT TIME ZONE 'UTC')::date FROM {loose_rows_table} "
+        "WHERE changed_at < :cutoff"
+    ), {'cutoff': month_start_at(cutoff)})
+    expired = sorted({month for month in partition_months if month < cutoff} | {row[0] for row in result.all()})
+
+    removed = []
+    for month in expired:
+        if archive:
+            key = await archive_range(db, month, add_months(month, 1))
+            if key:
+                logger.info(f"✓ Archived audit log {month:%Y-%m} to {key}")
+        if month in partition_months:
+            await db.execute(text(f"DROP TABLE IF EXISTS {partition_name(month)}"))
+        await db.execute(text(
+            f"DELETE FROM {loose_rows_table} WHERE changed_at >= :start AND changed_at < :end"
+        ), {'start': month_start_at(month), 'end': month_start_at(add_months(month, 1))})
+        # Commit per month: an uploaded archive is never followed by a rolled-back drop of other months
+        await db.commit()
+        removed.append(f"{month:%Y-%m}")
+    return removed
@@ -9,36 +9,11 @@ import logging
 from dateutil.relativedelta import relativedelta
 
 from .. import models
+from .notifications import create_notification
 
 logger = logging.getLogger(__name__)
 
 
-async def create_notification(
-    db: AsyncSession,
-    tenant_id: str,
-    notification_type: str,
-    title: str,
-    message: str,
-    entity_type: str = None,
-    entity_id: str = None,
-    user_id: str = None
-):
-    """Helper to create a notification"""
-    notification = models.Notification(
-        tenant_id=tenant_id,
-        user_id=user_id,
-        type=notification_type,
-        title=title,
-        message=message,
-        entity_type=entity_type,
-        entity_id=entity_id,
-        read=False
-    )
-    db.add(notification)
-    await db.commit()
-    return notification
-
-
 async def on_job_status_changed(
     db: AsyncSession,
     job: models.Job,
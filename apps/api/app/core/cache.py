@@ -0,0 +1,143 @@
+"""
+In-process read-through cache for reference data (builders by name, marketing channels, portal
+definitions) - LRU + TTL, invalidated from the write paths and across processes
+
+    builder_ids: Cache[str, UUID] = cache.register('builder_ids', maxsize=2048)
+    builder_id = await builder_ids.get_or_load(name.lower(), load_builder_id)
+
+Entries are plain values or Pydantic snapshots - never ORM objects, which belong to the session
+that loaded them. Writers call invalidate(db, name, key) in their transaction: the local entry
+is dropped at once, and a pg_notify on the 'app_cache' channel, delivered when the transaction
+commits, makes every process (this one included) drop it again. The second drop covers a
+concurrent request that reloaded the old row before the commit.
+
+Every role listens on the channel through the process's shared LISTEN connection (listen(),
+core/pg_listener.py). Everything is cleared whenever that connection is opened or lost, since
+invalidations may have been missed. Without a listener (tests, scripts) the TTL bounds how stale
+another process's write can look.
+"""
+import json
+import logging
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Generic, Hashable, Optional, TypeVar
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from . import metrics
+from .config import settings
+
+logger = logging.getLogger(__name__)
+
+CHANNEL = 'app_cache'
+
+K = TypeVar('K', bound=Hashable)
+V = TypeVar('V')
+
+_MISSING = object()
+
+cache_lookups = metrics.registry.register(metrics.Counter(
+    'cache_lookups_total', 'In-process cache lookups', ('cache', 'result')
+))
+
+
+class Cache(Generic[K, V]):
+    """LRU cache whose entries also expire `ttl` seconds after they were stored"""
+
+    def __init__(self, name: str, maxsize: int = 1024, ttl: Optional[float] = None):
+        self.name = name
+        self.maxsize = maxsize
+        self.ttl = settings.cache_ttl_seconds if ttl is None else ttl
+        self._entries: "OrderedDict[K, tuple]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: K, default: Any = None) -> Optional[V]:
+        entry = self._entries.get(key)
+        if entry is None or entry[1] < time.monotonic():
+            if entry is not None:
+                del self._entries[key]
+            cache_lookups.inc(cache=self.name, result='miss')
+            return default
+        self._entries.move_to_end(key)
+        cache_lookups.inc(cache=self.name, result='hit')
+        return entry[0]
+
+    def set(self, key: K, value: V):
+        self._entries[key] = (value, time.monotonic() + self.ttl)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    async def get_or_load(self, key: K, loader: Callable[[], Awaitable[V]]) -> V:
+        """Cached value, or the loader's result (cached unless it is None)"""
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            value = await loader()
+            if value is not None:
+                self.set(key, value)
+        return value
+
+    def invalidate(self, key: Optional[K] = None):
+        """Drop one key, or everything when key is None"""
+        if key is None:
+            self._entries.clear()
+        else:
+            self._entries.pop(key, None)
+
+
+caches: Dict[str, Cache] = {}
+
+
+def register(name: str, maxsize: int = 1024, ttl: Optional[float] = None) -> Cache:
+    """Create (once) and return the named cache; names are what invalidations refer to"""
+    if name not in caches:
+        caches[name] = Cache(name, maxsize, ttl)
+    return caches[name]
+
+
+def clear_all():
+    for cache in caches.values():
+        cache.invalidate()
+
+
+def _invalidate_local(name: str, key: Optional[str]):
+    cache = caches.get(name)
+    if cache is not None:
+        cache.invalidate(key)
+
+
+async def invalidate(db: Optional[AsyncSession], name: str, key: Optional[str] = None):
+    """
+    Drop `key` (all keys when None) from cache `name` here now, and in every process once the
+    session's transaction commits. Keys must be strings to travel in the NOTIFY payload.
+    """
+    _invalidate_local(name, key)
+    if db is not None:
+        await db.execute(
+            text("SELECT pg_notify(:channel, :payload)"),
+            {'channel': CHANNEL, 'payload': json.dumps({'cache': name, 'key': key})}
+        )
+
+
+def _on_invalidation(payload: str):
+    try:
+        message = json.loads(payload)
+    except ValueError:
+        logger.warning(f"⚠ Ignoring malformed cache invalidation: {payload[:100]}")
+        return
+    _invalidate_local(message.get('cache'), message.get('key'))
+
+
+def listen():
+    """Apply invalidations from every process through the shared LISTEN connection"""
+    from .pg_listener import listener
+
+    listener.register(CHANNEL, _on_invalidation, resync=clear_all)
+
+metrics.registry.register(metrics.Gauge(
+    'cache_entries', 'Entries held per in-process cache', ('cache',),
+    callback=lambda: {(name,): len(cache) for name, cache in caches.items()}
+))
@@ -27,6 +27,43 @@ class Settings(BaseSettings):
     api_host: str = os.getenv("API_HOST", "0.0.0.0")
     api_port: int = int(os.getenv("API_PORT", "8000"))
     environment: str = os.getenv("ENVIRONMENT", "development")
+    lazy_routers: bool = os.getenv("LAZY_ROUTERS", "false").lower() == "true"  # Mount feature routers on first request (serverless)
+    app_role: str = os.getenv("APP_ROLE", "all")  # 'web', 'scheduler', 'publisher' or 'all' (see app/runtime.py)
+    shutdown_grace_seconds: int = int(os.getenv("SHUTDOWN_GRACE_SECONDS", "25"))  # Time to drain in-flight jobs on shutdown
+    probe_port: int = int(os.getenv("PROBE_PORT", "8001"))  # Health probe port for worker roles
+
+    # Query profiling (see core/query_stats.py)
+    query_stats_enabled: bool = os.getenv("QUERY_STATS", "true").lower() == "true"  # Server-Timing header + per-request log line
+    query_budget: int = int(os.getenv("QUERY_BUDGET", "0"))  # Max queries per request; 0 = no budget
+    query_budget_action: str = os.getenv("QUERY_BUDGET_ACTION", "log")  # 'log' or 'raise' when a request exceeds the budget
+    metrics_token: Optional[str] = os.getenv("METRICS_TOKEN", None)  # Bearer token required by /metrics when set
+    slow_query_ms: int = int(os.getenv("SLOW_QUERY_MS", "500"))  # Log statements slower than this; 0 = off
+
+    # Audit log (see core/audit.py)
+    audit_retention_months: int = int(os.getenv("AUDIT_RETENTION_MONTHS", "0"))  # Drop audit months older than this; 0 = keep forever
+    audit_archive: bool = os.getenv("AUDIT_ARCHIVE", "true").lower() == "true"  # Upload expired months to storage before dropping them
+    audit_partitions_ahead: int = int(os.getenv("AUDIT_PARTITIONS_AHEAD", "3"))  # Monthly partitions created in advance
+    audit_mode: str = os.getenv("AUDIT_MODE", "sync")  # 'sync', 'outbox' or 'memory' - where commit-time audit rows go
+    audit_drain_interval: float = float(os.getenv("AUDIT_DRAIN_INTERVAL", "1.0"))  # Seconds between drainer passes (outbox/memory)
+    audit_drain_batch: int = int(os.getenv("AUDIT_DRAIN_BATCH", "5000"))  # Rows moved per drainer statement
+    audit_buffer_size: int = int(os.getenv("AUDIT_BUFFER_SIZE", "50000"))  # Memory mode: beyond this, rows are written synchronously
+
+    # Notification push (see core/notification_stream.py)
+    notifications_listen_url: Optional[str] = os.getenv("NOTIFICATIONS_LISTEN_URL", None)  # Direct (non-pgbouncer) URL for LISTEN; defaults to DATABASE_URL
+    notifications_heartbeat_seconds: int = int(os.getenv("NOTIFICATIONS_HEARTBEAT_SECONDS", "20"))  # Keepalive comment on idle streams
+    notifications_retry_ms: int = int(os.getenv("NOTIFICATIONS_RETRY_MS", "5000"))  # EventSource reconnect delay sent to clients
+    notifications_retention_days: int = int(os.getenv("NOTIFICATIONS_RETENTION_DAYS", "30"))  # Purge read notifications older than this; 0 = keep forever (see core/notifications.py)
+
+    # Reference data cache (see core/cache.py)
+    cache_ttl_seconds: float = float(os.getenv("CACHE_TTL_SECONDS", "300"))  # Upper bound on staleness when invalidations can't arrive
+    cache_listen: bool = os.getenv("CACHE_LISTEN", "true").lower() == "true"  # LISTEN for cross-process invalidations (uses NOTIFICATIONS_LISTEN_URL)
+
+    # Rate limiting (see core/rate_limit.py)
+    rate_limit_backend: str = os.getenv("RATE_LIMIT_BACKEND", "postgres")  # 'postgres' (shared by all processes), 'memory' (per process) or 'off'
+    rate_limit_pool_size: int = int(os.getenv("RATE_LIMIT_POOL_SIZE", "3"))  # Connections of the postgres backend's own pool
+    rate_limit_timeout: float = float(os.getenv("RATE_LIMIT_TIMEOUT", "1.0"))  # Seconds before a check gives up and lets the request through
+    rate_limit_memory_keys: int = int(os.getenv("RATE_LIMIT_MEMORY_KEYS", "100000"))  # Memory backend: purge expired counters beyond this many
+    forwarded_allow_ips: str = os.getenv("FORWARDED_ALLOW_IPS", "127.0.0.1")  # Proxies whose X-Forwarded-For uvicorn trusts for the client IP (comma-separated IPs/CIDRs, '*' when only the platform's proxy can reach the app)
     _cors_origins_raw: str = os.getenv("CORS_ORIGINS", "http://localhost:3000")
     
     # Email/SMTP settings for review requests
@@ -41,12 +78,17 @@ class Settings(BaseSettings):
     frontend_url: str = os.getenv("FRONTEND_URL", "http://localhost:3000")
     
     # Storage configuration (S3 or R2)
-    storage_provider: str = os.getenv("STORAGE_PROVIDER", "s3")  # 's3' or 'r2'
+    storage_provider: str = os.getenv("STORAGE_PROVIDER", "s3")  # 's3', 'r2' or 'local'
     storage_bucket: Optional[str] = os.getenv("STORAGE_BUCKET", None)
     storage_region: Optional[str] = os.getenv("STORAGE_REGION", None)
     storage_access_key_id: Optional[str] = os.getenv("STORAGE_ACCESS_KEY_ID", None)
     storage_secret_access_key: Optional[str] = os.getenv("STORAGE_SECRET_ACCESS_KEY", None)
     storage_endpoint_url: Optional[str] = os.getenv("STORAGE_ENDPOINT_URL", None)  # Required for R2
+    storage_public_url: Optional[str] = os.getenv("STORAGE_PUBLIC_URL", None)  # Public base URL (CDN / custom domain)
+    storage_local_path: str = os.getenv("STORAGE_LOCAL_PATH", "./storage")  # Root folder for the 'local' provider
+
+    # Media derivatives (thumbnails / renditions)
+    media_derivative_workers: int = int(os.getenv("MEDIA_DERIVATIVE_WORKERS", "2"))  # Processes in the resize pool; 0 = run inline
     
     @property
     def cors_origins(self) -> str:
@@ -0,0 +1,257 @@
+"""
+Content mix analytics - weekly category counts per channel account
+
+The summary is computed from post instances on every request and only reads: targets come
+from ContentMixTracking, whose weekly counts are recorded by track_content_mix (a daily
+scheduler task) to keep the history.
+"""
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, and_, func, cast, Date
+from sqlalchemy.dialects.postgresql import insert
+from datetime import date, datetime, timedelta
+from typing import Dict, List, Tuple
+from uuid import UUID
+import logging
+
+from .. import models
+
+logger = logging.getLogger(__name__)
+
+# Maps ContentItem.content_category values onto the four mix buckets
+CATEGORY_BUCKETS = {
+    'diy': 'educational',
+    'blog_post': 'educational',
+    'educational': 'educational',
+    'team_post': 'authority',
+    'authority': 'authority',
+    'coupon': 'promo',
+    'promo': 'promo',
+    'offer': 'promo',
+    'local': 'local_relevance',
+    'local_relevance': 'local_relevance',
+}
+
+BUCKETS = ('educational', 'authority', 'promo', 'local_relevance')
+
+# Bucket -> (count column, target column) on ContentMixTracking
+TRACKING_COLUMNS = {
+    'educational': ('educational_count', 'target_educational'),
+    'authority': ('authority_count', 'target_authority'),
+    'promo': ('promo_count', 'target_promo'),
+    'local_relevance': ('local_relevance_count', 'target_local'),
+}
+
+# Weeks re-recorded by each daily track_content_mix run: the current one and the one just finished
+TRACKED_WEEKS = 2
+
+DEFAULT_TARGETS = {
+    'educational': 2,
+    'authority': 1,
+    'promo': 1,
+    'local_relevance': 1,
+}
+
+
+def get_week_start(d: date) -> date:
+    """Get the Monday of the week containing the given date"""
+    return d - timedelta(days=d.weekday())
+
+
+def get_week_range(today: date, weeks: int) -> List[date]:
+    """Week start dates (oldest first) for the last `weeks` weeks including the current one"""
+    current_week_start = get_week_start(today)
+    return [current_week_start - timedelta(weeks=i) for i in range(weeks - 1, -1, -1)]
+
+
+async def count_content_mix(
+    db: AsyncSession,
+    tenant_id: str,
+    first_week: date,
+    last_week: date
+) -> Dict[Tuple[UUID, date], Dict[str, int]]:
+    """
+    Count scheduled posts per (channel account, week, bucket) in a single grouped query.
+    Returns {(channel_account_id, week_start): {bucket: count}}.
+    """
+    week_start = cast(func.date_trunc('week', models.PostInstance.scheduled_for), Date).label('week_start')
+    range_start = datetime.combine(first_week, datetime.min.time())
+    range_end = datetime.combine(last_week + timedelta(days=7), datetime.min.time())
+
+    result = await db.execute(
+        select(
+            models.PostInstance.channel_account_id,
+            week_start,
+            models.ContentItem.content_category,
+            func.count(models.PostInstance.id),
+        )
+        .join(models.ContentItem, models.PostInstance.content_item_id == models.ContentItem.id)
+        .where(
+            and_(
+                models.PostInstance.tenant_id == tenant_id,
+                models.PostInstance.scheduled_for >= range_start,
+                models.PostInstance.scheduled_for < range_end,
+                models.ContentItem.content_category.in_(list(CATEGORY_BUCKETS.keys()))
+            )
+        )
+        .group_by(models.PostInstance.channel_account_id, week_start, models.ContentItem.content_category)
+    )
+
+    counts: Dict[Tuple[UUID, date], Dict[str, int]] = {}
+    for account_id, week, category, count in result.all():
+        bucket_counts = counts.setdefault((account_id, week), dict.fromkeys(BUCKETS, 0))
+        bucket_counts[CATEGORY_BUCKETS[category]] += count
+    return counts
+
+
+async def load_targets(
+    db: AsyncSession,
+    tenant_id: str,
+    account_ids: List[UUID]
+) -> Dict[UUID, Dict[str, int]]:
+    """Latest configured targets per account from ContentMixTracking (defaults if never tracked)"""
+    targets = {account_id: dict(DEFAULT_TARGETS) for account_id in account_ids}
+    if not account_ids:
+        return targets
+
+    result = await db.execute(
+        select(models.ContentMixTracking)
+        .where(
+            and_(
+                models.ContentMixTracking.tenant_id == tenant_id,
+                models.ContentMixTracking.channel_account_id.in_(account_ids)
+            )
+        )
+        .distinct(models.ContentMixTracking.channel_account_id)
+        .order_by(models.ContentMixTracking.channel_account_id, models.ContentMixTracking.week_start_date.desc())
+    )
+    for row in result.scalars().all():
+        targets[row.channel_account_id] = {
+            bucket: getattr(row, target_col) for bucket, (_, target_col) in TRACKING_COLUMNS.items()
+        }
+    return targets
+
+
+async def save_content_mix(
+    db: AsyncSession,
+    tenant_id: str,
+    week_starts: List[date],
+    account_ids: List[UUID],
+    counts: Dict[Tuple[UUID, date], Dict[str, int]],
+    targets: Dict[UUID, Dict[str, int]]
+):
+    """Upsert weekly counts into ContentMixTracking in one statement (targets on existing rows are kept)"""
+    rows = []
+    for account_id in account_ids:
+        for week in week_starts:
+            bucket_counts = counts.get((account_id, week)) or dict.fromkeys(BUCKETS, 0)
+            row = {
+                'tenant_id': tenant_id,
+                'channel_account_id': account_id,
+                'week_start_date': week,
+            }
+            for bucket, (count_col, target_col) in TRACKING_COLUMNS.items():
+                row[count_col] = bucket_counts[bucket]
+                row[target_col] = targets[account_id][bucket]
+            rows.append(row)
+    if not rows:
+        return
+
+    stmt = insert(models.ContentMixTracking).values(rows)
+    stmt = stmt.on_conflict_do_update(
+        constraint='uq_content_mix_week',
+        set_={
+            **{count_col: stmt.excluded[count_col] for count_col, _ in TRACKING_COLUMNS.values()},
+            'updated_at': func.now(),
+        }
+    )
+    await db.execute(stmt)
+
+
+def assess_mix(bucket_counts: Dict[str, int], targets: Dict[str, int]) -> Tuple[str, List[str]]:
+    """Return (overall_health, warnings) for one week of counts"""
+    warnings = []
+    if bucket_counts['promo'] > targets['promo'] + 1:
+        warnings.append(f"Too many promo posts ({bucket_counts['promo']} vs target {targets['promo']})")
+    if bucket_counts['educational'] < targets['educational']:
+        warnings.append(f"Need more educational content ({bucket_counts['educational']}/{targets['educational']})")
+    if bucket_counts['authority'] < targets['authority']:
+        warnings.append(f"Need more authority/team content ({bucket_counts['authority']}/{targets['authority']})")
+
+    if len(warnings) == 0:
+        overall_health = 'good'
+    elif len(warnings) <= 2:
+        overall_health = 'warning'
+    else:
+        overall_health = 'critical'
+    return overall_health, warnings
+
+
+async def compute_content_mix(
+    db: AsyncSession,
+    tenant_id: str,
+    weeks: int,
+    today: date | None = None
+) -> List[dict]:
+    """
+    Compute the content mix for every channel account of a tenant over the last `weeks` weeks.
+
+    All weeks come from one grouped query. Returns one dict per account with the current
+    week's summary and the per-week history (oldest first).
+    """
+    week_starts = get_week_range(today or date.today(), weeks)
+    current_week_start = week_starts[-1]
+
+    accounts_result = await db.execute(
+        select(models.ChannelAccount.id, models.ChannelAccount.name)
+        .where(models.ChannelAccount.tenant_id == tenant_id)
+    )
+    accounts = accounts_result.all()
+    account_ids = [account_id for account_id, _ in accounts]
+
+    counts = await count_content_mix(db, tenant_id, week_starts[0], current_week_start)
+    targets = await load_targets(db, tenant_id, account_ids)
+
+    summaries = []
+    for account_id, account_name in accounts:
+        account_targets = targets[account_id]
+        history = []
+        for week in week_starts:
+            bucket_counts = counts.get((account_id, week)) or dict.fromkeys(BUCKETS, 0)
+            history.append({'week_start_date': week, **{f'{bucket}_count': bucket_counts[bucket] for bucket in BUCKETS}})
+
+        current = counts.get((account_id, current_week_start)) or dict.fromkeys(BUCKETS, 0)
+        overall_health, warnings = assess_mix(current, account_targets)
+
+        summary = {
+            'channel_account_id': account_id,
+            'channel_account_name': account_name,
+            'week_start_date': current_week_start,
+            'overall_health': overall_health,
+            'warnings': warnings,
+            'history': history,
+        }
+        for bucket in BUCKETS:
+            target = account_targets[bucket]
+            summary[bucket] = {
+                'actual': current[bucket],
+                'target': target,
+                'percentage': (current[bucket] / target * 100) if target > 0 else 0
+            }
+        summaries.append(summary)
+
+    return summaries
+
+
+async def track_content_mix(db: AsyncSession, tenant_id: str, weeks: int, today: date | None = None):
+    """Record the last `weeks` weeks of counts for every channel account of a tenant"""
+    week_starts = get_week_range(today or date.today(), weeks)
+
+    accounts_result = await db.execute(
+        select(models.ChannelAccount.id).where(models.ChannelAccount.tenant_id == tenant_id)
+    )
+    account_ids = list(accounts_result.scalars().all())
+
+    counts = await count_content_mix(db, tenant_id, week_starts[0], week_starts[-1])
+    targets = await load_targets(db, tenant_id, account_ids)
+    await save_content_mix(db, tenant_id, week_starts, account_ids, counts, targets)
+    await db.commit()
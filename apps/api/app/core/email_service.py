@@ -6,9 +6,21 @@ from typing import Optional
 import logging
 
 from .config import settings
+from . import metrics
 
 logger = logging.getLogger(__name__)
 
+def _send_message(msg: MIMEMultipart, kind: str):
+    """Deliver a message over SMTP, recording the connect + send time"""
+    with metrics.smtp_send_duration.time(kind=kind, outcome='error') as labels:
+        with smtplib.SMTP(settings.smtp_host, settings.smtp_port or 587) as server:
+            if settings.smtp_use_tls:
+                server.starttls()
+            if settings.smtp_user and settings.smtp_password:
+                server.login(settings.smtp_user, settings.smtp_password)
+            server.send_message(msg)
+        labels['outcome'] = 'ok'
+
 def send_review_request_email(
     to_email: str,
     customer_name: str,
@@ -80,12 +92,7 @@ def send_review_request_email(
         msg.attach(part2)
         
         # Send email
-        with smtplib.SMTP(settings.smtp_host, settings.smtp_port or 587) as server:
-            if settings.smtp_use_tls:
-                server.starttls()
-            if settings.smtp_user and settings.smtp_password:
-                server.login(settings.smtp_user, settings.smtp_password)
-            server.send_message(msg)
+        _send_message(msg, 'review_request')
         
         logger.info(f"Review request email sent to {to_email}")
         return True
@@ -158,12 +165,7 @@ def send_review_reminder_email(
         msg.attach(part1)
         msg.attach(part2)
         
-        with smtplib.SMTP(settings.smtp_host, settings.smtp_port or 587) as server:
-            if settings.smtp_use_tls:
-                server.starttls()
-            if settings.smtp_user and settings.smtp_password:
-                server.login(settings.smtp_user, settings.smtp_password)
-            server.send_message(msg)
+        _send_message(msg, 'review_reminder')
         
         logger.info(f"Review reminder email sent to {to_email}")
         return True
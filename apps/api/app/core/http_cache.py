@@ -0,0 +1,90 @@
+"""
+Conditional GET for read-mostly endpoints: weak ETags from the data's version, 304 on a match
+
+A route computes a cheap version of the rows it is about to return - count(*) and
+max(updated_at) over the same filters, one aggregate, no ORM rows - and calls not_modified()
+before running its real query:
+
+    version = await http_cache.table_version(db, models.Builder)
+    if cached := http_cache.not_modified(request, response, version, http_cache.PRIVATE):
+        return cached
+
+Inserts and updates move max(updated_at) (server default / onupdate now()); deletes move the
+count. The ETag also covers the path and query string (pagination, filters) and any extra
+inputs the response depends on, such as today's date for "active"/"upcoming" lists.
+
+Last-Modified is sent for information, but If-Modified-Since is not evaluated: a delete
+does not move max(updated_at), so only the ETag can tell that a list changed.
+"""
+import hashlib
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from email.utils import format_datetime
+from typing import Optional, Tuple
+
+from fastapi import Request, Response
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+# Cache-Control presets. no-cache still allows storing: clients revalidate every time and get 304s.
+PRIVATE = "private, no-cache"
+PRIVATE_SHORT = "private, max-age=60, must-revalidate"
+PUBLIC_CDN = "public, max-age=60, s-maxage=300, stale-while-revalidate=600"
+
+
+@dataclass(frozen=True)
+class Version:
+    count: int
+    updated_at: Optional[datetime]
+
+
+async def table_version(db: AsyncSession, model, *conditions) -> Version:
+    """count(*) and max(updated_at) of `model` rows matching `conditions`"""
+    query = select(func.count(), func.max(model.updated_at)).select_from(model)
+    if conditions:
+        query = query.where(*conditions)
+    count, updated_at = (await db.execute(query)).one()
+    return Version(int(count or 0), updated_at)
+
+
+def weak_etag(request: Request, version: Version, extra: Tuple = ()) -> str:
+    parts = [
+        request.url.path,
+        '&'.join(sorted(f"{key}={value}" for key, value in request.query_params.multi_items())),
+        str(version.count),
+        version.updated_at.isoformat() if version.updated_at else '',
+        *(str(part) for part in extra),
+    ]
+    digest = hashlib.sha1('|'.join(parts).encode()).hexdigest()[:20]
+    return f'W/"{digest}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Weak comparison (RFC 9110 13.1.2): W/ prefixes are ignored"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == '*':
+        return True
+    opaque = etag.removeprefix('W/')
+    return any(candidate.strip().removeprefix('W/') == opaque for candidate in if_none_match.split(','))
+
+
+def not_modified(
+    request: Request,
+    response: Response,
+    version: Version,
+    cache_control: str = PRIVATE,
+    extra: Tuple = ()
+) -> Optional[Response]:
+    """
+    A 304 response when the client's If-None-Match still matches, otherwise None after setting
+    ETag, Last-Modified and Cache-Control on `response` for the full answer.
+    `extra`: other inputs the response depends on (e.g. today's date).
+    """
+    headers = {'ETag': weak_etag(request, version, extra), 'Cache-Control': cache_control}
+    if version.updated_at:
+        headers['Last-Modified'] = format_datetime(version.updated_at.astimezone(timezone.utc), usegmt=True)
+    if etag_matches(request.headers.get('if-none-match'), headers['ETag']):
+        return Response(status_code=304, headers=headers)
+    response.headers.update(headers)
+    return None
@@ -0,0 +1,134 @@
+"""
+Feature router mounting - eagerly at startup, or lazily on the first request under a router's prefix
+
+Lazy mounting keeps serverless cold starts short: a request to /api/v1/marketing/... imports and
+mounts only the marketing routers. Routes are inserted at the position eager mounting would have
+given them, so route precedence is identical in both modes.
+
+Splicing relies on include_router flattening a router into prefixed APIRoutes; FastAPI 0.141+
+nests included routers instead, hence the upper bound on fastapi in requirements.txt.
+"""
+import re
+import logging
+import threading
+from typing import Callable, Dict, List, Optional, Tuple, Union
+
+from fastapi import APIRouter, FastAPI
+
+logger = logging.getLogger(__name__)
+
+RouterModule = Tuple[str, dict, List[str]]
+
+
+def include_feature_router(
+    app: Union[FastAPI, APIRouter],
+    router: APIRouter,
+    include_kwargs: dict,
+    api_prefix: str
+):
+    """Include a feature router on the app (or a router) under the API prefix"""
+    kwargs = dict(include_kwargs)
+    kwargs['prefix'] = api_prefix + kwargs.get('prefix', '')
+    app.include_router(router, **kwargs)
+
+
+def mount_feature_routers(
+    app: FastAPI,
+    modules: List[RouterModule],
+    loader: Callable[[str], Optional[APIRouter]],
+    api_prefix: str
+):
+    """Import and mount every feature router now (long-running servers)"""
+    for module_name, include_kwargs, _ in modules:
+        router = loader(module_name)
+        if router is not None:
+            include_feature_router(app, router, include_kwargs, api_prefix)
+
+
+def _prefix_pattern(api_prefix: str, prefix: str) -> re.Pattern:
+    """'/jobs/{job_id}/tasks' -> regex matching that path and anything below it"""
+    parts = re.split(r'(\{[^}]+\})', api_prefix + prefix)
+    body = ''.join('[^/]+' if part.startswith('{') else re.escape(part) for part in parts)
+    return re.compile(f'^{body}(/|$)')
+
+
+class LazyRouterMounts:
+    """Tracks which feature routers are mounted and mounts the ones a path needs"""
+
+    def __init__(
+        self,
+        app: FastAPI,
+        modules: List[RouterModule],
+        loader: Callable[[str], Optional[APIRouter]],
+        api_prefix: str
+    ):
+        self.app = app
+        self.modules = modules
+        self.loader = loader
+        self.api_prefix = api_prefix
+        self.patterns = [
+            (module_name, [_prefix_pattern(api_prefix, prefix) for prefix in prefixes])
+            for module_name, _, prefixes in modules
+        ]
+        # Feature routes go before everything included after this point (the core API routes)
+        self.base_index = len(app.router.routes)
+        self.route_counts: Dict[str, int] = {}
+        self.lock = threading.Lock()
+
+    def is_mounted(self, module_name: str) -> bool:
+        return module_name in self.route_counts
+
+    def mount(self, module_name: str):
+        """Import one feature router and splice its routes in at their eager-mount position"""
+        with self.lock:
+            if self.is_mounted(module_name):
+                return
+            router = self.loader(module_name)
+            if router is None:
+                # Failed imports are not retried on every request
+                self.route_counts[module_name] = 0
+                return
+
+            include_kwargs = next(kwargs for name, kwargs, _ in self.modules if name == module_name)
+            # Build the prefixed routes on a scratch router rather than diffing the app's list
+            scratch = APIRouter()
+            include_feature_router(scratch, router, include_kwargs, self.api_prefix)
+            added = scratch.routes
+            routes = self.app.router.routes
+
+            insert_at = self.base_index
+            for name, _, _ in self.modules:
+                if name == module_name:
+                    break
+                insert_at += self.route_counts.get(name, 0)
+            routes[insert_at:insert_at] = added
+
+            self.route_counts[module_name] = len(added)
+            self.app.openapi_schema = None
+            logger.info(f"Mounted {module_name} routes ({len(added)} routes)")
+
+    def mount_all(self):
+        for module_name, _, _ in self.modules:
+            self.mount(module_name)
+
+    def mount_for_path(self, path: str):
+        """Mount every feature router serving this path (the OpenAPI docs need all of them)"""
+        if path in (self.app.openapi_url, self.app.docs_url, self.app.redoc_url):
+            self.mount_all()
+            return
+        for module_name, patterns in self.patterns:
+            if not self.is_mounted(module_name) and any(pattern.match(path) for pattern in patterns):
+                self.mount(module_name)
+
+
+class LazyRouterMiddleware:
+    """ASGI middleware that mounts feature routers before the request is routed"""
+
+    def __init__(self, app, mounts: LazyRouterMounts):
+        self.app = app
+        self.mounts = mounts
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] in ('http', 'websocket'):
+            self.mounts.mount_for_path(scope['path'])
+        await self.app(scope, receive, send)
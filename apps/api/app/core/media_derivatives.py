@@ -0,0 +1,178 @@
+"""
+Media derivatives - thumbnails, web-optimized and platform-sized renditions for MediaAsset
+
+Resizing is CPU-bound, so it runs in a process pool (MEDIA_DERIVATIVE_WORKERS) while storage
+I/O runs in worker threads. Renditions are written next to the original as
+<original key>.<rendition>.jpg and their URLs recorded on MediaAsset.renditions.
+"""
+import io
+import asyncio
+import logging
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Optional, Tuple
+from uuid import UUID
+
+from sqlalchemy import select
+
+from .config import settings
+from .. import models
+
+logger = logging.getLogger(__name__)
+
+# name -> (max width, max height, allowed aspect ratio range or None, JPEG quality)
+RENDITIONS: Dict[str, Tuple[int, int, Optional[Tuple[float, float]], int]] = {
+    'thumbnail': (400, 400, None, 80),
+    'web': (1600, 1600, None, 82),
+    'instagram': (1080, 1350, (4 / 5, 1.91), 90),  # Instagram feed rejects ratios outside 4:5..1.91:1
+    'facebook': (2048, 2048, None, 90),
+}
+
+# Channel key fragment -> rendition the publisher should send
+PLATFORM_RENDITIONS = {
+    'instagram': 'instagram',
+    'facebook': 'facebook',
+    'google': 'web',
+    'gmb': 'web',
+}
+
+# Only still images are resized; GIFs keep their animation as-is
+DERIVABLE_MIME_TYPES = ['image/jpeg', 'image/png', 'image/webp']
+
+_process_pool: Optional[ProcessPoolExecutor] = None
+
+
+def get_process_pool() -> Optional[ProcessPoolExecutor]:
+    """Get the shared resize pool (None when MEDIA_DERIVATIVE_WORKERS is 0)"""
+    global _process_pool
+    if _process_pool is None and settings.media_derivative_workers > 0:
+        _process_pool = ProcessPoolExecutor(max_workers=settings.media_derivative_workers)
+    return _process_pool
+
+
+def shutdown_process_pool():
+    """Stop the resize pool (called on app shutdown)"""
+    global _process_pool
+    if _process_pool is not None:
+        _process_pool.shutdown(wait=False, cancel_futures=True)
+        _process_pool = None
+
+
+def _crop_to_aspect(img, min_ratio: float, max_ratio: float):
+    """Center-crop an image whose width/height ratio falls outside [min_ratio, max_ratio]"""
+    width, height = img.size
+    ratio = width / height
+    if ratio < min_ratio:
+        new_height = int(width / min_ratio)
+        top = (height - new_height) // 2
+        return img.crop((0, top, width, top + new_height))
+    if ratio > max_ratio:
+        new_width = int(height * max_ratio)
+        left = (width - new_width) // 2
+        return img.crop((left, 0, left + new_width, height))
+    return img
+
+
+def render_derivatives(content: bytes) -> Dict[str, bytes]:
+    """
+    Build every rendition of an image as JPEG bytes (runs inside the process pool)
+
+    Images are never upscaled; EXIF orientation is applied and transparency is flattened onto white.
+    """
+    from PIL import Image, ImageOps
+
+    renditions = {}
+    with Image.open(io.BytesIO(content)) as source:
+        img = ImageOps.exif_transpose(source)
+        if img.mode in ('RGBA', 'LA') or (img.mode == 'P' and 'transparency' in img.info):
+            img = img.convert('RGBA')
+            background = Image.new('RGB', img.size, (255, 255, 255))
+            background.paste(img, mask=img.split()[-1])
+            img = background
+        elif img.mode != 'RGB':
+            img = img.convert('RGB')
+
+        for name, (max_width, max_height, aspect, quality) in RENDITIONS.items():
+            rendition = _crop_to_aspect(img, *aspect) if aspect else img.copy()
+            rendition.thumbnail((max_width, max_height), Image.LANCZOS)
+            buffer = io.BytesIO()
+            rendition.save(buffer, 'JPEG', quality=quality, optimize=True, progressive=True)
+            renditions[name] = buffer.getvalue()
+    return renditions
+
+
+def rendition_key(object_key: str, name: str) -> str:
+    """Storage key of a rendition: photos/abc.png -> photos/abc.thumbnail.jpg"""
+    base, _ = os.path.splitext(object_key)
+    return f"{base}.{name}.jpg"
+
+
+def store_renditions(object_key: str, renditions: Dict[str, bytes]) -> Dict[str, str]:
+    """Upload rendered JPEGs next to the original (blocking); returns {name: url}"""
+    from .storage import put_bytes
+
+    return {
+        name: put_bytes(content, rendition_key(object_key, name), 'image/jpeg')
+        for name, content in renditions.items()
+    }
+
+
+def needs_derivatives(mime_type: Optional[str], object_key: Optional[str]) -> bool:
+    """Whether a freshly uploaded asset should go through the pipeline"""
+    return bool(object_key) and mime_type in DERIVABLE_MIME_TYPES
+
+
+async def build_renditions(object_key: str) -> Dict[str, str]:
+    """Download the original, resize in the process pool and upload the renditions"""
+    from .storage import download_bytes
+
+    content = await asyncio.to_thread(download_bytes, object_key)
+    pool = get_process_pool()
+    if pool is not None:
+        renditions = await asyncio.get_running_loop().run_in_executor(pool, render_derivatives, content)
+    else:
+        renditions = await asyncio.to_thread(render_derivatives, content)
+    return await asyncio.to_thread(store_renditions, object_key, renditions)
+
+
+async def generate_media_derivatives(media_asset_id: UUID):
+    """
+    Produce and record renditions for one MediaAsset
+
+    Run as a background task after upload; uses its own session so it outlives the request.
+    Failures are logged and recorded as derivatives_status='failed' - the original stays usable.
+    """
+    from ..db.session import AsyncSessionLocal
+
+    async with AsyncSessionLocal() as db:
+        result = await db.execute(select(models.MediaAsset).where(models.MediaAsset.id == media_asset_id))
+        asset = result.scalar_one_or_none()
+        if not asset:
+            return
+        if not needs_derivatives(asset.mime_type, asset.object_key):
+            asset.derivatives_status = 'skipped'
+            await db.commit()
+            return
+
+        try:
+            asset.renditions = await build_renditions(asset.object_key)
+            asset.derivatives_status = 'ready'
+            logger.info(f"✓ Generated {len(asset.renditions)} renditions for media asset {asset.id}")
+        except Exception as e:
+            asset.derivatives_status = 'failed'
+            logger.error(f"Failed to generate renditions for media asset {asset.id}: {e}", exc_info=True)
+        await db.commit()
+
+
+def get_rendition_url(asset: models.MediaAsset, name: str) -> str:
+    """URL of a named rendition, falling back to the original"""
+    return (asset.renditions or {}).get(name) or asset.file_url
+
+
+def get_platform_media_url(asset: models.MediaAsset, channel_key: Optional[str]) -> str:
+    """URL of the rendition sized for a channel (e.g. 'instagram_business'), falling back to the original"""
+    channel_key = (channel_key or '').lower()
+    for fragment, name in PLATFORM_RENDITIONS.items():
+        if fragment in channel_key:
+            return get_rendition_url(asset, name)
+    return asset.file_url
@@ -0,0 +1,172 @@
+"""
+Real-time notification push: Postgres LISTEN/NOTIFY -> per-process hub -> /notifications/stream
+
+create_notification() (core/notifications.py) and the read endpoints call announce_created()
+/ announce_read() inside their transaction. pg_notify() is
+transactional: listeners hear about a notification once it is committed and never about a
+rolled-back one, whichever process (web, scheduler) wrote it. Each web process listens on the
+channel through its shared LISTEN connection (NotificationHub.listen(), core/pg_listener.py)
+and fans events out to the SSE subscribers they concern.
+
+Unread counts are not cached here. /notifications/unread-count and the stream's opening
+`unread` event read notification_unread_counts (kept by triggers on notifications, see
+db/notification_counts.py), a primary key lookup per recipient:
+
+    unread(user) = personal row (user_id) + broadcast row (tenant_id, nil user_id)
+
+A counter moved by events would have to be seeded from such a read, and an event can arrive
+after a count that already includes it (or be missed before the count) - there is no way to
+tell which from a NOTIFY. So events don't carry a count; clients re-read it when one arrives.
+"""
+import asyncio
+import json
+import logging
+from datetime import datetime, timezone
+from typing import Optional, Set, Tuple
+from uuid import UUID
+
+from sqlalchemy import and_, func, literal, or_, select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from . import metrics
+
+logger = logging.getLogger(__name__)
+
+CHANNEL = 'app_notifications'
+TITLE_LIMIT = 200  # pg_notify payloads are capped at 8000 bytes
+QUEUE_SIZE = 100  # Events buffered per subscriber; the oldest are dropped beyond that
+
+notification_events = metrics.registry.register(metrics.Counter(
+    'notification_events_total', 'Notification events received over LISTEN', ('event',)
+))
+
+
+def _uuid(value) -> Optional[str]:
+    return str(value) if value else None
+
+
+async def announce(db: AsyncSession, event: dict):
+    """Queue a NOTIFY on the session's transaction - delivered when it commits"""
+    await db.execute(
+        text("SELECT pg_notify(:channel, :payload)"),
+        {'channel': CHANNEL, 'payload': json.dumps(event, default=str)}
+    )
+
+
+async def announce_created(db: AsyncSession, notification):
+    """Call after the notification is flushed (so it has an id), before commit"""
+    await announce(db, {
+        'event': 'created',
+        'id': _uuid(notification.id),
+        'tenant_id': notification.tenant_id,
+        'user_id': _uuid(notification.user_id),
+        'type': notification.type,
+        'title': (notification.title or '')[:TITLE_LIMIT],
+        'entity_type': notification.entity_type,
+        'entity_id': _uuid(notification.entity_id),
+        'created_at': datetime.now(timezone.utc).isoformat(),
+    })
+
+
+async def announce_read(db: AsyncSession, tenant_id: str, user_id, count: int):
+    """`count` notifications of one user (or tenant-wide ones, user_id None) were marked read"""
+    if count:
+        await announce(db, {'event': 'read', 'tenant_id': tenant_id, 'user_id': _uuid(user_id), 'count': count})
+
+
+async def count_unread(db: AsyncSession, user_id: Optional[str], tenant_id: Optional[str]) -> Tuple[int, int]:
+    """(personal, tenant-wide) unread counts from the trigger-maintained notification_unread_counts"""
+    from .. import models
+
+    c = models.NotificationUnreadCount
+    user_uuid = None
+    if user_id:
+        try:
+            user_uuid = UUID(user_id)
+        except ValueError:
+            pass
+    conditions = []
+    if user_uuid:
+        conditions.append(c.user_id == user_uuid)
+    if tenant_id:
+        conditions.append(and_(c.tenant_id == tenant_id, c.user_id == models.NOTIFICATION_BROADCAST))
+    if not conditions:
+        return 0, 0
+
+    # A primary key lookup per recipient, however many notifications they have
+    res = await db.execute(
+        select(
+            func.sum(c.unread).filter(c.user_id == user_uuid) if user_uuid else literal(0),
+            func.sum(c.unread).filter(c.user_id == models.NOTIFICATION_BROADCAST),
+        ).where(or_(*conditions))
+    )
+    personal, broadcast = res.one()
+    return int(personal or 0), int(broadcast or 0)
+
+
+class Subscription:
+    """One open stream: events for a user (and their tenant's broadcasts)"""
+
+    def __init__(self, user_id: Optional[str], tenant_id: Optional[str]):
+        self.user_id = user_id
+        self.tenant_id = tenant_id
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=QUEUE_SIZE)
+
+    def wants(self, event: dict) -> bool:
+        if event.get('user_id'):
+            return event['user_id'] == self.user_id
+        return bool(self.tenant_id) and event.get('tenant_id') == self.tenant_id
+
+
+class NotificationHub:
+    """Per-process stream subscribers, fed from the shared LISTEN connection"""
+
+    def __init__(self):
+        self.subscriptions: Set[Subscription] = set()
+
+    # Subscribers
+
+    def subscribe(self, user_id: Optional[str], tenant_id: Optional[str]) -> Subscription:
+        subscription = Subscription(user_id, tenant_id)
+        self.subscriptions.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        self.subscriptions.discard(subscription)
+
+    async def unread(self, db: AsyncSession, user_id: Optional[str], tenant_id: Optional[str]) -> int:
+        personal, broadcast = await count_unread(db, user_id, tenant_id)
+        return personal + broadcast
+
+    def dispatch(self, event: dict):
+        for subscription in list(self.subscriptions):
+            if not subscription.wants(event):
+                continue
+            if subscription.queue.full():
+                subscription.queue.get_nowait()  # A stalled client loses its oldest event, not new ones
+            subscription.queue.put_nowait(event)
+
+    # Listener
+
+    def _on_notify(self, payload: str):
+        try:
+            event = json.loads(payload)
+        except ValueError:
+            logger.warning(f"⚠ Ignoring malformed notification payload: {payload[:100]}")
+            return
+        notification_events.inc(event=event.get('event', 'unknown'))
+        self.dispatch(event)
+
+    def listen(self):
+        """Receive events through the process's shared LISTEN connection"""
+        from .pg_listener import listener
+
+        listener.register(CHANNEL, self._on_notify)
+
+
+hub = NotificationHub()
+
+metrics.registry.register(metrics.Gauge(
+    'notification_stream_subscribers', 'Open /notifications/stream connections',
+    callback=lambda: {(): len(hub.subscriptions)}
+))
@@ -0,0 +1,142 @@
+"""
+Notification lifecycle: dedupe, digesting and retention
+
+Alerts about an entity (overdue job, stale service call, assignment, ...) carry a dedupe key
+
+    <type>:<entity_type>:<entity_id>:<tenant_id>:<user_id, or * for tenant-wide>
+
+and are upserted on it. A repeat of the same alert does not add a row: it bumps the digest
+row's `occurrences`, refreshes its title, message and created_at (so it resurfaces at the top
+of the list) and marks it unread again. The hourly overdue check and the 6-hourly escalation
+therefore keep one row per item and recipient, however long the item stays overdue or stale.
+`first_occurred_at` records when the alert started. Notifications without an entity (the daily
+summary) are plain inserts.
+
+purge_read_notifications() deletes read notifications older than NOTIFICATIONS_RETENTION_DAYS
+(maintain_notifications job, daily) in batches, so no statement holds locks on many rows.
+"""
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+from sqlalchemy import delete, func, select, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from .. import models
+from . import notification_stream
+
+logger = logging.getLogger(__name__)
+
+PURGE_BATCH_SIZE = 5000
+
+
+def dedupe_key(notification_type: str, entity_type: Optional[str], entity_id, tenant_id: str, user_id) -> Optional[str]:
+    """Key of a repeatable alert, or None for notifications that aren't about an entity"""
+    if not entity_id:
+        return None
+    # Same expression as the 0036 backfill
+    return f"{notification_type}:{entity_type or ''}:{entity_id}:{tenant_id}:{user_id or '*'}"
+
+
+async def _bump(db: AsyncSession, key: str, title: str, message: str):
+    """Fold a repeat into the existing row: (id, was_read) or None if there is no row yet"""
+    n = models.Notification
+    # Lock and read the row in the same statement: `was_read` is the state this update replaced
+    previous = select(n.id, n.read).where(n.dedupe_key == key).with_for_update().subquery('previous')
+    result = await db.execute(
+        update(n)
+        .where(n.id == previous.c.id)
+        .values(
+            occurrences=n.occurrences + 1,
+            title=title,
+            message=message,
+            read=False,
+            created_at=func.now(),
+        )
+        .returning(n.id, previous.c.read.label('was_read'))
+        .execution_options(synchronize_session=False)
+    )
+    return result.first()
+
+
+async def create_notification(
+    db: AsyncSession,
+    tenant_id: str,
+    notification_type: str,
+    title: str,
+    message: str,
+    entity_type: str = None,
+    entity_id: str = None,
+    user_id: str = None
+):
+    """Create a notification, or fold a repeated alert into its digest row, and commit"""
+    key = dedupe_key(notification_type, entity_type, entity_id, tenant_id, user_id)
+    if key is None:
+        notification = models.Notification(
+            tenant_id=tenant_id,
+            user_id=user_id,
+            type=notification_type,
+            title=title,
+            message=message,
+            entity_type=entity_type,
+            entity_id=entity_id,
+            read=False
+        )
+        db.add(notification)
+        await db.flush()
+        await notification_stream.announce_created(db, notification)  # Delivered to open streams on commit
+        await db.commit()
+        return notification
+
+    n = models.Notification
+    bumped = await _bump(db, key, title, message)
+    if bumped:
+        notification_id, announce = bumped.id, bumped.was_read
+    else:
+        result = await db.execute(
+            insert(n)
+            .values(
+                tenant_id=tenant_id,
+                user_id=user_id,
+                type=notification_type,
+                title=title,
+                message=message,
+                entity_type=entity_type,
+                entity_id=entity_id,
+                read=False,
+                dedupe_key=key,
+            )
+            .on_conflict_do_nothing(index_elements=[n.dedupe_key], index_where=n.dedupe_key.isnot(None))
+            .returning(n.id)
+        )
+        notification_id, announce = result.scalar(), True
+        if notification_id is None:
+            # A concurrent writer inserted the first occurrence; it is ours to bump now
+            bumped = await _bump(db, key, title, message)
+            notification_id, announce = bumped.id, bumped.was_read
+
+    result = await db.execute(select(n).where(n.id == notification_id).execution_options(populate_existing=True))
+    notification = result.scalar_one()
+    # Only a new or reopened row changes the unread counts; repeats of an unread alert are silent
+    if announce:
+        await notification_stream.announce_created(db, notification)
+    await db.commit()
+    return notification
+
+
+async def purge_read_notifications(db: AsyncSession, retention_days: int, batch_size: int = PURGE_BATCH_SIZE) -> int:
+    """Delete read notifications last raised more than `retention_days` ago; returns the number removed"""
+    n = models.Notification
+    cutoff = datetime.now(timezone.utc) - timedelta(days=retention_days)
+    removed = 0
+    while True:
+        # Bare `read` (not `read = $1`) so the planner can use the partial ix_notifications_read_purge
+        batch = select(n.id).where(n.read, n.created_at < cutoff).limit(batch_size).scalar_subquery()
+        result = await db.execute(
+            delete(n).where(n.id.in_(batch)).execution_options(synchronize_session=False)
+        )
+        await db.commit()
+        removed += result.rowcount
+        if result.rowcount < batch_size:
+            return removed
@@ -0,0 +1,110 @@
+"""
+One Postgres LISTEN connection per process, shared by every channel the process listens on
+
+    listener.register('app_cache', on_invalidation, resync=clear_all)
+    await listener.run_forever()   # runtime.py, once any channel is registered
+
+Payloads are dispatched to the handler registered for their channel. The connection is kept
+alive with a SELECT 1 every KEEPALIVE_SECONDS and reopened with exponential backoff. NOTIFYs
+sent while it is down are lost, so each channel's `resync` runs whenever the connection is
+established or lost - a cache, say, drops whatever it may have missed invalidations for.
+
+LISTEN needs a session-level connection. Behind pgbouncer in transaction mode, set
+NOTIFICATIONS_LISTEN_URL to a direct database URL.
+"""
+import asyncio
+import logging
+from typing import Callable, Dict, Optional, Tuple
+
+from .config import settings
+
+logger = logging.getLogger(__name__)
+
+KEEPALIVE_SECONDS = 30
+MAX_RECONNECT_DELAY = 30
+
+Handler = Callable[[str], None]
+
+
+def listen_dsn() -> str:
+    """Plain postgresql:// DSN for asyncpg.connect"""
+    url = settings.notifications_listen_url or settings.database_url
+    return url.replace('postgresql+asyncpg://', 'postgresql://', 1)
+
+
+class PgListener:
+    """The process's LISTEN connection and the handler for each channel"""
+
+    def __init__(self):
+        self.channels: Dict[str, Tuple[Handler, Optional[Callable[[], None]]]] = {}
+        self.connected = False
+        self.stopping = False
+        self._stop = asyncio.Event()
+
+    def register(self, channel: str, handler: Handler, resync: Optional[Callable[[], None]] = None):
+        """Deliver `channel` payloads to handler; call before run_forever()"""
+        self.channels[channel] = (handler, resync)
+
+    def _on_notify(self, connection, pid, channel, payload):
+        handler, _ = self.channels.get(channel, (None, None))
+        if handler is None:
+            return
+        try:
+            handler(payload)
+        except Exception as e:
+            logger.warning(f"⚠ Error handling notification on '{channel}': {e}")
+
+    def _resync(self):
+        for channel, (_, resync) in self.channels.items():
+            if resync is None:
+                continue
+            try:
+                resync()
+            except Exception as e:
+                logger.warning(f"⚠ Error resyncing '{channel}': {e}")
+
+    async def run_forever(self):
+        """Hold the LISTEN connection, reconnecting with backoff until stop()"""
+        import asyncpg
+
+        attempt = 0
+        while not self.stopping:
+            connection = None
+            try:
+                connection = await asyncpg.connect(listen_dsn())
+                for channel in self.channels:
+                    await connection.add_listener(channel, self._on_notify)
+                self._resync()  # Notifications may have been missed while disconnected
+                self.connected = True
+                attempt = 0
+                logger.info(f"✓ Listening on {', '.join(repr(channel) for channel in self.channels)}")
+                while not self.stopping:
+                    try:
+                        await asyncio.wait_for(self._stop.wait(), timeout=KEEPALIVE_SECONDS)
+                    except asyncio.TimeoutError:
+                        await connection.execute('SELECT 1')  # Raises once the connection is gone
+            except Exception as e:
+                if not self.stopping:
+                    logger.warning(f"⚠ LISTEN connection lost: {e}")
+            finally:
+                if self.connected:
+                    self._resync()
+                self.connected = False
+                if connection is not None:
+                    try:
+                        await connection.close(timeout=5)
+                    except Exception:
+                        pass
+            if not self.stopping:
+                attempt += 1
+                try:
+                    await asyncio.wait_for(self._stop.wait(), timeout=min(MAX_RECONNECT_DELAY, 2 ** attempt))
+                except asyncio.TimeoutError:
+                    pass
+
+    async def stop(self):
+        self.stopping = True
+        self._stop.set()
+
+
+listener = PgListener()
@@ -0,0 +1,159 @@
+"""
+Portal suggestions from an in-memory rule index instead of per-request rule queries
+
+The job and service call forms ask which portal accounts apply to a record on every render.
+The answer depends only on the portal rules, the active portal accounts and the builder links,
+a few hundred rows that change a few times a month. PortalRuleIndex holds them precompiled:
+
+- builder-linked accounts per (builder, tenant)
+- active rules per (applies_to, tenant), already sorted by priority, each reduced to its
+  match fields and account. A rule can only ever suggest its own account, so it is filed
+  under that account's tenant and dropped when the account is inactive or belongs to
+  another tenant than the rule names.
+
+Suggestions are then pure Python, memoized per PortalQuery (applies_to, tenant, builder, city,
+county, phase, permit, exact) and cheap enough to run for a whole import or list page at once.
+
+The index lives in the 'portal_rule_index' cache (core/cache.py): the portal rule, account,
+definition and builder link writes in crud.py invalidate it, and the next suggestion rebuilds
+it with three queries.
+"""
+from collections import defaultdict
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+from uuid import UUID
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+
+from .. import models, schemas
+from . import cache
+
+MAX_MEMOIZED = 10000  # Distinct queries remembered per index build
+
+
+class PortalQuery(NamedTuple):
+    """
+    What a job or service call is matched on. Fields left None match any rule, unless `exact`:
+    then they only match rules that leave the field open too. Batch lookups from stored records
+    are exact, since a record without a county (or a permit decision) is not in every county.
+    """
+    applies_to: str
+    tenant_id: str
+    builder_id: Optional[UUID] = None
+    city: Optional[str] = None
+    county: Optional[str] = None
+    phase: Optional[str] = None
+    permit_required: Optional[bool] = None
+    exact: bool = False
+
+    def normalized(self) -> 'PortalQuery':
+        # Empty strings never filtered in the old queries either
+        return self._replace(city=self.city or None, county=self.county or None, phase=self.phase or None)
+
+
+@dataclass(frozen=True)
+class CompiledRule:
+    builder_id: Optional[UUID]
+    city: Optional[str]
+    county: Optional[str]
+    phase: Optional[str]
+    permit_required: Optional[bool]
+    account_id: UUID
+
+    def matches(self, query: PortalQuery) -> bool:
+        # A rule field set to NULL matches anything; a query field left out matches any rule (unless exact)
+        return all(
+            wanted is None or (value is None and not query.exact) or wanted == value
+            for wanted, value in (
+                (self.builder_id, query.builder_id),
+                (self.city, query.city),
+                (self.county, query.county),
+                (self.phase, query.phase),
+                (self.permit_required, query.permit_required),
+            )
+        )
+
+
+class PortalRuleIndex:
+    def __init__(
+        self,
+        accounts: Iterable[schemas.PortalAccountOut],
+        builder_links: Iterable[Tuple[UUID, UUID]],
+        rules: Iterable[models.PortalRule],
+    ):
+        # Active accounts only, oldest first (the tie-breaker for builder links and equal priorities)
+        self.accounts: Dict[UUID, schemas.PortalAccountOut] = {
+            account.id: account for account in sorted(accounts, key=lambda a: a.created_at) if account.is_active
+        }
+        order = {account_id: position for position, account_id in enumerate(self.accounts)}
+
+        self.builder_accounts: Dict[Tuple[UUID, str], List[UUID]] = defaultdict(list)
+        for builder_id, account_id in sorted(builder_links, key=lambda link: order.get(link[1], -1)):
+            account = self.accounts.get(account_id)
+            if account is not None:
+                self.builder_accounts[(builder_id, account.tenant_id)].append(account_id)
+
+        self.rules: Dict[Tuple[str, str], List[CompiledRule]] = defaultdict(list)
+        for rule in sorted((r for r in rules if r.is_active), key=lambda r: (r.priority, r.created_at)):
+            account = self.accounts.get(rule.portal_account_id)
+            if account is None or rule.tenant_id not in (None, account.tenant_id):
+                continue
+            self.rules[(rule.applies_to, account.tenant_id)].append(CompiledRule(
+                builder_id=rule.builder_id,
+                city=rule.city,
+                county=rule.county,
+                phase=rule.phase,
+                permit_required=rule.permit_required,
+                account_id=rule.portal_account_id,
+            ))
+
+        self._memo: Dict[PortalQuery, Tuple[UUID, ...]] = {}
+
+    def suggest(self, query: PortalQuery) -> List[schemas.PortalAccountOut]:
+        """Builder-linked accounts first, then rule matches by priority, each account once"""
+        query = query.normalized()
+        account_ids = self._memo.get(query)
+        if account_ids is None:
+            account_ids = self._resolve(query)
+            if len(self._memo) >= MAX_MEMOIZED:
+                self._memo.clear()
+            self._memo[query] = account_ids
+        return [self.accounts[account_id] for account_id in account_ids]
+
+    def suggest_many(self, queries: Iterable[PortalQuery]) -> List[List[schemas.PortalAccountOut]]:
+        return [self.suggest(query) for query in queries]
+
+    def _resolve(self, query: PortalQuery) -> Tuple[UUID, ...]:
+        result: Dict[UUID, None] = {}  # Ordered set
+        if query.builder_id is not None:
+            result.update(dict.fromkeys(self.builder_accounts.get((query.builder_id, query.tenant_id), ())))
+        for rule in self.rules.get((query.applies_to, query.tenant_id), ()):
+            if rule.account_id not in result and rule.matches(query):
+                result[rule.account_id] = None
+        return tuple(result)
+
+
+index_cache: cache.Cache[str, PortalRuleIndex] = cache.register('portal_rule_index', maxsize=1)
+
+
+async def build_index(db: AsyncSession) -> PortalRuleIndex:
+    accounts = await db.execute(
+        select(models.PortalAccount)
+        .where(models.PortalAccount.is_active == True)
+        .options(selectinload(models.PortalAccount.portal_definition))
+    )
+    links = await db.execute(
+        select(models.BuilderPortalAccount.builder_id, models.BuilderPortalAccount.portal_account_id)
+    )
+    rules = await db.execute(select(models.PortalRule).where(models.PortalRule.is_active == True))
+    return PortalRuleIndex(
+        [schemas.PortalAccountOut.model_validate(account) for account in accounts.scalars()],
+        [tuple(link) for link in links],
+        rules.scalars().all(),
+    )
+
+
+async def get_index(db: AsyncSession) -> PortalRuleIndex:
+    return await index_cache.get_or_load('all', lambda: build_index(db))
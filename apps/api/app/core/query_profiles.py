@@ -0,0 +1,66 @@
+"""
+Query profiles: which columns and relationships a query loads, named after what the caller renders
+
+- list: only the columns of the slim list schemas (schemas.JobListItem, ServiceCallListItem),
+  plus small relationships they show (a job's builder name). Notes, warranty and payment
+  details stay in the database.
+- detail: every column and the relationships the detail pages show
+- export: every column, no relationships
+
+List columns are derived from the list schemas, so adding a field to a schema is all it takes to
+load it - and a field the schema drops stops being fetched and hydrated.
+
+    q = select(models.Job).options(*query_profiles.options('job', 'list'))
+"""
+from typing import Dict, List, Tuple, Type
+
+from pydantic import BaseModel
+from sqlalchemy import inspect
+from sqlalchemy.orm import load_only, selectinload
+
+from .. import models, schemas
+
+PROFILE_NAMES = ('list', 'detail', 'export')
+
+
+def schema_columns(model, schema: Type[BaseModel]) -> List:
+    """Column attributes of `model` that `schema` has a field for"""
+    columns = inspect(model).column_attrs
+    return [getattr(model, name) for name in schema.model_fields if name in columns]
+
+
+PROFILES: Dict[str, Dict[str, Tuple]] = {
+    'job': {
+        'list': (
+            load_only(*schema_columns(models.Job, schemas.JobListItem)),
+            selectinload(models.Job.builder).load_only(models.Builder.id, models.Builder.name),
+        ),
+        'detail': (selectinload(models.Job.builder), selectinload(models.Job.tasks)),
+        'export': (),
+    },
+    'service_call': {
+        'list': (load_only(*schema_columns(models.ServiceCall, schemas.ServiceCallListItem)),),
+        'detail': (selectinload(models.ServiceCall.workflow),),
+        'export': (),
+    },
+}
+
+LIST_SCHEMAS = {
+    'job': schemas.JobListItem,
+    'service_call': schemas.ServiceCallListItem,
+}
+
+
+def options(entity: str, profile: str) -> Tuple:
+    """Loader options for `entity` under `profile`; ValueError for unknown profiles"""
+    if profile not in PROFILE_NAMES:
+        raise ValueError(f"Unknown query profile '{profile}' (expected one of: {', '.join(PROFILE_NAMES)})")
+    return PROFILES[entity][profile]
+
+
+def serialize(entity: str, profile: str, rows) -> List:
+    """'list' rows as their slim schema; other profiles are returned as loaded"""
+    if profile == 'list' and entity in LIST_SCHEMAS:
+        schema = LIST_SCHEMAS[entity]
+        return [schema.model_validate(row) for row in rows]
+    return list(rows)
@@ -0,0 +1,176 @@
+"""
+Per-request database profiling - query count, total DB time and slowest statement
+
+Engine hooks in db/session.py feed the QueryStats of the current request (a context variable,
+shared with SQLAlchemy's greenlets). QueryStatsMiddleware reports them in a Server-Timing
+header and one log line per request, and enforces QUERY_BUDGET when set.
+
+In tests:
+    with query_budget(5):
+        res = await ac.get('/api/v1/jobs')   # fails the request if it runs more than 5 queries
+"""
+import re
+import time
+import logging
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Optional
+
+from .config import settings
+
+logger = logging.getLogger(__name__)
+
+STATEMENT_PREVIEW_LENGTH = 200
+
+
+class QueryBudgetExceeded(RuntimeError):
+    """Raised (QUERY_BUDGET_ACTION=raise or inside query_budget()) when a request runs too many queries"""
+
+
+@dataclass
+class QueryStats:
+    count: int = 0
+    total_ms: float = 0.0
+    slowest_ms: float = 0.0
+    slowest_statement: Optional[str] = None
+    budget: Optional[int] = None
+    budget_action: str = 'log'
+    over_budget: bool = False
+
+    def record(self, statement: str, elapsed_ms: float):
+        self.count += 1
+        self.total_ms += elapsed_ms
+        if elapsed_ms >= self.slowest_ms:
+            self.slowest_ms = elapsed_ms
+            self.slowest_statement = statement
+        if self.budget and self.count > self.budget and not self.over_budget:
+            self.over_budget = True
+            if self.budget_action == 'raise':
+                raise QueryBudgetExceeded(f"Query budget of {self.budget} exceeded")
+
+    def server_timing(self) -> str:
+        """Server-Timing header value, e.g. db;dur=12.4;desc="7 queries", db-slowest;dur=5.1"""
+        return f'db;dur={self.total_ms:.1f};desc="{self.count} queries", db-slowest;dur={self.slowest_ms:.1f}'
+
+
+_current_stats: ContextVar[Optional[QueryStats]] = ContextVar('query_stats', default=None)
+# Set by query_budget() to override QUERY_BUDGET for requests made inside the block
+_budget_override: ContextVar[Optional[int]] = ContextVar('query_budget_override', default=None)
+
+
+def get_query_stats() -> Optional[QueryStats]:
+    return _current_stats.get()
+
+
+def preview_statement(statement: str) -> str:
+    """Collapse whitespace and truncate a SQL statement for logs/headers"""
+    statement = re.sub(r'\s+', ' ', statement).strip()
+    if len(statement) > STATEMENT_PREVIEW_LENGTH:
+        statement = statement[:STATEMENT_PREVIEW_LENGTH] + '...'
+    return statement
+
+
+# Engine event hooks (registered in db/session.py)
+
+def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault('query_start_time', []).append(time.perf_counter())
+
+
+def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    start_times = conn.info.get('query_start_time')
+    if not start_times:
+        return
+    elapsed_ms = (time.perf_counter() - start_times.pop()) * 1000
+
+    if settings.slow_query_ms and elapsed_ms >= settings.slow_query_ms:
+        logger.warning(f"⚠ Slow query ({elapsed_ms:.0f}ms): {preview_statement(statement)}")
+
+    stats = _current_stats.get()
+    if stats is not None:
+        stats.record(statement, elapsed_ms)
+
+
+def instrument_engine(engine):
+    """Attach the timing hooks to an (async) engine"""
+    from sqlalchemy import event
+
+    sync_engine = getattr(engine, 'sync_engine', engine)
+    event.listen(sync_engine, 'before_cursor_execute', before_cursor_execute)
+    event.listen(sync_engine, 'after_cursor_execute', after_cursor_execute)
+
+
+@contextmanager
+def track_queries(budget: Optional[int] = None, budget_action: str = 'raise'):
+    """Collect QueryStats for the block (background jobs, scripts, tests)"""
+    stats = QueryStats(budget=budget, budget_action=budget_action)
+    token = _current_stats.set(stats)
+    try:
+        yield stats
+    finally:
+        _current_stats.reset(token)
+
+
+@contextmanager
+def query_budget(max_queries: int):
+    """Fail requests made inside the block that run more than `max_queries` queries"""
+    token = _budget_override.set(max_queries)
+    try:
+        yield
+    finally:
+        _budget_override.reset(token)
+
+
+class QueryStatsMiddleware:
+    """ASGI middleware: per-request QueryStats, Server-Timing header and a structured log line"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+
+        override = _budget_override.get()
+        stats = QueryStats(
+            budget=override if override is not None else (settings.query_budget or None),
+            budget_action='raise' if override is not None else settings.query_budget_action
+        )
+        token = _current_stats.set(stats)
+        started = time.perf_counter()
+        status_code = None
+
+        async def send_with_timing(message):
+            nonlocal status_code
+            if message['type'] == 'http.response.start':
+                status_code = message['status']
+                headers = list(message.get('headers', []))
+                headers.append((b'server-timing', stats.server_timing().encode('latin-1')))
+                message = {**message, 'headers': headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _current_stats.reset(token)
+            self.log_request(scope, status_code, stats, (time.perf_counter() - started) * 1000)
+
+    def log_request(self, scope, status_code: Optional[int], stats: QueryStats, duration_ms: float):
+        route = scope.get('route')
+        path = getattr(route, 'path', None) or scope['path']
+        fields = {
+            'method': scope['method'],
+            'path': path,
+            'status': status_code,
+            'duration_ms': round(duration_ms, 1),
+            'db_queries': stats.count,
+            'db_ms': round(stats.total_ms, 1),
+            'db_slowest_ms': round(stats.slowest_ms, 1),
+            'db_slowest': preview_statement(stats.slowest_statement) if stats.slowest_statement else None,
+        }
+        message = ' '.join(f'{key}={value}' for key, value in fields.items() if key != 'db_slowest')
+        if stats.over_budget:
+            logger.warning(f"⚠ Query budget exceeded ({stats.count} > {stats.budget}): {message}", extra={'request_stats': fields})
+        elif stats.count:
+            logger.info(message, extra={'request_stats': fields})
@@ -2,19 +2,46 @@
 Rate Limiting Middleware
 
 Provides tenant-aware rate limiting for API endpoints.
+
+Every request under /api/v1 falls in one of the RATE_LIMITS classes (login -> auth,
+/marketing -> marketing, other reads -> read, other writes -> write) and is counted against a
+key: tenant and user for authenticated requests (read from the JWT, no database lookup),
+client IP otherwise and for login. A whole office behind one NAT address is therefore not
+throttled as one client, and one user cannot spend a tenant's budget from many addresses.
+Tenant-less users (admins) are keyed per user; the tenant_id a client sends is not trusted.
+
+The client IP is the ASGI scope's client. Behind a reverse proxy that is the proxy's own
+address unless uvicorn resolves X-Forwarded-For, which it only does for peers listed in
+FORWARDED_ALLOW_IPS (settings.forwarded_allow_ips, passed to uvicorn by runtime.py).
+
+Counting uses a sliding window: hits in the current fixed window plus the previous window's
+hits weighted by how much of it still overlaps the last `period` seconds. Counters live in a
+pluggable backend (RATE_LIMIT_BACKEND):
+
+- postgres: the unlogged rate_limit_counters table (no WAL, one upsert per request on a small
+  dedicated pool), shared by every worker and replica so limits hold cluster-wide
+- memory: per-process dict, for single-process development
+- off: no limiting
+
+Backend errors fail open: a database hiccup must not turn into a 429 storm.
 """
+import asyncio
+import logging
+import math
+import time
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from typing import Dict, Optional, Tuple
 
-from slowapi import Limiter
-from slowapi.util import get_remote_address
 from fastapi import Request
-from typing import Optional
+from fastapi.responses import JSONResponse
+from jose import jwt
+from sqlalchemy import text
+
+from . import metrics
+from .config import settings
 
-# Initialize rate limiter - shared instance
-limiter = Limiter(
-    key_func=get_remote_address,
-    default_limits=["1000/hour"],  # Default limit if not specified
-    storage_uri="memory://",  # In-memory storage (use Redis in production)
-)
+logger = logging.getLogger(__name__)
 
 # Rate limit configurations per endpoint type
 RATE_LIMITS = {
@@ -24,20 +51,275 @@ RATE_LIMITS = {
     "marketing": "50/minute",  # Marketing endpoints
 }
 
+PERIODS = {"second": 1, "minute": 60, "hour": 3600, "day": 86400}
+
+AUTH_PATHS = {"/login"}
+READ_METHODS = {"GET", "HEAD"}
+
+rate_limit_rejections = metrics.registry.register(metrics.Counter(
+    'rate_limit_rejections_total', 'Requests rejected with 429', ('limit_class',)
+))
+rate_limit_errors = metrics.registry.register(metrics.Counter(
+    'rate_limit_backend_errors_total', 'Rate limit checks that failed open'
+))
 
-def get_tenant_id_from_request(request: Request) -> Optional[str]:
-    """
-    Extract tenant_id from request for tenant-aware rate limiting.
-    Checks query params first, then request body if available.
-    """
-    # Try query parameter
-    tenant_id = request.query_params.get("tenant_id")
-    if tenant_id:
-        return tenant_id
-    return None
+
+@dataclass(frozen=True)
+class RateLimit:
+    limit: int
+    period: int  # Seconds
+
+    def __str__(self):
+        return f"{self.limit} per {self.period}s"
+
+
+def parse_rate(value: str) -> RateLimit:
+    """'200/minute' -> RateLimit(200, 60)"""
+    count, _, unit = value.partition("/")
+    unit = unit.strip().rstrip("s")
+    if unit not in PERIODS:
+        raise ValueError(f"Unknown rate limit period in '{value}'")
+    return RateLimit(int(count), PERIODS[unit])
 
 
 def get_rate_limit(limit_type: str = "read") -> str:
     """Get rate limit string for a given limit type"""
     return RATE_LIMITS.get(limit_type, "100/minute")
 
+
+def get_token_identity(request: Request) -> Optional[Tuple[Optional[str], str]]:
+    """(tenant_id, user) from the access token, or None for anonymous or invalid tokens"""
+    authorization = request.headers.get("authorization", "")
+    token = authorization[7:] if authorization.lower().startswith("bearer ") else request.cookies.get("access_token")
+    if not token:
+        return None
+    try:
+        payload = jwt.decode(token, settings.jwt_secret, algorithms=[settings.jwt_algorithm])
+    except Exception:
+        return None
+    user = payload.get("user_id") or payload.get("username")
+    if not user:
+        return None
+    # Tenant-less users (admins) get their own key, whatever ?tenant_id they ask for
+    return payload.get("tenant_id"), user
+
+
+def limit_class(method: str, path: str) -> str:
+    """RATE_LIMITS class of a request; `path` is relative to the API prefix"""
+    if path in AUTH_PATHS:
+        return "auth"
+    if path == "/marketing" or path.startswith("/marketing/"):
+        return "marketing"
+    return "read" if method in READ_METHODS else "write"
+
+
+def rate_limit_key(request: Request, klass: str) -> str:
+    identity = None if klass == "auth" else get_token_identity(request)
+    if identity:
+        tenant_id, user = identity
+        return f"{klass}:t:{tenant_id or '-'}:u:{user}"
+    client = request.client.host if request.client else "unknown"
+    return f"{klass}:ip:{client}"
+
+
+def window_bounds(now: float, period: int) -> Tuple[int, float]:
+    """(start of the current fixed window, fraction of it elapsed)"""
+    start = int(now // period) * period
+    return start, (now - start) / period
+
+
+class RateLimitBackend(ABC):
+    """Counts a hit and returns (hits in the current window, hits in the previous one)"""
+
+    @abstractmethod
+    async def hit(self, key: str, window: int, period: int) -> Tuple[int, int]:
+        pass
+
+    async def purge(self, now: int) -> int:
+        """Drop counters no sliding window looks back to at `now` any more"""
+        return 0
+
+    async def close(self):
+        pass
+
+
+class MemoryBackend(RateLimitBackend):
+    """Per-process counters; limits multiply with the number of processes"""
+
+    def __init__(self):
+        # (key, window start) -> [hits, time after which no window looks back at it]
+        self.counters: Dict[Tuple[str, int], list] = {}
+        self.lock = asyncio.Lock()
+
+    async def hit(self, key: str, window: int, period: int) -> Tuple[int, int]:
+        async with self.lock:
+            if len(self.counters) >= settings.rate_limit_memory_keys:
+                await self.purge(int(time.time()))
+            entry = self.counters.setdefault((key, window), [0, window + 2 * period])
+            entry[0] += 1
+            previous = self.counters.get((key, window - period))
+            return entry[0], previous[0] if previous else 0
+
+    async def purge(self, now: int) -> int:
+        expired = [entry for entry, (_, expires) in self.counters.items() if expires < now]
+        for entry in expired:
+            del self.counters[entry]
+        return len(expired)
+
+
+HIT_SQL = text("""
+    WITH hit AS (
+        INSERT INTO rate_limit_counters (key, window_start, hits, expires_at) VALUES (:key, :window, 1, :expires)
+        ON CONFLICT (key, window_start) DO UPDATE SET hits = rate_limit_counters.hits + 1
+        RETURNING hits
+    )
+    SELECT hit.hits, coalesce(previous.hits, 0)
+    FROM hit
+    LEFT JOIN rate_limit_counters previous ON previous.key = :key AND previous.window_start = :previous
+""")
+
+
+class PostgresBackend(RateLimitBackend):
+    """Counters in the unlogged rate_limit_counters table, shared by all processes"""
+
+    def __init__(self):
+        self._engine = None
+
+    @property
+    def engine(self):
+        # Own small pool in autocommit: one round trip per check, never queued behind (or counted
+        # in the Server-Timing of) the request's own queries
+        if self._engine is None:
+            from sqlalchemy.ext.asyncio import create_async_engine
+            self._engine = create_async_engine(
+                settings.database_url,
+                pool_size=settings.rate_limit_pool_size,
+                max_overflow=0,
+                pool_timeout=settings.rate_limit_timeout,
+                pool_pre_ping=True,
+                isolation_level="AUTOCOMMIT",
+                connect_args={
+                    "statement_cache_size": 0,  # pgbouncer compatibility, as in db/session.py
+                    "command_timeout": settings.rate_limit_timeout,
+                },
+            )
+        return self._engine
+
+    async def hit(self, key: str, window: int, period: int) -> Tuple[int, int]:
+        async with self.engine.connect() as conn:
+            result = await conn.execute(HIT_SQL, {
+                'key': key, 'window': window, 'previous': window - period, 'expires': window + 2 * period
+            })
+            current, previous = result.one()
+        return int(current), int(previous)
+
+    async def purge(self, now: int) -> int:
+        async with self.engine.connect() as conn:
+            result = await conn.execute(
+                text("DELETE FROM rate_limit_counters WHERE expires_at < :now"), {'now': now}
+            )
+        return result.rowcount
+
+    async def close(self):
+        if self._engine is not None:
+            await self._engine.dispose()
+            self._engine = None
+
+
+BACKENDS = {
+    "postgres": PostgresBackend,
+    "memory": MemoryBackend,
+}
+
+
+def create_backend(name: str) -> Optional[RateLimitBackend]:
+    """Backend for RATE_LIMIT_BACKEND; None disables limiting"""
+    if name == "off":
+        return None
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown RATE_LIMIT_BACKEND '{name}' (expected one of: off, {', '.join(BACKENDS)})")
+    return BACKENDS[name]()
+
+
+backend = create_backend(settings.rate_limit_backend)
+
+
+class Limiter:
+    """Applies the RATE_LIMITS classes against a backend"""
+
+    def __init__(self, backend: Optional[RateLimitBackend], limits: Optional[Dict[str, str]] = None):
+        self.backend = backend
+        self.limits = {name: parse_rate(value) for name, value in (limits or RATE_LIMITS).items()}
+
+    async def check(self, key: str, rate: RateLimit, now: Optional[float] = None) -> Tuple[bool, int, int]:
+        """(allowed, remaining, seconds until the current window rolls over)"""
+        now = time.time() if now is None else now
+        window, elapsed = window_bounds(now, rate.period)
+        current, previous = await self.backend.hit(key, window, rate.period)
+        # Sliding window estimate: the previous window only counts for the part still in range
+        estimated = current + previous * (1 - elapsed)
+        reset = max(1, math.ceil(rate.period * (1 - elapsed)))
+        return estimated <= rate.limit, max(0, int(rate.limit - estimated)), reset
+
+    async def purge_expired(self) -> int:
+        """Drop counters no window can look back to any more (purge_rate_limit_counters job)"""
+        if self.backend is None:
+            return 0
+        return await self.backend.purge(int(time.time()))
+
+
+limiter = Limiter(backend)
+
+
+class RateLimitMiddleware:
+    """ASGI middleware: 429 once a key exceeds its class's limit, X-RateLimit-* headers otherwise"""
+
+    def __init__(self, app, prefix: str = "/api/v1", limiter: Limiter = limiter):
+        self.app = app
+        self.prefix = prefix
+        self.limiter = limiter
+
+    async def __call__(self, scope, receive, send):
+        path = scope.get('path', '')
+        if (
+            scope['type'] != 'http'
+            or self.limiter.backend is None
+            or scope['method'] == 'OPTIONS'
+            or not path.startswith(self.prefix)
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        request = Request(scope)
+        klass = limit_class(scope['method'], path[len(self.prefix):])
+        rate = self.limiter.limits[klass]
+        try:
+            allowed, remaining, reset = await self.limiter.check(rate_limit_key(request, klass), rate)
+        except Exception as e:
+            rate_limit_errors.inc()
+            logger.warning(f"⚠ Rate limit check failed, allowing request: {e}")
+            await self.app(scope, receive, send)
+            return
+
+        headers = [
+            (b'x-ratelimit-limit', str(rate.limit).encode()),
+            (b'x-ratelimit-remaining', str(remaining).encode()),
+            (b'x-ratelimit-reset', str(reset).encode()),
+        ]
+        if not allowed:
+            rate_limit_rejections.inc(limit_class=klass)
+            response = JSONResponse(
+                {"detail": f"Rate limit exceeded: {rate}"},
+                status_code=429,
+                headers={'Retry-After': str(reset)},
+            )
+            response.raw_headers.extend(headers)
+            await response(scope, receive, send)
+            return
+
+        async def send_with_headers(message):
+            if message['type'] == 'http.response.start':
+                message = {**message, 'headers': list(message.get('headers', [])) + headers}
+            await send(message)
+
+        await self.app(scope, receive, send_with_headers)
@@ -1,29 +1,146 @@
 """
 Background job scheduler using APScheduler
 """
+import asyncio
+import time
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
 from apscheduler.triggers.cron import CronTrigger
 from apscheduler.triggers.interval import IntervalTrigger
+from apscheduler.events import EVENT_JOB_SUBMITTED, EVENT_JOB_EXECUTED, EVENT_JOB_ERROR
 import logging
 
+from . import metrics
+
 logger = logging.getLogger(__name__)
 
 # Global scheduler instance
 scheduler: AsyncIOScheduler = None
 
+# Job runs submitted but not yet finished (drained on shutdown)
+_running_jobs = 0
+_job_started_at = {}
+
+def _track_running_jobs(event):
+    """Running-job count for drain_scheduler plus duration/failure metrics (jobs in tasks.py re-raise errors)"""
+    global _running_jobs
+    if event.code == EVENT_JOB_SUBMITTED:
+        _running_jobs += 1
+        _job_started_at[event.job_id] = time.perf_counter()
+        return
+
+    _running_jobs = max(0, _running_jobs - 1)
+    started = _job_started_at.pop(event.job_id, None)
+    failed = event.code == EVENT_JOB_ERROR
+    if started is not None:
+        metrics.scheduler_job_duration.observe(
+            time.perf_counter() - started, job=event.job_id, outcome='error' if failed else 'ok'
+        )
+    if failed:
+        metrics.scheduler_job_failures.inc(job=event.job_id)
+
 def get_scheduler() -> AsyncIOScheduler:
     """Get or create the scheduler instance"""
     global scheduler
     if scheduler is None:
         scheduler = AsyncIOScheduler()
+        scheduler.add_listener(_track_running_jobs, EVENT_JOB_SUBMITTED | EVENT_JOB_EXECUTED | EVENT_JOB_ERROR)
     return scheduler
 
+def get_running_job_count() -> int:
+    return _running_jobs
+
+def register_jobs():
+    """Add the platform's periodic jobs to the scheduler"""
+    from .tasks import (
+        check_overdue_items, automate_review_requests, escalate_stale_items, daily_summary,
+        topoff_marketing_slots, track_content_mix, generate_pending_media_derivatives, maintain_audit_log, maintain_notifications,
+        purge_rate_limit_counters
+    )
+
+    scheduler = get_scheduler()
+
+    scheduler.add_job(
+        check_overdue_items,
+        trigger=IntervalTrigger(hours=1),
+        id='check_overdue_items',
+        replace_existing=True
+    )
+
+    scheduler.add_job(
+        automate_review_requests,
+        trigger=IntervalTrigger(minutes=15),
+        id='automate_review_requests',
+        replace_existing=True
+    )
+
+    scheduler.add_job(
+        escalate_stale_items,
+        trigger=IntervalTrigger(hours=6),
+        id='escalate_stale_items',
+        replace_existing=True
+    )
+
+    scheduler.add_job(
+        daily_summary,
+        trigger=CronTrigger(hour=8, minute=0),
+        id='daily_summary',
+        replace_existing=True
+    )
+
+    # Marketing slot top-off: run daily at 2 AM
+    scheduler.add_job(
+        topoff_marketing_slots,
+        trigger=CronTrigger(hour=2, minute=0),
+        id='topoff_marketing_slots',
+        replace_existing=True
+    )
+
+    # Content mix history: daily at 2:30 AM, after the slot top-off
+    scheduler.add_job(
+        track_content_mix,
+        trigger=CronTrigger(hour=2, minute=30),
+        id='track_content_mix',
+        replace_existing=True
+    )
+
+    # Media renditions whose background task was lost
+    scheduler.add_job(
+        generate_pending_media_derivatives,
+        trigger=IntervalTrigger(minutes=30),
+        id='generate_pending_media_derivatives',
+        replace_existing=True
+    )
+
+    # Audit partitions ahead of time plus retention/archival: daily at 3 AM
+    scheduler.add_job(
+        maintain_audit_log,
+        trigger=CronTrigger(hour=3, minute=0),
+        id='maintain_audit_log',
+        replace_existing=True
+    )
+
+    # Notification retention: daily at 3:30 AM
+    scheduler.add_job(
+        maintain_notifications,
+        trigger=CronTrigger(hour=3, minute=30),
+        id='maintain_notifications',
+        replace_existing=True
+    )
+
+    # Expired rate limit windows (RATE_LIMIT_BACKEND=postgres)
+    scheduler.add_job(
+        purge_rate_limit_counters,
+        trigger=IntervalTrigger(hours=1),
+        id='purge_rate_limit_counters',
+        replace_existing=True
+    )
+
 def start_scheduler():
     """Start the scheduler"""
     global scheduler
     if scheduler is None:
         scheduler = get_scheduler()
-    
+
     if not scheduler.running:
         scheduler.start()
         logger.info("✓ Background scheduler started")
@@ -37,8 +154,19 @@ def shutdown_scheduler():
         scheduler.shutdown()
         logger.info("Background scheduler stopped")
 
-
-
-
-
-
+async def drain_scheduler(timeout: float):
+    """
+    Stop scheduling new runs, wait up to `timeout` seconds for running jobs to finish, then shut down.
+    AsyncIOScheduler.shutdown() cancels jobs still running, so this waits first.
+    """
+    global scheduler
+    if not scheduler or not scheduler.running:
+        return
+    scheduler.pause()
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+    while _running_jobs > 0 and loop.time() < deadline:
+        await asyncio.sleep(0.1)
+    if _running_jobs > 0:
+        logger.warning(f"⚠ {_running_jobs} scheduled job(s) still running after {timeout:.0f}s - cancelling")
+    shutdown_scheduler()
@@ -0,0 +1,155 @@
+"""
+Unified search across jobs, service calls, customers, builders and portal accounts
+
+Each entity has a search document: its searchable text columns joined with spaces. A pg_trgm
+GIN index covers exactly that expression (migration 0033), so `document ILIKE '%term%'` is
+answered from the index instead of a sequential scan once the term is 3+ characters long.
+Hits are ranked with word_similarity(), which scores how well the term matches a word (or
+word prefix) inside the document - what type-ahead wants - plus a boost when the title
+starts with the term.
+
+The list endpoints' `search` filters go through matches() so they use the same indexes.
+The document expressions must stay identical to the indexed ones, or Postgres falls back to
+scanning the table.
+"""
+from dataclasses import dataclass
+from typing import Optional
+
+from sqlalchemy import Text, literal_column, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+MIN_TERM_LENGTH = 3  # Shorter terms produce no trigrams, so the index cannot narrow them down
+
+
+@dataclass(frozen=True)
+class SearchSource:
+    entity_type: str
+    table: str
+    document: str  # Indexed expression (migration 0033)
+    title: str
+    subtitle: str
+    tenant_column: Optional[str] = 'tenant_id'  # None = shared across tenants
+    join: str = ''
+    extra_match: Optional[str] = None  # Unindexed column on a small joined table, also matched
+
+
+SOURCES = {
+    'job': SearchSource(
+        entity_type='job',
+        table='jobs',
+        document="jobs.address_line1 || ' ' || jobs.lot_number || ' ' || jobs.community",
+        title="jobs.address_line1",
+        subtitle="jobs.community || ' lot ' || jobs.lot_number || ' - ' || jobs.status",
+    ),
+    'service_call': SearchSource(
+        entity_type='service_call',
+        table='service_calls',
+        document=(
+            "service_calls.customer_name || ' ' || service_calls.address_line1"
+            " || ' ' || coalesce(service_calls.phone, '')"
+        ),
+        title="service_calls.customer_name",
+        subtitle="service_calls.address_line1 || ' - ' || service_calls.status",
+    ),
+    'customer': SearchSource(
+        entity_type='customer',
+        table='customers',
+        document=(
+            "customers.name || ' ' || coalesce(customers.phone, '') || ' ' || coalesce(customers.email, '')"
+            " || ' ' || coalesce(customers.address_line1, '')"
+        ),
+        title="customers.name",
+        subtitle="coalesce(customers.address_line1, customers.phone, customers.email)",
+    ),
+    'builder': SearchSource(
+        entity_type='builder',
+        table='builders',
+        document="builders.name",
+        title="builders.name",
+        subtitle="NULL",
+        tenant_column=None,
+    ),
+    'portal_account': SearchSource(
+        entity_type='portal_account',
+        table='portal_accounts',
+        document="portal_accounts.login_identifier || ' ' || coalesce(portal_accounts.account_number, '')",
+        title="portal_accounts.login_identifier",
+        subtitle="portal_definitions.name",
+        join="JOIN portal_definitions ON portal_definitions.id = portal_accounts.portal_definition_id",
+        extra_match="portal_definitions.name",
+    ),
+}
+
+ENTITY_TYPES = list(SOURCES)
+
+
+def like_pattern(term: str) -> str:
+    """'%term%' with LIKE wildcards in the term escaped"""
+    escaped = term.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+    return f"%{escaped}%"
+
+
+def document(entity_type: str):
+    """The indexed search document of an entity type, as a SQLAlchemy column expression"""
+    return literal_column(SOURCES[entity_type].document, Text)
+
+
+def matches(entity_type: str, term: str):
+    """Filter clause for the list endpoints' `search` parameter (uses the trigram index)"""
+    return document(entity_type).ilike(like_pattern(term))
+
+
+def _source_query(source: SearchSource, tenant_filtered: bool) -> str:
+    match = f"({source.document}) ILIKE :pattern"
+    scored = source.document
+    if source.extra_match:
+        match = f"({match} OR {source.extra_match} ILIKE :pattern)"
+        scored = f"{source.document} || ' ' || {source.extra_match}"
+    conditions = [match]
+    if tenant_filtered and source.tenant_column:
+        conditions.append(f"{source.table}.{source.tenant_column}::text = :tenant_id")
+
+    # Each branch is cut to the overall limit before the merge, so a common term only
+    # ranks a bounded number of rows per entity type
+    return f"""(
+        SELECT '{source.entity_type}' AS entity_type,
+               {source.table}.id AS id,
+               {f'{source.table}.{source.tenant_column}::text' if source.tenant_column else 'NULL'} AS tenant_id,
+               {source.title} AS title,
+               {source.subtitle} AS subtitle,
+               word_similarity(:term, {scored})
+                 + CASE WHEN {source.title} ILIKE :prefix THEN 1 ELSE 0 END AS score
+        FROM {source.table} {source.join}
+        WHERE {' AND '.join(conditions)}
+        ORDER BY score DESC
+        LIMIT :limit
+    )"""
+
+
+async def search(
+    db: AsyncSession,
+    term: str,
+    tenant_id: Optional[str] = None,
+    entity_types: Optional[list[str]] = None,
+    limit: int = 20,
+) -> list[dict]:
+    """Ranked hits across entity types, best first, in one query"""
+    sources = [SOURCES[t] for t in (entity_types or ENTITY_TYPES)]
+    branches = "\nUNION ALL\n".join(_source_query(s, tenant_id is not None) for s in sources)
+    statement = text(f"""
+        SELECT entity_type, id, tenant_id, title, subtitle, score
+        FROM ({branches}) AS hits
+        ORDER BY score DESC, title
+        LIMIT :limit
+    """)
+
+    params = {
+        'term': term,
+        'pattern': like_pattern(term),
+        'prefix': like_pattern(term)[1:],
+        'limit': limit,
+    }
+    if tenant_id is not None:
+        params['tenant_id'] = tenant_id
+    res = await db.execute(statement, params)
+    return [dict(row) for row in res.mappings()]
@@ -1,9 +1,17 @@
 """
 Storage service for uploading files to S3 or Cloudflare R2
+
+Backends:
+    s3 / r2 - boto3 client (cached), streamed multipart uploads via upload_fileobj
+    local   - files written under STORAGE_LOCAL_PATH (development and tests)
+
+Blocking I/O (boto3, disk) runs in a worker thread so uploads never stall the event loop.
 """
 import os
-import boto3
-from botocore.exceptions import ClientError
+import shutil
+import uuid
+import asyncio
+from functools import lru_cache
 from typing import Optional, BinaryIO
 from ..core.config import settings
 import logging
@@ -13,18 +21,26 @@ logger = logging.getLogger(__name__)
 # Maximum file size: 50MB
 MAX_FILE_SIZE = 50 * 1024 * 1024
 
+# Multipart settings: parts are streamed from the (spooled) source file, never buffered whole
+MULTIPART_THRESHOLD = 8 * 1024 * 1024
+MULTIPART_CHUNK_SIZE = 8 * 1024 * 1024
+MULTIPART_MAX_CONCURRENCY = 4
+
 # Allowed MIME types
 ALLOWED_IMAGE_TYPES = ['image/jpeg', 'image/png', 'image/gif', 'image/webp']
 ALLOWED_VIDEO_TYPES = ['video/mp4', 'video/quicktime', 'video/x-msvideo']
 ALLOWED_MIME_TYPES = ALLOWED_IMAGE_TYPES + ALLOWED_VIDEO_TYPES
 
 
+@lru_cache(maxsize=1)
 def get_s3_client():
-    """Get boto3 S3 client configured for S3 or R2"""
+    """Get boto3 S3 client configured for S3 or R2 (created once; boto3 clients are thread-safe)"""
+    import boto3
+
     if settings.storage_provider == 'r2':
         if not settings.storage_endpoint_url:
             raise ValueError("STORAGE_ENDPOINT_URL is required for R2 storage")
-        
+
         return boto3.client(
             's3',
             endpoint_url=settings.storage_endpoint_url,
@@ -41,120 +57,411 @@ def get_s3_client():
         )
 
 
-def validate_file(file_content: bytes, mime_type: Optional[str] = None) -> tuple[bool, Optional[str]]:
+@lru_cache(maxsize=1)
+def get_transfer_config():
+    """boto3 TransferConfig used for multipart uploads"""
+    from boto3.s3.transfer import TransferConfig
+
+    return TransferConfig(
+        multipart_threshold=MULTIPART_THRESHOLD,
+        multipart_chunksize=MULTIPART_CHUNK_SIZE,
+        max_concurrency=MULTIPART_MAX_CONCURRENCY,
+        use_threads=True
+    )
+
+
+class S3StorageBackend:
+    """S3 / R2 bucket storage"""
+
+    def check_configured(self):
+        if not settings.storage_bucket:
+            raise ValueError("STORAGE_BUCKET is not configured")
+        if not settings.storage_access_key_id or not settings.storage_secret_access_key:
+            raise ValueError("Storage credentials are not configured")
+
+    def upload_fileobj(self, fileobj: BinaryIO, object_key: str, mime_type: Optional[str] = None):
+        extra_args = {}
+        if mime_type:
+            extra_args['ContentType'] = mime_type
+        get_s3_client().upload_fileobj(
+            fileobj,
+            settings.storage_bucket,
+            object_key,
+            ExtraArgs=extra_args or None,
+            Config=get_transfer_config()
+        )
+
+    def download_fileobj(self, object_key: str, fileobj: BinaryIO):
+        get_s3_client().download_fileobj(
+            settings.storage_bucket,
+            object_key,
+            fileobj,
+            Config=get_transfer_config()
+        )
+
+    def delete(self, object_key: str):
+        get_s3_client().delete_object(Bucket=settings.storage_bucket, Key=object_key)
+
+    def public_url(self, object_key: str) -> str:
+        if settings.storage_public_url:
+            return f"{settings.storage_public_url.rstrip('/')}/{object_key}"
+        if settings.storage_provider == 'r2':
+            # R2 public URL format
+            if settings.storage_endpoint_url:
+                # Extract domain from endpoint URL
+                endpoint_domain = settings.storage_endpoint_url.replace('https://', '').replace('http://', '')
+                return f"https://{settings.storage_bucket}.{endpoint_domain}/{object_key}"
+            return f"https://{settings.storage_bucket}.r2.cloudflarestorage.com/{object_key}"
+        # S3 public URL format
+        if settings.storage_region:
+            return f"https://{settings.storage_bucket}.s3.{settings.storage_region}.amazonaws.com/{object_key}"
+        return f"https://{settings.storage_bucket}.s3.amazonaws.com/{object_key}"
+
+    def generate_presigned_url(self, object_key: str, expiration: int) -> str:
+        return get_s3_client().generate_presigned_url(
+            'get_object',
+            Params={'Bucket': settings.storage_bucket, 'Key': object_key},
+            ExpiresIn=expiration
+        )
+
+    def generate_presigned_upload(self, object_key: str, mime_type: str, expiration: int) -> str:
+        return get_s3_client().generate_presigned_url(
+            'put_object',
+            Params={'Bucket': settings.storage_bucket, 'Key': object_key, 'ContentType': mime_type},
+            ExpiresIn=expiration
+        )
+
+    def head(self, object_key: str) -> Optional[tuple[int, Optional[str]]]:
+        from botocore.exceptions import ClientError
+
+        try:
+            response = get_s3_client().head_object(Bucket=settings.storage_bucket, Key=object_key)
+        except ClientError as e:
+            if e.response.get('Error', {}).get('Code') in ('404', 'NoSuchKey', 'NotFound'):
+                return None
+            raise
+        return response['ContentLength'], response.get('ContentType')
+
+
+class LocalStorageBackend:
+    """Filesystem storage under STORAGE_LOCAL_PATH - for development and tests"""
+
+    def __init__(self, root: str):
+        self.root = os.path.abspath(root)
+
+    def check_configured(self):
+        os.makedirs(self.root, exist_ok=True)
+
+    def path_for(self, object_key: str) -> str:
+        path = os.path.abspath(os.path.join(self.root, object_key))
+        if not path.startswith(self.root + os.sep):
+            raise ValueError("Invalid object key")
+        return path
+
+    def upload_fileobj(self, fileobj: BinaryIO, object_key: str, mime_type: Optional[str] = None):
+        path = self.path_for(object_key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'wb') as out:
+            shutil.copyfileobj(fileobj, out, MULTIPART_CHUNK_SIZE)
+
+    def download_fileobj(self, object_key: str, fileobj: BinaryIO):
+        with open(self.path_for(object_key), 'rb') as src:
+            shutil.copyfileobj(src, fileobj, MULTIPART_CHUNK_SIZE)
+
+    def delete(self, object_key: str):
+        os.remove(self.path_for(object_key))
+
+    def public_url(self, object_key: str) -> str:
+        if settings.storage_public_url:
+            return f"{settings.storage_public_url.rstrip('/')}/{object_key}"
+        return f"file://{self.path_for(object_key)}"
+
+    def generate_presigned_url(self, object_key: str, expiration: int) -> str:
+        return self.public_url(object_key)
+
+    def generate_presigned_upload(self, object_key: str, mime_type: str, expiration: int) -> str:
+        # No server to PUT to - callers (tests) write the file to this path directly
+        path = self.path_for(object_key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        return f"file://{path}"
+
+    def head(self, object_key: str) -> Optional[tuple[int, Optional[str]]]:
+        path = self.path_for(object_key)
+        if not os.path.exists(path):
+            return None
+        return os.path.getsize(path), None
+
+
+@lru_cache(maxsize=1)
+def get_storage_backend():
+    """Get the configured storage backend (STORAGE_PROVIDER: 's3', 'r2' or 'local')"""
+    if settings.storage_provider == 'local':
+        return LocalStorageBackend(settings.storage_local_path)
+    return S3StorageBackend()
+
+
+def get_file_size(fileobj: BinaryIO) -> int:
+    """Size of a seekable file object without reading it; leaves the position at the start"""
+    fileobj.seek(0, os.SEEK_END)
+    size = fileobj.tell()
+    fileobj.seek(0)
+    return size
+
+
+def validate_upload(file_size: int, mime_type: Optional[str] = None) -> tuple[bool, Optional[str]]:
     """
     Validate file size and type
     Returns: (is_valid, error_message)
     """
-    if len(file_content) > MAX_FILE_SIZE:
+    if file_size > MAX_FILE_SIZE:
         return False, f"File size exceeds maximum of {MAX_FILE_SIZE / (1024*1024):.0f}MB"
-    
+
     if mime_type and mime_type not in ALLOWED_MIME_TYPES:
         return False, f"File type {mime_type} is not allowed. Allowed types: {', '.join(ALLOWED_MIME_TYPES)}"
-    
+
     return True, None
 
 
-def upload_file(
-    file_content: bytes,
+def validate_file(file_content: bytes, mime_type: Optional[str] = None) -> tuple[bool, Optional[str]]:
+    """
+    Validate file size and type
+    Returns: (is_valid, error_message)
+    """
+    return validate_upload(len(file_content), mime_type)
+
+
+def build_object_key(file_name: str, tenant_id: str, folder: str = "media") -> str:
+    """Generate object key: tenant_id/folder/unique_filename"""
+    file_ext = os.path.splitext(file_name or '')[1]
+    return f"{tenant_id}/{folder}/{uuid.uuid4()}{file_ext}"
+
+
+def upload_fileobj(
+    fileobj: BinaryIO,
     file_name: str,
     tenant_id: str,
     folder: str = "media",
-    mime_type: Optional[str] = None
-) -> str:
+    mime_type: Optional[str] = None,
+    object_key: Optional[str] = None
+) -> tuple[str, int]:
     """
-    Upload file to S3/R2 storage
-    
+    Stream a file object to storage (blocking - see upload_stream for the async variant)
+
     Args:
-        file_content: File content as bytes
+        fileobj: Seekable binary file object, e.g. UploadFile.file (a SpooledTemporaryFile)
         file_name: Original file name
         tenant_id: Tenant ID for organizing files
         folder: Folder path in bucket (default: "media")
         mime_type: MIME type of the file
-    
+        object_key: Key to store under (default: generated with build_object_key)
+
     Returns:
-        Public URL of the uploaded file
-    
+        (public URL of the uploaded file, file size in bytes)
+
     Raises:
         ValueError: If storage is not configured or file is invalid
         ClientError: If upload fails
     """
-    if not settings.storage_bucket:
-        raise ValueError("STORAGE_BUCKET is not configured")
-    
-    if not settings.storage_access_key_id or not settings.storage_secret_access_key:
-        raise ValueError("Storage credentials are not configured")
-    
-    # Validate file
-    is_valid, error_msg = validate_file(file_content, mime_type)
+    backend = get_storage_backend()
+    backend.check_configured()
+
+    file_size = get_file_size(fileobj)
+    is_valid, error_msg = validate_upload(file_size, mime_type)
     if not is_valid:
         raise ValueError(error_msg)
-    
-    # Generate object key: tenant_id/folder/unique_filename
-    import uuid
-    file_ext = os.path.splitext(file_name)[1]
-    unique_filename = f"{uuid.uuid4()}{file_ext}"
-    object_key = f"{tenant_id}/{folder}/{unique_filename}"
-    
+
+    object_key = object_key or build_object_key(file_name, tenant_id, folder)
     try:
-        s3_client = get_s3_client()
-        
-        # Upload file
-        extra_args = {}
-        if mime_type:
-            extra_args['ContentType'] = mime_type
-        
-        s3_client.put_object(
-            Bucket=settings.storage_bucket,
-            Key=object_key,
-            Body=file_content,
-            **extra_args
-        )
-        
-        # Generate public URL
-        if settings.storage_provider == 'r2':
-            # R2 public URL format
-            if settings.storage_endpoint_url:
-                # Extract domain from endpoint URL
-                endpoint_domain = settings.storage_endpoint_url.replace('https://', '').replace('http://', '')
-                public_url = f"https://{settings.storage_bucket}.{endpoint_domain}/{object_key}"
-            else:
-                public_url = f"https://{settings.storage_bucket}.r2.cloudflarestorage.com/{object_key}"
-        else:
-            # S3 public URL format
-            if settings.storage_region:
-                public_url = f"https://{settings.storage_bucket}.s3.{settings.storage_region}.amazonaws.com/{object_key}"
-            else:
-                public_url = f"https://{settings.storage_bucket}.s3.amazonaws.com/{object_key}"
-        
-        logger.info(f"Uploaded file {file_name} to {object_key}")
-        return public_url
-    
-    except ClientError as e:
+        backend.upload_fileobj(fileobj, object_key, mime_type)
+    except Exception as e:
         logger.error(f"Failed to upload file to storage: {e}")
         raise
 
+    logger.info(f"Uploaded file {file_name} to {object_key} ({file_size} bytes)")
+    return backend.public_url(object_key), file_size
+
+
+async def upload_stream(
+    fileobj: BinaryIO,
+    file_name: str,
+    tenant_id: str,
+    folder: str = "media",
+    mime_type: Optional[str] = None,
+    object_key: Optional[str] = None
+) -> tuple[str, int]:
+    """Async wrapper around upload_fileobj - runs the upload in a worker thread"""
+    return await asyncio.to_thread(upload_fileobj, fileobj, file_name, tenant_id, folder, mime_type, object_key)
+
+
+def upload_file(
+    file_content: bytes,
+    file_name: str,
+    tenant_id: str,
+    folder: str = "media",
+    mime_type: Optional[str] = None
+) -> str:
+    """
+    Upload in-memory file content to S3/R2 storage
+
+    Returns:
+        Public URL of the uploaded file
+    """
+    import io
+    file_url, _ = upload_fileobj(io.BytesIO(file_content), file_name, tenant_id, folder, mime_type)
+    return file_url
+
+
+def get_media_file_type(mime_type: Optional[str], file_name: Optional[str]) -> Optional[str]:
+    """Classify an upload as 'image' or 'video' from its MIME type, falling back to the extension"""
+    if mime_type and mime_type.startswith('image/'):
+        return 'image'
+    if mime_type and mime_type.startswith('video/'):
+        return 'video'
+    file_ext = os.path.splitext(file_name or '')[1].lower()
+    if file_ext in ['.jpg', '.jpeg', '.png', '.gif', '.webp']:
+        return 'image'
+    if file_ext in ['.mp4', '.mov', '.avi']:
+        return 'video'
+    return None
+
+
+# Direct-to-bucket uploads
+#
+# The client asks for an upload slot, PUTs the bytes straight to S3/R2 with the presigned URL,
+# then confirms with the returned upload token. The token is a signed JWT carrying the object key,
+# so no server-side state is kept for slots that are never confirmed.
+
+UPLOAD_URL_EXPIRATION = 15 * 60  # seconds
+
+
+def create_upload_slot(
+    file_name: str,
+    tenant_id: str,
+    folder: str,
+    mime_type: str,
+    file_size: int,
+    expiration: int = UPLOAD_URL_EXPIRATION
+) -> dict:
+    """
+    Reserve an object key and presign a PUT for it
+
+    Returns:
+        dict with upload_url, method, headers, object_key, upload_token and expires_in
+
+    Raises:
+        ValueError: If storage is not configured or the declared file is invalid
+    """
+    from datetime import datetime, timedelta, timezone
+    from jose import jwt
+
+    backend = get_storage_backend()
+    backend.check_configured()
+
+    if not mime_type:
+        raise ValueError("mime_type is required for direct uploads")
+    is_valid, error_msg = validate_upload(file_size, mime_type)
+    if not is_valid:
+        raise ValueError(error_msg)
+
+    object_key = build_object_key(file_name, tenant_id, folder)
+    upload_url = backend.generate_presigned_upload(object_key, mime_type, expiration)
+    upload_token = jwt.encode(
+        {
+            'typ': 'upload',
+            'key': object_key,
+            'tenant_id': tenant_id,
+            'folder': folder,
+            'file_name': file_name,
+            'mime_type': mime_type,
+            'exp': datetime.now(timezone.utc) + timedelta(seconds=expiration),
+        },
+        settings.jwt_secret,
+        algorithm=settings.jwt_algorithm
+    )
+    return {
+        'upload_url': upload_url,
+        'method': 'PUT',
+        'headers': {'Content-Type': mime_type},
+        'object_key': object_key,
+        'upload_token': upload_token,
+        'expires_in': expiration,
+    }
+
+
+def read_upload_token(upload_token: str, folder: str) -> dict:
+    """Decode and check an upload token issued by create_upload_slot for the given folder"""
+    from jose import jwt, JWTError
+
+    try:
+        claims = jwt.decode(upload_token, settings.jwt_secret, algorithms=[settings.jwt_algorithm])
+    except JWTError:
+        raise ValueError("Invalid or expired upload token")
+    if claims.get('typ') != 'upload' or claims.get('folder') != folder:
+        raise ValueError("Invalid upload token")
+    return claims
+
+
+def finalize_upload(claims: dict) -> tuple[str, int]:
+    """
+    Check that the object for a confirmed upload slot exists and is within limits
+
+    Returns:
+        (public URL, file size in bytes)
+
+    Raises:
+        ValueError: If the object was not uploaded or exceeds MAX_FILE_SIZE (it is then deleted)
+    """
+    backend = get_storage_backend()
+    object_key = claims['key']
+    head = backend.head(object_key)
+    if head is None:
+        raise ValueError("Upload not found - PUT the file to the upload URL before confirming")
+
+    file_size, _ = head
+    # A presigned PUT cannot cap the body size, so enforce it here
+    is_valid, error_msg = validate_upload(file_size, claims.get('mime_type'))
+    if not is_valid:
+        delete_file(object_key)
+        raise ValueError(error_msg)
+
+    return backend.public_url(object_key), file_size
+
+
+async def finalize_upload_async(claims: dict) -> tuple[str, int]:
+    """Async wrapper around finalize_upload - runs the storage HEAD in a worker thread"""
+    return await asyncio.to_thread(finalize_upload, claims)
+
+
+def download_bytes(object_key: str) -> bytes:
+    """Read a stored object into memory (blocking - used for media derivatives)"""
+    import io
+    buffer = io.BytesIO()
+    get_storage_backend().download_fileobj(object_key, buffer)
+    return buffer.getvalue()
+
+
+def put_bytes(content: bytes, object_key: str, mime_type: Optional[str] = None) -> str:
+    """Write generated content (e.g. a rendition) under an exact key; returns its public URL"""
+    import io
+    backend = get_storage_backend()
+    backend.upload_fileobj(io.BytesIO(content), object_key, mime_type)
+    return backend.public_url(object_key)
+
 
 def generate_presigned_url(object_key: str, expiration: int = 3600) -> str:
     """
     Generate a presigned URL for temporary access to a file
-    
+
     Args:
         object_key: S3/R2 object key
         expiration: URL expiration time in seconds (default: 1 hour)
-    
+
     Returns:
         Presigned URL
     """
     try:
-        s3_client = get_s3_client()
-        url = s3_client.generate_presigned_url(
-            'get_object',
-            Params={'Bucket': settings.storage_bucket, 'Key': object_key},
-            ExpiresIn=expiration
-        )
-        return url
-    except ClientError as e:
+        return get_storage_backend().generate_presigned_url(object_key, expiration)
+    except Exception as e:
         logger.error(f"Failed to generate presigned URL: {e}")
         raise
 
@@ -162,22 +469,17 @@ def generate_presigned_url(object_key: str, expiration: int = 3600) -> str:
 def delete_file(object_key: str) -> bool:
     """
     Delete a file from storage
-    
+
     Args:
         object_key: S3/R2 object key
-    
+
     Returns:
         True if successful, False otherwise
     """
     try:
-        s3_client = get_s3_client()
-        s3_client.delete_object(
-            Bucket=settings.storage_bucket,
-            Key=object_key
-        )
+        get_storage_backend().delete(object_key)
         logger.info(f"Deleted file {object_key}")
         return True
-    except ClientError as e:
+    except Exception as e:
         logger.error(f"Failed to delete file: {e}")
         return False
-
@@ -8,7 +8,8 @@ from typing import List
 import logging
 
 from ..db.session import AsyncSessionLocal
-from .. import models
+from .. import crud, models
+from .notifications import create_notification
 
 logger = logging.getLogger(__name__)
 
@@ -36,33 +37,107 @@ async def topoff_marketing_slots():
                     await db.rollback()
             
     except Exception as e:
-        logger.error(f"Error in topoff_marketing_slots: {e}", exc_info=True)
+        logger.error(f"Error in topoff_marketing_slots: {e}")
+        raise
 
 
-async def create_notification(
-    db: AsyncSession,
-    tenant_id: str,
-    notification_type: str,
-    title: str,
-    message: str,
-    entity_type: str = None,
-    entity_id: str = None,
-    user_id: str = None
-):
-    """Helper to create a notification"""
-    notification = models.Notification(
-        tenant_id=tenant_id,
-        user_id=user_id,
-        type=notification_type,
-        title=title,
-        message=message,
-        entity_type=entity_type,
-        entity_id=entity_id,
-        read=False
-    )
-    db.add(notification)
-    await db.commit()
-    return notification
+async def track_content_mix():
+    """Record weekly content mix counts for all tenants (runs daily)"""
+    try:
+        from .content_mix import TRACKED_WEEKS, track_content_mix as track_tenant_content_mix
+
+        async with AsyncSessionLocal() as db:
+            tenants_result = await db.execute(
+                select(models.ChannelAccount.tenant_id).distinct()
+            )
+            tenants = [row[0] for row in tenants_result.all()]
+
+            for tenant_id in tenants:
+                try:
+                    await track_tenant_content_mix(db, tenant_id, TRACKED_WEEKS)
+                except Exception as e:
+                    logger.error(f"Error tracking content mix for tenant {tenant_id}: {e}")
+                    await db.rollback()
+    except Exception as e:
+        logger.error(f"Error in track_content_mix: {e}")
+        raise
+
+
+async def generate_pending_media_derivatives():
+    """Retry media renditions whose background task never finished, e.g. after a restart (runs every 30 minutes)"""
+    try:
+        from .media_derivatives import generate_media_derivatives
+        
+        cutoff = datetime.now(timezone.utc) - timedelta(minutes=10)
+        async with AsyncSessionLocal() as db:
+            result = await db.execute(
+                select(models.MediaAsset.id).where(
+                    and_(
+                        models.MediaAsset.derivatives_status == 'pending',
+                        models.MediaAsset.created_at < cutoff
+                    )
+                ).order_by(models.MediaAsset.created_at).limit(100)
+            )
+            asset_ids = result.scalars().all()
+        
+        for asset_id in asset_ids:
+            await generate_media_derivatives(asset_id)
+        if asset_ids:
+            logger.info(f"Retried renditions for {len(asset_ids)} media assets")
+    except Exception as e:
+        logger.error(f"Error in generate_pending_media_derivatives: {e}")
+        raise
+
+
+async def maintain_audit_log():
+    """Create upcoming audit partitions and apply AUDIT_RETENTION_MONTHS (runs daily)"""
+    try:
+        from . import audit
+        from .config import settings
+        
+        async with AsyncSessionLocal() as db:
+            if await audit.is_partitioned(db):
+                created = await audit.ensure_partitions(db, settings.audit_partitions_ahead)
+                await db.commit()
+                if created:
+                    logger.info(f"✓ Created audit partitions: {', '.join(created)}")
+            if settings.audit_retention_months > 0:
+                removed = await audit.apply_retention(db, settings.audit_retention_months, archive=settings.audit_archive)
+                if removed:
+                    logger.info(f"✓ Audit retention removed {len(removed)} month(s): {', '.join(removed)}")
+    except Exception as e:
+        logger.error(f"Error in maintain_audit_log: {e}")
+        raise
+
+
+async def maintain_notifications():
+    """Purge read notifications older than NOTIFICATIONS_RETENTION_DAYS (runs daily)"""
+    try:
+        from .notifications import purge_read_notifications
+        from .config import settings
+        
+        if settings.notifications_retention_days <= 0:
+            return
+        async with AsyncSessionLocal() as db:
+            removed = await purge_read_notifications(db, settings.notifications_retention_days)
+            if removed:
+                logger.info(f"✓ Purged {removed} read notifications older than {settings.notifications_retention_days} days")
+    except Exception as e:
+        logger.error(f"Error in maintain_notifications: {e}")
+        raise
+
+
+async def purge_rate_limit_counters():
+    """Drop expired rate limit windows (runs hourly)"""
+    try:
+        from .rate_limit import limiter
+        
+        removed = await limiter.purge_expired()
+        if removed:
+            logger.info(f"Purged {removed} expired rate limit counters")
+    except Exception as e:
+        logger.error(f"Error in purge_rate_limit_counters: {e}")
+        raise
 
 
 async def check_overdue_items():
@@ -72,13 +147,7 @@ async def check_overdue_items():
             now = datetime.now(timezone.utc)
             
             # Check overdue jobs
-            jobs_query = select(models.Job).where(
-                and_(
-                    models.Job.scheduled_end.isnot(None),
-                    models.Job.scheduled_end < now,
-                    models.Job.status != 'Completed'
-                )
-            )
+            jobs_query = select(models.Job).where(crud.overdue_filter(models.Job, now))
             result = await db.execute(jobs_query)
             overdue_jobs = result.scalars().all()
             
@@ -109,13 +178,7 @@ async def check_overdue_items():
                         )
             
             # Check overdue service calls
-            calls_query = select(models.ServiceCall).where(
-                and_(
-                    models.ServiceCall.scheduled_end.isnot(None),
-                    models.ServiceCall.scheduled_end < now,
-                    models.ServiceCall.status != 'Completed'
-                )
-            )
+            calls_query = select(models.ServiceCall).where(crud.overdue_filter(models.ServiceCall, now))
             result = await db.execute(calls_query)
             overdue_calls = result.scalars().all()
             
@@ -146,7 +209,8 @@ async def check_overdue_items():
             logger.info(f"Checked overdue items: {len(overdue_jobs)} jobs, {len(overdue_calls)} service calls")
             
     except Exception as e:
-        logger.error(f"Error checking overdue items: {e}", exc_info=True)
+        logger.error(f"Error checking overdue items: {e}")
+        raise
 
 
 async def automate_review_requests():
@@ -203,7 +267,8 @@ async def automate_review_requests():
             logger.info(f"Review automation: {sent_count} sent, {reminder_count} reminders")
             
     except Exception as e:
-        logger.error(f"Error automating review requests: {e}", exc_info=True)
+        logger.error(f"Error automating review requests: {e}")
+        raise
 
 
 async def escalate_stale_items():
@@ -267,7 +332,8 @@ async def escalate_stale_items():
             logger.info(f"Escalation check: {len(stale_jobs)} stale jobs, {len(stale_calls)} stale service calls")
             
     except Exception as e:
-        logger.error(f"Error escalating stale items: {e}", exc_info=True)
+        logger.error(f"Error escalating stale items: {e}")
+        raise
 
 
 async def daily_summary():
@@ -277,23 +343,11 @@ async def daily_summary():
             # Count overdue items
             now = datetime.now(timezone.utc)
             
-            jobs_query = select(models.Job).where(
-                and_(
-                    models.Job.scheduled_end.isnot(None),
-                    models.Job.scheduled_end < now,
-                    models.Job.status != 'Completed'
-                )
-            )
+            jobs_query = select(models.Job).where(crud.overdue_filter(models.Job, now))
             result = await db.execute(jobs_query)
             overdue_jobs_count = len(result.scalars().all())
             
-            calls_query = select(models.ServiceCall).where(
-                and_(
-                    models.ServiceCall.scheduled_end.isnot(None),
-                    models.ServiceCall.scheduled_end < now,
-                    models.ServiceCall.status != 'Completed'
-                )
-            )
+            calls_query = select(models.ServiceCall).where(crud.overdue_filter(models.ServiceCall, now))
             result = await db.execute(calls_query)
             overdue_calls_count = len(result.scalars().all())
             
@@ -317,7 +371,8 @@ async def daily_summary():
             logger.info(f"Daily summary: {overdue_jobs_count} overdue jobs, {overdue_calls_count} overdue service calls")
             
     except Exception as e:
-        logger.error(f"Error generating daily summary: {e}", exc_info=True)
+        logger.error(f"Error generating daily summary: {e}")
+        raise
 
 
 
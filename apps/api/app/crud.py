@@ -1,23 +1,30 @@
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, update, delete, func, or_
+from sqlalchemy import select, update, delete, func, or_, and_, literal
 from sqlalchemy.orm import selectinload
 from sqlalchemy.exc import IntegrityError
 from . import models, schemas
+from .core import audit, cache, portal_rules, query_profiles, search as search_index
 from typing import Optional, List
 from uuid import UUID
 
+# Reference data caches (see core/cache.py); the write paths below invalidate them
+builder_ids: cache.Cache[str, UUID] = cache.register('builder_ids', maxsize=2048)
+portal_definitions: cache.Cache[str, List[schemas.PortalDefinitionOut]] = cache.register('portal_definitions', maxsize=1)
+
 async def create_builder(db: AsyncSession, builder_in: schemas.BuilderCreate, changed_by: str) -> models.Builder:
     builder = models.Builder(name=builder_in.name, notes=builder_in.notes)
     db.add(builder)
     await db.flush()
     # write audit
-    await db.execute(models.AuditLog.__table__.insert().values(
+    audit.record(db, [dict(
         tenant_id=None,
         entity_type='builder',
         entity_id=builder.id,
         action='create',
         changed_by=changed_by,
-    ))
+    )])
+    # A new name can change what an import name resolves to (exact match beats partial)
+    await cache.invalidate(db, 'builder_ids')
     try:
         await db.commit()
     except IntegrityError as e:
@@ -34,7 +41,7 @@ async def get_builder(db: AsyncSession, builder_id: UUID) -> Optional[models.Bui
 async def list_builders(db: AsyncSession, search: Optional[str], limit: int, offset: int) -> List[models.Builder]:
     q = select(models.Builder)
     if search:
-        q = q.where(models.Builder.name.ilike(f"%{search}%"))
+        q = q.where(search_index.matches('builder', search))
     q = q.order_by(models.Builder.name).limit(limit).offset(offset)
     res = await db.execute(q)
     return res.scalars().all()
@@ -43,7 +50,7 @@ async def update_builder(db: AsyncSession, builder: models.Builder, builder_in:
     if builder_in.name is not None:
         old = builder.name
         builder.name = builder_in.name
-        await db.execute(models.AuditLog.__table__.insert().values(
+        audit.record(db, [dict(
             tenant_id=None,
             entity_type='builder',
             entity_id=builder.id,
@@ -52,11 +59,11 @@ async def update_builder(db: AsyncSession, builder: models.Builder, builder_in:
             old_value=str(old),
             new_value=str(builder_in.name),
             changed_by=changed_by,
-        ))
+        )])
     if builder_in.notes is not None:
         old = builder.notes
         builder.notes = builder_in.notes
-        await db.execute(models.AuditLog.__table__.insert().values(
+        audit.record(db, [dict(
             tenant_id=None,
             entity_type='builder',
             entity_id=builder.id,
@@ -65,21 +72,25 @@ async def update_builder(db: AsyncSession, builder: models.Builder, builder_in:
             old_value=str(old) if old is not None else None,
             new_value=str(builder_in.notes) if builder_in.notes is not None else None,
             changed_by=changed_by,
-        ))
+        )])
+    if builder_in.name is not None:
+        await cache.invalidate(db, 'builder_ids')
     db.add(builder)
     await db.commit()
     await db.refresh(builder)
     return builder
 
 async def delete_builder(db: AsyncSession, builder: models.Builder, changed_by: str):
-    await db.execute(models.AuditLog.__table__.insert().values(
+    audit.record(db, [dict(
         tenant_id=None,
         entity_type='builder',
         entity_id=builder.id,
         action='delete',
         changed_by=changed_by,
-    ))
+    )])
     await db.delete(builder)
+    await cache.invalidate(db, 'builder_ids')
+    await cache.invalidate(db, 'portal_rule_index')  # Its portal links go with it
     await db.commit()
 
 # Builder contacts
@@ -87,13 +98,13 @@ async def create_builder_contact(db: AsyncSession, builder_id: UUID, contact_in:
     contact = models.BuilderContact(builder_id=builder_id, **contact_in.dict())
     db.add(contact)
     await db.flush()
-    await db.execute(models.AuditLog.__table__.insert().values(
+    audit.record(db, [dict(
         tenant_id=None,
         entity_type='builder_contact',
         entity_id=contact.id,
         action='create',
         changed_by=changed_by,
-    ))
+    )])
     await db.commit()
     await db.refresh(contact)
     return contact
@@ -116,7 +127,7 @@ async def update_builder_contact(db: AsyncSession, contact: models.BuilderContac
     for field, value in contact_in.dict(exclude_unset=True).items():
         old = getattr(contact, field)
         setattr(contact, field, value)
-        await db.execute(models.AuditLog.__table__.insert().values(
+        audit.record(db, [dict(
             tenant_id=None,
             entity_type='builder_contact',
             entity_id=contact.id,
@@ -125,36 +136,40 @@ async def update_builder_contact(db: AsyncSession, contact: models.BuilderContac
             old_value=str(old) if old is not None else None,
             new_value=str(value) if value is not None else None,
             changed_by=changed_by,
-        ))
+        )])
     db.add(contact)
     await db.commit()
     await db.refresh(contact)
     return contact
 
 async def delete_builder_contact(db: AsyncSession, contact: models.BuilderContact, changed_by: str):
-    await db.execute(models.AuditLog.__table__.insert().values(
+    audit.record(db, [dict(
         tenant_id=None,
         entity_type='builder_contact',
         entity_id=contact.id,
         action='delete',
         changed_by=changed_by,
-    ))
+    )])
     await db.delete(contact)
     await db.commit()
 
 # generic audit helper
 async def write_audit(db: AsyncSession, tenant_id: str | None, entity_type: str, entity_id: UUID, action: str, changed_by: str, field: str | None = None, old_value: str | None = None, new_value: str | None = None):
-    await db.execute(models.AuditLog.__table__.insert().values(
-        tenant_id=tenant_id,
-        entity_type=entity_type,
-        entity_id=entity_id,
-        action=action,
-        field=field,
-        old_value=old_value,
-        new_value=new_value,
-        changed_by=changed_by,
-    ))
-    # don't commit here, caller will commit
+    """Buffer one audit row; all rows buffered on the session are inserted together when the caller commits (core/audit.py)"""
+    audit.record(db, [{
+        'tenant_id': tenant_id,
+        'entity_type': entity_type,
+        'entity_id': entity_id,
+        'action': action,
+        'field': field,
+        'old_value': old_value,
+        'new_value': new_value,
+        'changed_by': changed_by,
+    }])
+
+async def write_audit_many(db: AsyncSession, entries: List[dict]):
+    """Buffer several audit rows. Each entry takes write_audit's keyword arguments."""
+    audit.record(db, entries)
 
 ### Bids
 async def create_bid(db: AsyncSession, bid_in: schemas.BidCreate, changed_by: str) -> models.Bid:
@@ -262,19 +277,32 @@ async def create_job(db: AsyncSession, job_in: schemas.JobCreate, changed_by: st
             await db.rollback()
             raise ValueError('Job uniqueness constraint violated')
         await db.refresh(job)
+        # JobOut renders both; a lazy load cannot run while the response is serialized
+        await db.refresh(job, ['builder', 'tasks'])
     return job
 
+def overdue_filter(model, now):
+    """
+    Jobs / service calls past their scheduled_end and not completed. 'Completed' is inlined
+    rather than bound so the planner can match the partial ix_<table>_overdue indexes.
+    """
+    return and_(
+        model.scheduled_end.isnot(None),
+        model.scheduled_end < now,
+        model.status != literal('Completed', literal_execute=True)
+    )
+
 async def get_job(db: AsyncSession, job_id: UUID) -> models.Job | None:
     res = await db.execute(
         select(models.Job)
         .where(models.Job.id == job_id)
-        .options(selectinload(models.Job.builder), selectinload(models.Job.tasks))
+        .options(*query_profiles.options('job', 'detail'))
     )
     return res.scalar_one_or_none()
 
-async def list_jobs(db: AsyncSession, tenant_id: str | None, status: str | None, builder_id: UUID | None, community: str | None, lot: str | None, search: str | None, scheduled_date: str | None = None, limit: int = 25, offset: int = 0):
+async def list_jobs(db: AsyncSession, tenant_id: str | None, status: str | None, builder_id: UUID | None, community: str | None, lot: str | None, search: str | None, scheduled_date: str | None = None, limit: int = 25, offset: int = 0, profile: str = 'list'):
     from datetime import datetime, timezone
-    q = select(models.Job).options(selectinload(models.Job.builder))
+    q = select(models.Job).options(*query_profiles.options('job', profile))
     if tenant_id:
         q = q.where(models.Job.tenant_id == tenant_id)
     if status:
@@ -286,7 +314,7 @@ async def list_jobs(db: AsyncSession, tenant_id: str | None, status: str | None,
     if lot:
         q = q.where(models.Job.lot_number.ilike(f"%{lot}%"))
     if search:
-        q = q.where(models.Job.address_line1.ilike(f"%{search}%") | models.Job.lot_number.ilike(f"%{search}%"))
+        q = q.where(search_index.matches('job', search))
     if scheduled_date:
         # Filter by scheduled_start date (match the date part only)
         try:
@@ -318,6 +346,7 @@ async def update_job(db: AsyncSession, job: models.Job, job_in: schemas.JobUpdat
     db.add(job)
     await db.commit()
     await db.refresh(job)
+    await db.refresh(job, ['builder', 'tasks'])  # As in create_job
     
     # Trigger automation if status changed
     if job_in.status is not None and old_status != job.status:
@@ -418,13 +447,13 @@ async def get_service_call(db: AsyncSession, sc_id: UUID) -> models.ServiceCall
     res = await db.execute(
         select(models.ServiceCall)
         .where(models.ServiceCall.id == sc_id)
-        .options(selectinload(models.ServiceCall.workflow))
+        .options(*query_profiles.options('service_call', 'detail'))
     )
     return res.scalar_one_or_none()
 
-async def list_service_calls(db: AsyncSession, tenant_id: str | None, status: str | None, builder_id: UUID | None, search: str | None, assigned_to: str | None = None, scheduled_date: str | None = None, customer_id: UUID | None = None, limit: int = 25, offset: int = 0):
+async def list_service_calls(db: AsyncSession, tenant_id: str | None, status: str | None, builder_id: UUID | None, search: str | None, assigned_to: str | None = None, scheduled_date: str | None = None, customer_id: UUID | None = None, limit: int = 25, offset: int = 0, profile: str = 'list'):
     from datetime import datetime, timezone
-    q = select(models.ServiceCall)
+    q = select(models.ServiceCall).options(*query_profiles.options('service_call', profile))
     if tenant_id:
         q = q.where(models.ServiceCall.tenant_id == tenant_id)
     if status:
@@ -434,7 +463,7 @@ async def list_service_calls(db: AsyncSession, tenant_id: str | None, status: st
     if customer_id:
         q = q.where(models.ServiceCall.customer_id == customer_id)
     if search:
-        q = q.where(models.ServiceCall.customer_name.ilike(f"%{search}%") | models.ServiceCall.address_line1.ilike(f"%{search}%"))
+        q = q.where(search_index.matches('service_call', search))
     if assigned_to:
         q = q.where(models.ServiceCall.assigned_to == assigned_to)
     if scheduled_date:
@@ -481,7 +510,7 @@ async def update_service_call(db: AsyncSession, sc: models.ServiceCall, sc_in: s
     # Trigger notification if assigned_to changed
     if sc_in.assigned_to is not None and old_assigned_to != sc.assigned_to:
         try:
-            from ..core.automation import create_notification
+            from ..core.notifications import create_notification
             if sc.assigned_to:
                 # Find user by username to get user_id
                 user_query = select(models.User).where(models.User.username == sc.assigned_to)
@@ -611,11 +640,21 @@ async def find_or_create_builder(db: AsyncSession, builder_name: str, changed_by
     if not builder_name:
         raise ValueError("Builder name is required")
     
+    # Imports repeat the same few builder names row after row: remember what each resolved to
+    key = builder_name.lower()
+    builder_id = builder_ids.get(key)
+    if builder_id is not None:
+        builder = await db.get(models.Builder, builder_id)
+        if builder:
+            return builder
+        builder_ids.invalidate(key)
+    
     q = select(models.Builder).where(func.lower(models.Builder.name) == func.lower(builder_name))
     res = await db.execute(q)
     builder = res.scalar_one_or_none()
     
     if builder:
+        builder_ids.set(key, builder.id)
         return builder
     
     q = select(models.Builder).where(models.Builder.name.ilike(f"%{builder_name}%"))
@@ -623,12 +662,15 @@ async def find_or_create_builder(db: AsyncSession, builder_name: str, changed_by
     builder = res.scalar_one_or_none()
     
     if builder:
+        builder_ids.set(key, builder.id)
         return builder
     
     builder = models.Builder(name=builder_name, notes=f"Auto-created during import by {changed_by}")
     db.add(builder)
     await db.flush()
     await write_audit(db, None, 'builder', builder.id, 'create', changed_by)
+    # As in create_builder: the new name can win partial matches other workers have cached
+    await cache.invalidate(db, 'builder_ids')
     try:
         await db.commit()
     except IntegrityError:
@@ -640,6 +682,7 @@ async def find_or_create_builder(db: AsyncSession, builder_name: str, changed_by
             return builder
         raise ValueError('Builder name must be unique')
     await db.refresh(builder)
+    builder_ids.set(key, builder.id)
     return builder
 
 # Portals Directory CRUD
@@ -649,6 +692,7 @@ async def create_portal_definition(db: AsyncSession, definition_in: schemas.Port
     db.add(definition)
     await db.flush()
     await write_audit(db, None, 'portal_definition', definition.id, 'create', changed_by)
+    await cache.invalidate(db, 'portal_definitions')
     await db.commit()
     await db.refresh(definition)
     return definition
@@ -658,15 +702,17 @@ async def get_portal_definition(db: AsyncSession, definition_id: UUID) -> Option
     res = await db.execute(q)
     return res.scalar_one_or_none()
 
-async def list_portal_definitions(db: AsyncSession, is_active: Optional[bool] = None, category: Optional[str] = None) -> List[models.PortalDefinition]:
-    q = select(models.PortalDefinition)
-    if is_active is not None:
-        q = q.where(models.PortalDefinition.is_active == is_active)
-    if category:
-        q = q.where(models.PortalDefinition.category == category)
-    q = q.order_by(models.PortalDefinition.name)
-    res = await db.execute(q)
-    return res.scalars().all()
+async def list_portal_definitions(db: AsyncSession, is_active: Optional[bool] = None, category: Optional[str] = None) -> List[schemas.PortalDefinitionOut]:
+    """Portal definitions by name, filtered from the cached full list (a few dozen rows, rarely edited)"""
+    async def load():
+        res = await db.execute(select(models.PortalDefinition).order_by(models.PortalDefinition.name))
+        return [schemas.PortalDefinitionOut.model_validate(d) for d in res.scalars()]
+
+    definitions = await portal_definitions.get_or_load('all', load)
+    return [
+        d for d in definitions
+        if (is_active is None or d.is_active == is_active) and (not category or d.category == category)
+    ]
 
 async def update_portal_definition(db: AsyncSession, definition: models.PortalDefinition, definition_in: schemas.PortalDefinitionUpdate, changed_by: str) -> models.PortalDefinition:
     for field, value in definition_in.dict(exclude_unset=True).items():
@@ -674,6 +720,8 @@ async def update_portal_definition(db: AsyncSession, definition: models.PortalDe
         setattr(definition, field, value)
         await write_audit(db, None, 'portal_definition', definition.id, 'update', changed_by, field, str(old) if old is not None else None, str(value) if value is not None else None)
     db.add(definition)
+    await cache.invalidate(db, 'portal_definitions')
+    await cache.invalidate(db, 'portal_rule_index')  # Accounts embed their definition
     await db.commit()
     await db.refresh(definition)
     return definition
@@ -681,6 +729,8 @@ async def update_portal_definition(db: AsyncSession, definition: models.PortalDe
 async def delete_portal_definition(db: AsyncSession, definition: models.PortalDefinition, changed_by: str):
     await write_audit(db, None, 'portal_definition', definition.id, 'delete', changed_by)
     await db.delete(definition)
+    await cache.invalidate(db, 'portal_definitions')
+    await cache.invalidate(db, 'portal_rule_index')
     await db.commit()
 
 async def create_portal_account(db: AsyncSession, account_in: schemas.PortalAccountCreate, changed_by: str) -> models.PortalAccount:
@@ -688,8 +738,10 @@ async def create_portal_account(db: AsyncSession, account_in: schemas.PortalAcco
     db.add(account)
     await db.flush()
     await write_audit(db, account.tenant_id, 'portal_account', account.id, 'create', changed_by)
+    await cache.invalidate(db, 'portal_rule_index')
     await db.commit()
     await db.refresh(account)
+    await db.refresh(account, ['portal_definition'])  # PortalAccountOut renders it
     return account
 
 async def get_portal_account(db: AsyncSession, account_id: UUID) -> Optional[models.PortalAccount]:
@@ -706,9 +758,8 @@ async def list_portal_accounts(db: AsyncSession, tenant_id: Optional[str] = None
     if search:
         q = q.join(models.PortalDefinition).where(
             or_(
-                models.PortalDefinition.name.ilike(f"%{search}%"),
-                models.PortalAccount.login_identifier.ilike(f"%{search}%"),
-                models.PortalAccount.account_number.ilike(f"%{search}%") if models.PortalAccount.account_number else False
+                models.PortalDefinition.name.ilike(search_index.like_pattern(search)),
+                search_index.matches('portal_account', search)
             )
         )
     q = q.order_by(models.PortalAccount.created_at.desc())
@@ -721,13 +772,16 @@ async def update_portal_account(db: AsyncSession, account: models.PortalAccount,
         setattr(account, field, value)
         await write_audit(db, account.tenant_id, 'portal_account', account.id, 'update', changed_by, field, str(old) if old is not None else None, str(value) if value is not None else None)
     db.add(account)
+    await cache.invalidate(db, 'portal_rule_index')
     await db.commit()
     await db.refresh(account)
+    await db.refresh(account, ['portal_definition'])  # PortalAccountOut renders it
     return account
 
 async def delete_portal_account(db: AsyncSession, account: models.PortalAccount, changed_by: str):
     await write_audit(db, account.tenant_id, 'portal_account', account.id, 'delete', changed_by)
     await db.delete(account)
+    await cache.invalidate(db, 'portal_rule_index')
     await db.commit()
 
 async def link_builder_portal_account(db: AsyncSession, builder_id: UUID, portal_account_id: UUID, changed_by: str) -> models.BuilderPortalAccount:
@@ -735,6 +789,7 @@ async def link_builder_portal_account(db: AsyncSession, builder_id: UUID, portal
     db.add(link)
     await db.flush()
     await write_audit(db, None, 'builder_portal_account', f"{builder_id}:{portal_account_id}", 'create', changed_by)
+    await cache.invalidate(db, 'portal_rule_index')
     await db.commit()
     await db.refresh(link)
     return link
@@ -749,6 +804,7 @@ async def unlink_builder_portal_account(db: AsyncSession, builder_id: UUID, port
     if link:
         await write_audit(db, None, 'builder_portal_account', f"{builder_id}:{portal_account_id}", 'delete', changed_by)
         await db.delete(link)
+        await cache.invalidate(db, 'portal_rule_index')
         await db.commit()
 
 async def get_builder_portal_accounts(db: AsyncSession, builder_id: UUID) -> List[models.PortalAccount]:
@@ -763,6 +819,7 @@ async def create_portal_rule(db: AsyncSession, rule_in: schemas.PortalRuleCreate
     db.add(rule)
     await db.flush()
     await write_audit(db, rule.tenant_id, 'portal_rule', rule.id, 'create', changed_by)
+    await cache.invalidate(db, 'portal_rule_index')
     await db.commit()
     await db.refresh(rule)
     return rule
@@ -790,6 +847,7 @@ async def update_portal_rule(db: AsyncSession, rule: models.PortalRule, rule_in:
         setattr(rule, field, value)
         await write_audit(db, rule.tenant_id, 'portal_rule', rule.id, 'update', changed_by, field, str(old) if old is not None else None, str(value) if value is not None else None)
     db.add(rule)
+    await cache.invalidate(db, 'portal_rule_index')
     await db.commit()
     await db.refresh(rule)
     return rule
@@ -797,6 +855,7 @@ async def update_portal_rule(db: AsyncSession, rule: models.PortalRule, rule_in:
 async def delete_portal_rule(db: AsyncSession, rule: models.PortalRule, changed_by: str):
     await write_audit(db, rule.tenant_id, 'portal_rule', rule.id, 'delete', changed_by)
     await db.delete(rule)
+    await cache.invalidate(db, 'portal_rule_index')
     await db.commit()
 
 async def suggest_portals(
@@ -808,64 +867,68 @@ async def suggest_portals(
     builder_id: Optional[UUID] = None,
     permit_required: Optional[bool] = None,
     phase: Optional[str] = None
-) -> List[models.PortalAccount]:
+) -> List[schemas.PortalAccountOut]:
     """
     Suggest portal accounts based on rules.
-    Returns ordered list (priority ascending, then by creation date).
+    Returns ordered list: builder-linked portals first, then rule matches by priority
+    (ties by creation date). Resolved from the in-memory index in core/portal_rules.py.
     """
-    # First, get builder-linked portals (highest priority)
-    builder_portals = []
-    if builder_id:
-        builder_portals = await get_builder_portal_accounts(db, builder_id)
-        builder_portals = [p for p in builder_portals if p.tenant_id == tenant_id and p.is_active]
-    
-    # Get matching rules
-    q = select(models.PortalRule).where(
-        models.PortalRule.applies_to == applies_to,
-        models.PortalRule.is_active == True
-    ).options(selectinload(models.PortalRule.portal_account).selectinload(models.PortalAccount.portal_definition))
-    
-    # Tenant filter: rule applies if tenant_id matches OR rule.tenant_id is None (both tenants)
-    q = q.where(or_(models.PortalRule.tenant_id == tenant_id, models.PortalRule.tenant_id.is_(None)))
-    
-    # Additional filters
-    if builder_id:
-        q = q.where(or_(models.PortalRule.builder_id == builder_id, models.PortalRule.builder_id.is_(None)))
-    if city:
-        q = q.where(or_(models.PortalRule.city == city, models.PortalRule.city.is_(None)))
-    if county:
-        q = q.where(or_(models.PortalRule.county == county, models.PortalRule.county.is_(None)))
-    if permit_required is not None:
-        q = q.where(or_(models.PortalRule.permit_required == permit_required, models.PortalRule.permit_required.is_(None)))
-    if phase:
-        q = q.where(or_(models.PortalRule.phase == phase, models.PortalRule.phase.is_(None)))
-    
-    q = q.order_by(models.PortalRule.priority.asc())
-    res = await db.execute(q)
-    rules = res.scalars().all()
-    
-    # Collect portal accounts from rules
-    rule_portals = []
-    seen_account_ids = set()
-    
-    for rule in rules:
-        if rule.portal_account and rule.portal_account.is_active and rule.portal_account.tenant_id == tenant_id:
-            if rule.portal_account.id not in seen_account_ids:
-                rule_portals.append(rule.portal_account)
-                seen_account_ids.add(rule.portal_account.id)
-    
-    # Combine: builder portals first, then rule portals
-    result = []
-    builder_account_ids = {p.id for p in builder_portals}
-    
-    for portal in builder_portals:
-        result.append(portal)
-    
-    for portal in rule_portals:
-        if portal.id not in builder_account_ids:
-            result.append(portal)
-    
-    return result
+    index = await portal_rules.get_index(db)
+    return index.suggest(portal_rules.PortalQuery(
+        applies_to=applies_to,
+        tenant_id=tenant_id,
+        builder_id=builder_id,
+        city=city,
+        county=county,
+        phase=phase,
+        permit_required=permit_required,
+    ))
+
+async def suggest_portals_many(db: AsyncSession, queries: List[portal_rules.PortalQuery]) -> List[List[schemas.PortalAccountOut]]:
+    """suggest_portals for many records at once (imports, list views), in the same order"""
+    index = await portal_rules.get_index(db)
+    return index.suggest_many(queries)
+
+async def suggest_portals_for_records(db: AsyncSession, applies_to: str, ids: List[UUID]) -> List[schemas.SuggestedPortalsForRecord]:
+    """
+    Suggested portals for many jobs or service calls (list views): one query for the fields
+    the rules match on, then the index. Request order is kept; unknown IDs are left out.
+    """
+    if not ids:
+        return []
+    if applies_to == 'job':
+        # Jobs record no county or permit decision
+        q = select(
+            models.Job.id, models.Job.tenant_id, models.Job.builder_id, models.Job.city, models.Job.phase,
+            literal(None).label('permit_required'),
+        ).where(models.Job.id.in_(ids))
+    else:
+        q = select(
+            models.ServiceCall.id, models.ServiceCall.tenant_id, models.ServiceCall.builder_id,
+            models.ServiceCall.city, literal(None).label('phase'),
+            models.ServiceCallWorkflow.needs_permit.label('permit_required'),
+        ).outerjoin(models.ServiceCall.workflow).where(models.ServiceCall.id.in_(ids))
+    records = {row.id: row for row in (await db.execute(q)).all()}
+    rows = [records[record_id] for record_id in dict.fromkeys(ids) if record_id in records]
+
+    suggestions = await suggest_portals_many(db, [
+        portal_rules.PortalQuery(
+            applies_to=applies_to,
+            tenant_id=row.tenant_id,
+            builder_id=row.builder_id,
+            city=row.city,
+            # Job phase is free text; rules use the lowercase enum (as the job page sends it)
+            phase=row.phase.lower() if row.phase else None,
+            permit_required=row.permit_required,
+            # What a record doesn't state (county, an open permit check) can't satisfy a rule scoped on it
+            exact=True,
+        )
+        for row in rows
+    ])
+    return [
+        schemas.SuggestedPortalsForRecord(id=row.id, portals=portals)
+        for row, portals in zip(rows, suggestions)
+    ]
 
 ### Customers
 async def create_customer(db: AsyncSession, customer_in: schemas.CustomerCreate, changed_by: str) -> models.Customer:
@@ -881,12 +944,11 @@ async def create_customer(db: AsyncSession, customer_in: schemas.CustomerCreate,
     await db.refresh(customer)
     return customer
 
-async def get_customer(db: AsyncSession, customer_id: UUID) -> Optional[models.Customer]:
-    res = await db.execute(
-        select(models.Customer)
-        .where(models.Customer.id == customer_id)
-        .options(selectinload(models.Customer.service_calls))
-    )
+async def get_customer(db: AsyncSession, customer_id: UUID, include_service_calls: bool = False) -> Optional[models.Customer]:
+    q = select(models.Customer).where(models.Customer.id == customer_id)
+    if include_service_calls:
+        q = q.options(selectinload(models.Customer.service_calls))
+    res = await db.execute(q)
     return res.scalar_one_or_none()
 
 async def list_customers(db: AsyncSession, tenant_id: str, search: Optional[str] = None, limit: int = 100, offset: int = 0) -> List[dict]:
@@ -895,15 +957,7 @@ async def list_customers(db: AsyncSession, tenant_id: str, search: Optional[str]
     ).where(models.Customer.tenant_id == tenant_id).group_by(models.Customer.id)
     
     if search:
-        search_term = f"%{search}%"
-        q = q.where(
-            or_(
-                models.Customer.name.ilike(search_term),
-                models.Customer.phone.ilike(search_term),
-                models.Customer.email.ilike(search_term),
-                models.Customer.address_line1.ilike(search_term)
-            )
-        )
+        q = q.where(search_index.matches('customer', search))
     
     q = q.order_by(models.Customer.created_at.desc()).limit(limit * 2).offset(offset)  # Get more to filter duplicates
     res = await db.execute(q)
@@ -926,8 +980,9 @@ async def list_customers(db: AsyncSession, tenant_id: str, search: Optional[str]
             continue  # Skip duplicate
         
         seen.add(unique_key)
+        # Plain values: the route encodes with orjson (core/responses.py)
         customer_dict = {
-            'id': str(customer.id),
+            'id': customer.id,
             'tenant_id': customer.tenant_id,
             'name': customer.name,
             'phone': customer.phone,
@@ -938,8 +993,8 @@ async def list_customers(db: AsyncSession, tenant_id: str, search: Optional[str]
             'zip': customer.zip,
             'notes': customer.notes,
             'tags': customer.tags,
-            'created_at': customer.created_at.isoformat() if customer.created_at else None,
-            'updated_at': customer.updated_at.isoformat() if customer.updated_at else None,
+            'created_at': customer.created_at,
+            'updated_at': customer.updated_at,
             'service_calls_count': service_calls_count or 0,
         }
         customers.append(customer_dict)
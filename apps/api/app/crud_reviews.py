@@ -2,6 +2,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, update, delete, func
 from sqlalchemy.exc import IntegrityError
 from . import models, schemas
+from .core import audit
 from typing import Optional, List
 from uuid import UUID
 import secrets
@@ -45,13 +46,13 @@ async def create_review_request(
     await db.flush()
     
     # Write audit log
-    await db.execute(models.AuditLog.__table__.insert().values(
+    audit.record(db, [dict(
         tenant_id=review_request.tenant_id,
         entity_type='review_request',
         entity_id=review_request.id,
         action='create',
         changed_by=changed_by,
-    ))
+    )])
     
     try:
         await db.commit()
@@ -104,7 +105,7 @@ async def update_review_request(
     if review_request_in.status is not None:
         old_status = review_request.status
         review_request.status = review_request_in.status
-        await db.execute(models.AuditLog.__table__.insert().values(
+        audit.record(db, [dict(
             tenant_id=review_request.tenant_id,
             entity_type='review_request',
             entity_id=review_request.id,
@@ -113,7 +114,7 @@ async def update_review_request(
             old_value=old_status,
             new_value=review_request_in.status,
             changed_by=changed_by,
-        ))
+        )])
     
     if review_request_in.sent_at is not None:
         review_request.sent_at = review_request_in.sent_at
@@ -169,13 +170,13 @@ async def create_review(
     review_request.completed_at = datetime.now(timezone.utc)
     
     # Write audit log
-    await db.execute(models.AuditLog.__table__.insert().values(
+    audit.record(db, [dict(
         tenant_id=review_request.tenant_id,
         entity_type='review',
         entity_id=review.id,
         action='create',
         changed_by=changed_by,
-    ))
+    )])
     
     try:
         await db.commit()
@@ -240,7 +241,7 @@ async def update_review(
     if review_in.is_public is not None:
         old_value = str(review.is_public)
         review.is_public = review_in.is_public
-        await db.execute(models.AuditLog.__table__.insert().values(
+        audit.record(db, [dict(
             tenant_id=None,  # Get from review_request if needed
             entity_type='review',
             entity_id=review.id,
@@ -249,7 +250,7 @@ async def update_review(
             old_value=old_value,
             new_value=str(review_in.is_public),
             changed_by=changed_by,
-        ))
+        )])
     
     await db.commit()
     await db.refresh(review)
@@ -275,13 +276,13 @@ async def create_recovery_ticket(
     await db.flush()
     
     # Write audit log
-    await db.execute(models.AuditLog.__table__.insert().values(
+    audit.record(db, [dict(
         tenant_id=ticket.tenant_id,
         entity_type='recovery_ticket',
         entity_id=ticket.id,
         action='create',
         changed_by=changed_by,
-    ))
+    )])
     
     try:
         await db.commit()
@@ -325,7 +326,7 @@ async def update_recovery_ticket(
     if ticket_in.status is not None:
         old_status = ticket.status
         ticket.status = ticket_in.status
-        await db.execute(models.AuditLog.__table__.insert().values(
+        audit.record(db, [dict(
             tenant_id=ticket.tenant_id,
             entity_type='recovery_ticket',
             entity_id=ticket.id,
@@ -334,12 +335,12 @@ async def update_recovery_ticket(
             old_value=old_status,
             new_value=ticket_in.status,
             changed_by=changed_by,
-        ))
+        )])
     
     if ticket_in.assigned_to is not None:
         old_value = ticket.assigned_to or ''
         ticket.assigned_to = ticket_in.assigned_to
-        await db.execute(models.AuditLog.__table__.insert().values(
+        audit.record(db, [dict(
             tenant_id=ticket.tenant_id,
             entity_type='recovery_ticket',
             entity_id=ticket.id,
@@ -348,7 +349,7 @@ async def update_recovery_ticket(
             old_value=old_value,
             new_value=ticket_in.assigned_to or '',
             changed_by=changed_by,
-        ))
+        )])
     
     if ticket_in.resolution_notes is not None:
         ticket.resolution_notes = ticket_in.resolution_notes
@@ -367,7 +368,7 @@ async def mark_review_request_as_lost(
     review_request.status = 'lost'
     
     # Write audit log
-    await db.execute(models.AuditLog.__table__.insert().values(
+    audit.record(db, [dict(
         tenant_id=review_request.tenant_id,
         entity_type='review_request',
         entity_id=review_request.id,
@@ -376,7 +377,7 @@ async def mark_review_request_as_lost(
         old_value=old_status,
         new_value='lost',
         changed_by=changed_by,
-    ))
+    )])
     
     await db.commit()
     await db.refresh(review_request)
@@ -0,0 +1,67 @@
+"""
+SQL behind the trigger-maintained notification_unread_counts table
+
+Defined once for both ways a schema gets built: migration 0035 runs it on real databases and
+models.py attaches it to create_all() (tests, bench). Plain strings only, so the migration can
+import this without pulling in the app.
+
+Statement-level triggers with transition tables: one grouped upsert per statement, however many
+rows it touched (marking 10,000 notifications read is a single counter write per recipient).
+The nil UUID stands for tenant-wide notifications (user_id NULL).
+
+The function is CREATE OR REPLACE: changing it here means a new migration that re-runs
+SYNC_FUNCTION, since 0035 has already run on existing databases.
+"""
+
+SYNC_FUNCTION = """
+    CREATE OR REPLACE FUNCTION notification_unread_counts_sync() RETURNS trigger
+    LANGUAGE plpgsql AS $$
+    BEGIN
+        IF TG_OP = 'TRUNCATE' THEN
+            DELETE FROM notification_unread_counts;
+        ELSIF TG_OP = 'INSERT' THEN
+            INSERT INTO notification_unread_counts AS c (tenant_id, user_id, unread)
+            SELECT tenant_id, coalesce(user_id, '00000000-0000-0000-0000-000000000000'), count(*)
+            FROM new_rows WHERE NOT read
+            GROUP BY 1, 2 ORDER BY 1, 2
+            ON CONFLICT (tenant_id, user_id) DO UPDATE SET unread = c.unread + excluded.unread;
+        ELSIF TG_OP = 'DELETE' THEN
+            INSERT INTO notification_unread_counts AS c (tenant_id, user_id, unread)
+            SELECT tenant_id, coalesce(user_id, '00000000-0000-0000-0000-000000000000'), -count(*)
+            FROM old_rows WHERE NOT read
+            GROUP BY 1, 2 ORDER BY 1, 2
+            ON CONFLICT (tenant_id, user_id) DO UPDATE SET unread = greatest(c.unread + excluded.unread, 0);
+        ELSE
+            INSERT INTO notification_unread_counts AS c (tenant_id, user_id, unread)
+            SELECT tenant_id, coalesce(user_id, '00000000-0000-0000-0000-000000000000'), sum(delta)
+            FROM (
+                SELECT tenant_id, user_id, 1 AS delta FROM new_rows WHERE NOT read
+                UNION ALL
+                SELECT tenant_id, user_id, -1 FROM old_rows WHERE NOT read
+            ) changes
+            GROUP BY 1, 2 HAVING sum(delta) <> 0 ORDER BY 1, 2
+            ON CONFLICT (tenant_id, user_id) DO UPDATE SET unread = greatest(c.unread + excluded.unread, 0);
+        END IF;
+        RETURN NULL;
+    END
+    $$
+"""
+
+# (name, event, transition tables)
+TRIGGERS = [
+    ('notifications_unread_insert', 'INSERT', 'REFERENCING NEW TABLE AS new_rows'),
+    ('notifications_unread_update', 'UPDATE', 'REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows'),
+    ('notifications_unread_delete', 'DELETE', 'REFERENCING OLD TABLE AS old_rows'),
+    ('notifications_unread_truncate', 'TRUNCATE', ''),
+]
+
+
+def create_trigger(name: str, event: str, referencing: str) -> str:
+    return f"""
+        CREATE TRIGGER {name} AFTER {event} ON notifications
+        {referencing} FOR EACH STATEMENT EXECUTE FUNCTION notification_unread_counts_sync()
+    """
+
+
+# Everything to run once the notification_unread_counts table exists
+DDL = [SYNC_FUNCTION] + [create_trigger(*trigger) for trigger in TRIGGERS]
@@ -1,11 +1,31 @@
+import time
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 from ..core.config import settings
+from ..core import query_stats, metrics
+
+
+class InstrumentedQueuePool(AsyncAdaptedQueuePool):
+    """Default async queue pool, plus checkout wait / timeout metrics (see core/metrics.py)"""
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        except PoolTimeoutError:
+            metrics.db_pool_checkout_timeouts.inc()
+            raise
+        finally:
+            metrics.db_pool_checkout_wait.observe(time.perf_counter() - started)
+
 
 # Configure connection pooling for production scalability
 # Note: Disable prepared statements for pgbouncer compatibility (Supabase uses pgbouncer)
 engine = create_async_engine(
     settings.database_url,
+    poolclass=InstrumentedQueuePool,
     pool_size=20,  # Number of connections to maintain
     max_overflow=10,  # Additional connections beyond pool_size
     pool_timeout=30,  # Seconds to wait for connection from pool
@@ -21,6 +41,12 @@ engine = create_async_engine(
 )
 AsyncSessionLocal = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
 
+metrics.register_pool_gauges(engine)
+
+# Per-request query count / DB time (see core/query_stats.py)
+if settings.query_stats_enabled:
+    query_stats.instrument_engine(engine)
+
 async def get_session() -> AsyncSession:
     async with AsyncSessionLocal() as session:
         yield session
@@ -1,11 +1,7 @@
-from fastapi import FastAPI, HTTPException, Depends
-from fastapi.middleware.cors import CORSMiddleware
-from slowapi import _rate_limit_exceeded_handler
-from slowapi.errors import RateLimitExceeded
-from .api.router import router
+from fastapi import FastAPI, HTTPException, Depends, Request, Response
+from fastapi.responses import PlainTextResponse
 from .core.config import settings
-from .core.rate_limit import limiter
-from .core.auth import get_current_user
+from typing import Optional
 import asyncio
 import logging
 from contextlib import asynccontextmanager
@@ -153,87 +149,18 @@ async def ensure_default_users():
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Lifespan context manager for startup and shutdown"""
+    from .runtime import Runtime
+    
     logger.info("=" * 50)
     logger.info("Starting Plumbing Ops API")
     logger.info("=" * 50)
+    logger.info(f"CORS allowed origins ({len(settings.cors_origins_list)}): {', '.join(settings.cors_origins_list)}")
     
+    # Which background components run alongside HTTP depends on APP_ROLE ('web' runs none)
+    runtime = Runtime(settings.app_role)
+    app.state.runtime = runtime
     try:
-        # Check DATABASE_URL
-        if not settings.database_url or settings.database_url == "postgresql+asyncpg://postgres:postgres@db:5432/plumbing":
-            logger.error("ERROR: DATABASE_URL not set correctly!")
-        else:
-            logger.info("Database URL configured")
-            
-            # Test database connection
-            try:
-                from .db.session import engine
-                from sqlalchemy import text
-                
-                async with engine.begin() as conn:
-                    await conn.execute(text("SELECT 1"))
-                
-                logger.info("✓ Database connection successful")
-                
-                # Create admin user
-                await ensure_admin_user()
-                
-                # Create default users (max and northwynd)
-                await ensure_default_users()
-                
-                # Start background scheduler
-                try:
-                    from .core.scheduler import start_scheduler, get_scheduler
-                    from .core.tasks import check_overdue_items, automate_review_requests, escalate_stale_items, daily_summary, topoff_marketing_slots
-                    from apscheduler.triggers.cron import CronTrigger
-                    from apscheduler.triggers.interval import IntervalTrigger
-                    
-                    scheduler = get_scheduler()
-                    
-                    # Schedule tasks
-                    scheduler.add_job(
-                        check_overdue_items,
-                        trigger=IntervalTrigger(hours=1),
-                        id='check_overdue_items',
-                        replace_existing=True
-                    )
-                    
-                    scheduler.add_job(
-                        automate_review_requests,
-                        trigger=IntervalTrigger(minutes=15),
-                        id='automate_review_requests',
-                        replace_existing=True
-                    )
-                    
-                    scheduler.add_job(
-                        escalate_stale_items,
-                        trigger=IntervalTrigger(hours=6),
-                        id='escalate_stale_items',
-                        replace_existing=True
-                    )
-                    
-                    scheduler.add_job(
-                        daily_summary,
-                        trigger=CronTrigger(hour=8, minute=0),
-                        id='daily_summary',
-                        replace_existing=True
-                    )
-                    
-                    # Marketing slot top-off: run daily at 2 AM
-                    scheduler.add_job(
-                        topoff_marketing_slots,
-                        trigger=CronTrigger(hour=2, minute=0),
-                        id='topoff_marketing_slots',
-                        replace_existing=True
-                    )
-                    
-                    start_scheduler()
-                    logger.info("✓ Background scheduler configured and started")
-                except Exception as e:
-                    logger.warning(f"⚠ Could not start scheduler: {e}", exc_info=True)
-                    
-            except Exception as e:
-                logger.error(f"✗ Database connection failed: {e}", exc_info=True)
-        
+        await runtime.start()
         logger.info("Startup complete - API ready!")
         global _startup_complete
         _startup_complete = True
@@ -244,96 +171,164 @@ async def lifespan(app: FastAPI):
     
     # Shutdown
     logger.info("Shutting down...")
-    try:
-        from .core.scheduler import shutdown_scheduler
-        shutdown_scheduler()
-    except Exception as e:
-        logger.warning(f"Error shutting down scheduler: {e}")
-
-app = FastAPI(title="Plumbing Ops Platform API", version="1.0.0", lifespan=lifespan)
+    await runtime.stop()
 
-# Add rate limiting
-app.state.limiter = limiter
-app.add_exception_handler(RateLimitExceeded, _rate_limit_exceeded_handler)
+API_PREFIX = "/api/v1"
 
-# #region agent log
-logger.info(f"CORS Configuration: allow_origins={settings.cors_origins_list}, cors_origins_raw={settings._cors_origins_raw}")
-logger.info(f"CORS allowed origins count: {len(settings.cors_origins_list)}")
-for origin in settings.cors_origins_list:
-    logger.info(f"  - {origin}")
-# #endregion
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=settings.cors_origins_list,
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
-
-# API versioning - all routes under /api/v1
-app.include_router(router, prefix="/api/v1")
-
-@app.get("/health")
-async def health():
-    """Health check endpoint"""
-    try:
-        from .db.session import engine
-        from sqlalchemy import text
-        async with engine.begin() as conn:
-            await conn.execute(text("SELECT 1"))
-        return {
-            "status": "ok",
-            "database": "connected",
-            "database_url_set": bool(settings.database_url and settings.database_url != "postgresql+asyncpg://postgres:postgres@db:5432/plumbing")
-        }
-    except Exception as e:
-        return {
-            "status": "error",
-            "database": "disconnected",
-            "error": str(e),
-            "database_url_set": bool(settings.database_url and settings.database_url != "postgresql+asyncpg://postgres:postgres@db:5432/plumbing")
-        }
 
-@app.get("/debug/startup")
-async def debug_startup(current_user=Depends(get_current_user)):
-    """Debug endpoint to check startup status (admin only)"""
-    from .db.session import AsyncSessionLocal
-    from .models import User
-    from sqlalchemy import select
+def create_app(lazy_routers: Optional[bool] = None) -> FastAPI:
+    """
+    Build the API application
     
-    # Only allow admins to access debug endpoint
-    if current_user.role != "admin":
-        raise HTTPException(status_code=403, detail="Admin access required")
+    Args:
+        lazy_routers: Import feature routers on first use instead of at startup
+            (default: LAZY_ROUTERS env var). Used by the serverless entrypoint.
+    """
+    from fastapi.middleware.cors import CORSMiddleware
+    from .api.router import router, ROUTER_MODULES, load_feature_router
+    from .core.rate_limit import RateLimitMiddleware
+    from .core.auth import get_current_user
+    from .core.lazy_routers import LazyRouterMounts, LazyRouterMiddleware, mount_feature_routers
+    from .core.query_stats import QueryStatsMiddleware
+    from .core import metrics
+    from .core.responses import FastJSONResponse
     
-    try:
-        async with AsyncSessionLocal() as db:
-            result = await db.execute(select(User).where(User.username == "admin"))
-            admin_user = result.scalar_one_or_none()
-            
+    if lazy_routers is None:
+        lazy_routers = settings.lazy_routers
+    
+    # orjson for every JSON response; large lists return FastJSONResponse directly (see core/responses.py)
+    app = FastAPI(
+        title="Plumbing Ops Platform API", version="1.0.0", lifespan=lifespan, default_response_class=FastJSONResponse
+    )
+    
+    # Rate limiting per RATE_LIMITS class (see core/rate_limit.py). Added before CORS so that
+    # CORS wraps it and browsers can read 429 responses
+    app.add_middleware(RateLimitMiddleware, prefix=API_PREFIX)
+    
+    app.add_middleware(
+        CORSMiddleware,
+        allow_origins=settings.cors_origins_list,
+        allow_credentials=True,
+        allow_methods=["*"],
+        allow_headers=["*"],
+        expose_headers=["Server-Timing"],
+    )
+    
+    # Query count / DB time per request (Server-Timing header + log line)
+    if settings.query_stats_enabled:
+        app.add_middleware(QueryStatsMiddleware)
+    app.add_middleware(metrics.MetricsMiddleware)
+    
+    # API versioning - all routes under /api/v1
+    # Feature routers come first so they take precedence over the core routes
+    if lazy_routers:
+        mounts = LazyRouterMounts(app, ROUTER_MODULES, load_feature_router, API_PREFIX)
+        app.state.router_mounts = mounts
+        app.add_middleware(LazyRouterMiddleware, mounts=mounts)
+    else:
+        mount_feature_routers(app, ROUTER_MODULES, load_feature_router, API_PREFIX)
+    app.include_router(router, prefix=API_PREFIX)
+    
+    @app.get("/health")
+    async def health():
+        """Health check endpoint"""
+        try:
+            from .db.session import engine
+            from sqlalchemy import text
+            async with engine.begin() as conn:
+                await conn.execute(text("SELECT 1"))
+            return {
+                "status": "ok",
+                "database": "connected",
+                "database_url_set": bool(settings.database_url and settings.database_url != "postgresql+asyncpg://postgres:postgres@db:5432/plumbing")
+            }
+        except Exception as e:
             return {
-                "database_connected": True,
-                "admin_user_exists": admin_user is not None,
-                "admin_user_active": admin_user.is_active if admin_user else False,
+                "status": "error",
+                "database": "disconnected",
+                "error": str(e),
+                "database_url_set": bool(settings.database_url and settings.database_url != "postgresql+asyncpg://postgres:postgres@db:5432/plumbing")
+            }
+    
+    @app.get("/health/live")
+    async def health_live():
+        """Liveness probe - the process is serving requests"""
+        return {"status": "ok"}
+    
+    @app.get("/health/ready")
+    async def health_ready(response: Response):
+        """Readiness probe - 503 until startup finished, while draining or when the database is unreachable"""
+        from .runtime import check_database
+        
+        runtime = getattr(app.state, "runtime", None)
+        if runtime is None:
+            response.status_code = 503
+            return {"ready": False, "checks": {"started": False}}
+        # Re-check the database so a lost connection takes the replica out of rotation
+        runtime.database_ready = await check_database()
+        report = runtime.readiness()
+        if not report["ready"]:
+            response.status_code = 503
+        return report
+    
+    @app.get("/metrics", include_in_schema=False)
+    async def metrics_endpoint(request: Request):
+        """Prometheus text format metrics for this process (bearer METRICS_TOKEN when set)"""
+        if settings.metrics_token and request.headers.get("authorization") != f"Bearer {settings.metrics_token}":
+            raise HTTPException(status_code=401, detail="Invalid metrics token")
+        return PlainTextResponse(metrics.render_metrics(), media_type=metrics.CONTENT_TYPE)
+    
+    @app.get("/debug/startup")
+    async def debug_startup(current_user=Depends(get_current_user)):
+        """Debug endpoint to check startup status (admin only)"""
+        from .db.session import AsyncSessionLocal
+        from .models import User
+        from sqlalchemy import select
+        
+        # Only allow admins to access debug endpoint
+        if current_user.role != "admin":
+            raise HTTPException(status_code=403, detail="Admin access required")
+        
+        try:
+            async with AsyncSessionLocal() as db:
+                result = await db.execute(select(User).where(User.username == "admin"))
+                admin_user = result.scalar_one_or_none()
+                
+                return {
+                    "database_connected": True,
+                    "admin_user_exists": admin_user is not None,
+                    "admin_user_active": admin_user.is_active if admin_user else False,
+                    "database_url_configured": bool(settings.database_url),
+                    "admin_password_set": bool(settings.admin_password)
+                }
+        except Exception as e:
+            return {
+                "database_connected": False,
+                "error": str(e),
                 "database_url_configured": bool(settings.database_url),
                 "admin_password_set": bool(settings.admin_password)
             }
-    except Exception as e:
-        return {
-            "database_connected": False,
-            "error": str(e),
-            "database_url_configured": bool(settings.database_url),
-            "admin_password_set": bool(settings.admin_password)
-        }
+    
+    # Add a root path for quick check
+    @app.get("/")
+    async def root():
+        # Fallback: ensure admin user exists on first request if startup didn't run
+        global _startup_complete
+        if not _startup_complete:
+            try:
+                await ensure_admin_user()
+                _startup_complete = True
+            except:
+                pass
+        return {"message": "Plumbing Ops API"}
+    
+    return app
 
-# Add a root path for quick check
-@app.get("/")
-async def root():
-    # Fallback: ensure admin user exists on first request if startup didn't run
-    global _startup_complete
-    if not _startup_complete:
-        try:
-            await ensure_admin_user()
-            _startup_complete = True
-        except:
-            pass
-    return {"message": "Plumbing Ops API"}
+
+def __getattr__(name: str):
+    """Build the default `app` on first access (uvicorn app.main:app, tests) rather than at import"""
+    if name == "app":
+        app = create_app()
+        globals()["app"] = app
+        return app
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -4,6 +4,7 @@ from sqlalchemy import (
     Text,
     Date,
     Integer,
+    BigInteger,
     DateTime,
     ForeignKey,
     Numeric,
@@ -11,12 +12,17 @@ from sqlalchemy import (
     UniqueConstraint,
     Table,
     Boolean,
+    Index,
+    DDL,
+    event,
 )
 from sqlalchemy.dialects.postgresql import UUID, ARRAY, JSON
 from sqlalchemy.orm import declarative_base, relationship
-from sqlalchemy.sql import func
+from sqlalchemy.sql import func, text
 import uuid
 
+from .db import notification_counts
+
 Base = declarative_base()
 
 # User Management Models
@@ -295,6 +301,12 @@ class JobContact(Base):
 
 class AuditLog(Base):
     __tablename__ = "audit_log"
+    # Range-partitioned by month on changed_at in migrated databases (0031), hence the composite key
+    __table_args__ = (
+        Index('ix_audit_log_entity', 'entity_type', 'entity_id', 'changed_at'),
+        Index('ix_audit_log_tenant_changed_at', 'tenant_id', 'changed_at'),
+        Index('ix_audit_log_changed_at', 'changed_at'),
+    )
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     tenant_id = Column(Text, nullable=True)
@@ -305,7 +317,36 @@ class AuditLog(Base):
     old_value = Column(Text, nullable=True)
     new_value = Column(Text, nullable=True)
     changed_by = Column(Text, nullable=False)
-    changed_at = Column(DateTime(timezone=True), server_default=func.now())
+    changed_at = Column(DateTime(timezone=True), primary_key=True, server_default=func.now())
+
+class AuditOutbox(Base):
+    """Audit rows waiting to be drained into audit_log (AUDIT_MODE=outbox, see core/audit.py)"""
+    __tablename__ = "audit_outbox"
+    # Unlogged: no WAL on the request path; crash recovery empties it
+    __table_args__ = {'prefixes': ['UNLOGGED']}
+
+    seq = Column(BigInteger, primary_key=True, autoincrement=True)
+    id = Column(UUID(as_uuid=True), nullable=False, default=uuid.uuid4)
+    tenant_id = Column(Text, nullable=True)
+    entity_type = Column(Text, nullable=False)
+    entity_id = Column(UUID(as_uuid=True), nullable=False)
+    action = Column(Text, nullable=False)
+    field = Column(Text, nullable=True)
+    old_value = Column(Text, nullable=True)
+    new_value = Column(Text, nullable=True)
+    changed_by = Column(Text, nullable=False)
+    changed_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
+
+class RateLimitCounter(Base):
+    """Sliding-window rate limit counters shared by all processes (RATE_LIMIT_BACKEND=postgres, see core/rate_limit.py)"""
+    __tablename__ = "rate_limit_counters"
+    # Unlogged: no WAL for a write per request; losing the counters on a crash only resets the windows
+    __table_args__ = {'prefixes': ['UNLOGGED']}
+
+    key = Column(Text, primary_key=True)  # '<class>:t:<tenant>:u:<user>' or '<class>:ip:<address>'
+    window_start = Column(BigInteger, primary_key=True)  # Epoch seconds
+    hits = Column(Integer, nullable=False, default=0)
+    expires_at = Column(BigInteger, nullable=False)  # Epoch seconds; purged after this
 
 # Marketing Module Models
 
@@ -388,6 +429,9 @@ class MediaAsset(Base):
     file_size = Column(Integer, nullable=True)  # Size in bytes
     mime_type = Column(String, nullable=True)
     intent_tags = Column(ARRAY(Text), nullable=True)  # Tags like 'before_after', 'crew', 'job_site', 'emergency', 'water_heater', 'drain', 'sewer'
+    object_key = Column(String, nullable=True)  # Storage key of the original (used to build renditions)
+    renditions = Column(JSON, nullable=True)  # {"thumbnail": url, "web": url, "instagram": url, "facebook": url}
+    derivatives_status = Column(String, nullable=True)  # 'pending', 'ready', 'failed', 'skipped'
     created_at = Column(DateTime(timezone=True), server_default=func.now())
 
     content_item = relationship("ContentItem", back_populates="media_assets")
@@ -629,7 +673,33 @@ class Notification(Base):
     entity_type = Column(String, nullable=True)  # 'job', 'service_call', 'review_request', 'recovery_ticket'
     entity_id = Column(UUID(as_uuid=True), nullable=True)
     read = Column(Boolean, nullable=False, default=False)
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    created_at = Column(DateTime(timezone=True), server_default=func.now())  # Latest occurrence for digest rows
+    # Repeated alerts fold into one row (see core/notifications.py)
+    dedupe_key = Column(Text, nullable=True)  # None = not deduplicated
+    occurrences = Column(Integer, nullable=False, default=1, server_default='1')
+    first_occurred_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    __table_args__ = (
+        Index('uq_notifications_dedupe_key', 'dedupe_key', unique=True, postgresql_where=text('dedupe_key IS NOT NULL')),
+        Index('ix_notifications_read_purge', 'created_at', postgresql_where=text('read')),
+    )
+
+# Recipient key of tenant-wide notifications in notification_unread_counts
+NOTIFICATION_BROADCAST = uuid.UUID(int=0)
+
+class NotificationUnreadCount(Base):
+    """Unread notifications per recipient, kept up to date by triggers on notifications (0035)"""
+    __tablename__ = "notification_unread_counts"
+
+    # Key leads with user_id: personal counts are looked up by user, tenant-wide ones by (nil, tenant)
+    user_id = Column(UUID(as_uuid=True), primary_key=True)  # NOTIFICATION_BROADCAST = tenant-wide notifications
+    tenant_id = Column(Text, primary_key=True)
+    unread = Column(Integer, nullable=False, default=0)
+
+# Same trigger SQL as migration 0035 (db/notification_counts.py), installed here too so
+# create_all() databases (tests) keep the counters
+for statement in notification_counts.DDL:
+    event.listen(Notification.__table__, 'after_create', DDL(statement).execute_if(dialect='postgresql'))
 
 # Portals Directory Models
 
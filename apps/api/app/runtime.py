@@ -0,0 +1,307 @@
+"""
+Process roles - which parts of the platform a process runs
+
+    web        HTTP API only (scale replicas freely)
+    scheduler  APScheduler jobs and the admin/dev user bootstrap (run exactly one)
+    publisher  AutoPoster loop (scale independently during campaign bursts)
+    all        everything in one process (development and single-container deploys)
+
+The role comes from APP_ROLE or the CLI:
+
+    python -m app.runtime --role web --port 8000
+    python -m app.runtime --role publisher --probe-port 8001
+
+Every role shares the same engine bootstrap, drains in-flight work on SIGTERM and exposes
+readiness - /health/ready on web roles, a small probe server on worker roles.
+"""
+import argparse
+import asyncio
+import logging
+import signal
+from datetime import datetime, timezone
+from typing import Optional
+
+from .core.config import settings
+
+logger = logging.getLogger(__name__)
+
+ROLE_COMPONENTS = {
+    'web': {'web'},
+    'scheduler': {'scheduler'},
+    'publisher': {'publisher'},
+    'all': {'web', 'scheduler', 'publisher'},
+}
+ROLES = tuple(ROLE_COMPONENTS)
+
+DEFAULT_DATABASE_URL = "postgresql+asyncpg://postgres:postgres@db:5432/plumbing"
+
+
+async def check_database() -> bool:
+    """SELECT 1 through the shared engine"""
+    if not settings.database_url or settings.database_url == DEFAULT_DATABASE_URL:
+        logger.error("ERROR: DATABASE_URL not set correctly!")
+        return False
+    try:
+        from .db.session import engine
+        from sqlalchemy import text
+
+        async with engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+        return True
+    except Exception as e:
+        logger.error(f"✗ Database connection failed: {e}", exc_info=True)
+        return False
+
+
+class Runtime:
+    """Starts, reports on and gracefully stops the components of one process role"""
+
+    def __init__(self, role: str):
+        if role not in ROLE_COMPONENTS:
+            raise ValueError(f"Unknown role '{role}'. Expected one of: {', '.join(ROLES)}")
+        self.role = role
+        self.components = ROLE_COMPONENTS[role]
+        self.database_ready = False
+        self.started = False
+        self.stopping = False
+        self.started_at: Optional[datetime] = None
+        self.publisher = None
+        self.publisher_task: Optional[asyncio.Task] = None
+        self.audit_drainer = None
+        self.audit_drainer_task: Optional[asyncio.Task] = None
+        self.listener_task: Optional[asyncio.Task] = None
+
+    async def start(self):
+        logger.info(f"Starting role '{self.role}' ({', '.join(sorted(self.components))})")
+        self.database_ready = await check_database()
+        if self.database_ready:
+            logger.info("✓ Database connection successful")
+
+        # Every role reads cached reference data (core/cache.py), so every role hears invalidations
+        if settings.cache_listen:
+            from .core import cache
+
+            cache.listen()
+
+        if 'scheduler' in self.components and self.database_ready:
+            await self.start_scheduler()
+
+        if 'web' in self.components:
+            from .core.notification_stream import hub
+
+            hub.listen()
+
+        # One LISTEN connection for every channel registered above
+        from .core.pg_listener import listener
+
+        if listener.channels:
+            self.listener_task = asyncio.create_task(listener.run_forever())
+
+        if 'publisher' in self.components:
+            from .workers.auto_poster import AutoPoster
+
+            self.publisher = AutoPoster()
+            self.publisher_task = asyncio.create_task(self.publisher.run_forever())
+
+        # Every role writes audit rows, so every role drains its own (memory) or the shared outbox
+        if settings.audit_mode in ('outbox', 'memory'):
+            from .core.audit import AuditDrainer
+
+            self.audit_drainer = AuditDrainer(settings.audit_mode)
+            self.audit_drainer_task = asyncio.create_task(self.audit_drainer.run_forever())
+        elif settings.audit_mode != 'sync':
+            logger.warning(f"⚠ Unknown AUDIT_MODE '{settings.audit_mode}' - writing audit rows synchronously")
+
+        self.started = True
+        self.started_at = datetime.now(timezone.utc)
+        logger.info(f"✓ Role '{self.role}' ready")
+
+    async def start_scheduler(self):
+        """One-off bootstrap plus periodic jobs - owned by the scheduler so web replicas skip them"""
+        from .main import ensure_admin_user, ensure_default_users
+        from .core.scheduler import register_jobs, start_scheduler
+
+        await ensure_admin_user()
+        await ensure_default_users()
+        try:
+            register_jobs()
+            start_scheduler()
+            logger.info("✓ Background scheduler configured and started")
+        except Exception as e:
+            logger.warning(f"⚠ Could not start scheduler: {e}", exc_info=True)
+
+    async def stop(self, grace_seconds: Optional[float] = None):
+        """Stop taking new work, let in-flight jobs and publishes finish (up to the grace period), close the pool"""
+        if self.stopping:
+            return
+        self.stopping = True
+        grace = settings.shutdown_grace_seconds if grace_seconds is None else grace_seconds
+        logger.info(f"Stopping role '{self.role}' (grace {grace}s)")
+
+        if self.publisher_task:
+            self.publisher.stop()
+            try:
+                await asyncio.wait_for(self.publisher_task, timeout=grace)
+            except asyncio.TimeoutError:
+                logger.warning("⚠ Publisher did not finish in time - cancelled")
+            except Exception as e:
+                logger.warning(f"Publisher exited with error: {e}")
+
+        if 'scheduler' in self.components:
+            try:
+                from .core.scheduler import drain_scheduler
+                await drain_scheduler(grace)
+            except Exception as e:
+                logger.warning(f"Error shutting down scheduler: {e}")
+
+        if self.listener_task:
+            from .core.pg_listener import listener
+            await listener.stop()
+            await self.listener_task
+
+        if 'web' in self.components:
+            try:
+                from .core.media_derivatives import shutdown_process_pool
+                shutdown_process_pool()
+            except Exception as e:
+                logger.warning(f"Error shutting down media derivative pool: {e}")
+
+        # Last, so audit rows from the jobs and publishes drained above are flushed too
+        if self.audit_drainer_task:
+            await self.audit_drainer.stop(timeout=grace)
+            await self.audit_drainer_task
+
+        try:
+            from .core.rate_limit import limiter
+            if limiter.backend:
+                await limiter.backend.close()
+        except Exception as e:
+            logger.warning(f"Error closing rate limit backend: {e}")
+
+        try:
+            from .db.session import engine
+            await engine.dispose()
+        except Exception as e:
+            logger.warning(f"Error closing database pool: {e}")
+        logger.info(f"Role '{self.role}' stopped")
+
+    def readiness(self) -> dict:
+        """Readiness report: ready only when started, not draining, DB reachable and components alive"""
+        checks = {
+            'started': self.started,
+            'draining': self.stopping,
+            'database': self.database_ready,
+        }
+        if 'scheduler' in self.components:
+            from .core.scheduler import scheduler, get_running_job_count
+            checks['scheduler'] = bool(scheduler and scheduler.running)
+            checks['scheduler_running_jobs'] = get_running_job_count()
+        if self.audit_drainer_task:
+            checks['audit_drainer'] = not self.audit_drainer_task.done()
+        if self.listener_task:
+            from .core.pg_listener import listener
+            # Informational: only stream pushes depend on it, and caches fall back to their TTL
+            checks['listener'] = listener.connected
+        if 'publisher' in self.components:
+            checks['publisher'] = bool(self.publisher_task and not self.publisher_task.done())
+            last_check = self.publisher.last_check_at if self.publisher else None
+            checks['publisher_last_check'] = last_check.isoformat() if last_check else None
+
+        ready = self.started and not self.stopping and self.database_ready
+        ready = ready and checks.get('scheduler', True) and checks.get('publisher', True)
+        return {'role': self.role, 'ready': ready, 'checks': checks}
+
+
+async def serve_probes(runtime: Runtime, host: str, port: int):
+    """Minimal HTTP server for worker roles: GET /health/live, /health/ready and /metrics"""
+    import json
+
+    async def handle(reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            request_line = await asyncio.wait_for(reader.readline(), timeout=5)
+            path = request_line.decode('latin-1').split(' ')[1] if request_line.count(b' ') >= 2 else ''
+            content_type = 'application/json'
+            if path == '/health/live':
+                status, payload = 200, json.dumps({'status': 'ok', 'role': runtime.role})
+            elif path == '/health/ready':
+                report = runtime.readiness()
+                status, payload = (200 if report['ready'] else 503), json.dumps(report)
+            elif path == '/metrics':
+                from .core.metrics import render_metrics, CONTENT_TYPE
+                status, payload, content_type = 200, render_metrics(), CONTENT_TYPE
+            else:
+                status, payload = 404, json.dumps({'detail': 'Not Found'})
+            body = payload.encode()
+            reason = {200: 'OK', 404: 'Not Found', 503: 'Service Unavailable'}[status]
+            writer.write(
+                f"HTTP/1.1 {status} {reason}\r\nContent-Type: {content_type}\r\n"
+                f"Content-Length: {len(body)}\r\nConnection: close\r\n\r\n".encode() + body
+            )
+            await writer.drain()
+        except Exception:
+            pass
+        finally:
+            writer.close()
+
+    return await asyncio.start_server(handle, host, port)
+
+
+async def run_worker(role: str, probe_host: str, probe_port: Optional[int]):
+    """Run a non-web role until SIGTERM/SIGINT, then drain and exit"""
+    runtime = Runtime(role)
+    stop_event = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGTERM, signal.SIGINT):
+        try:
+            loop.add_signal_handler(sig, stop_event.set)
+        except NotImplementedError:  # Windows
+            pass
+
+    await runtime.start()
+    probe_server = await serve_probes(runtime, probe_host, probe_port) if probe_port else None
+    if probe_server:
+        logger.info(f"Probes listening on {probe_host}:{probe_port}")
+    try:
+        await stop_event.wait()
+    finally:
+        await runtime.stop()
+        if probe_server:
+            probe_server.close()
+            await probe_server.wait_closed()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run the API, scheduler and/or publisher")
+    parser.add_argument('--role', choices=ROLES, default=settings.app_role, help='Process role (default: APP_ROLE)')
+    parser.add_argument('--host', default=settings.api_host, help='Bind host for the HTTP API / probes')
+    parser.add_argument('--port', type=int, default=settings.api_port, help='HTTP API port (web roles)')
+    parser.add_argument('--probe-port', type=int, default=settings.probe_port,
+                        help='Probe server port for worker roles (0 disables)')
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    )
+    # The app lifespan reads the role from settings
+    settings.app_role = args.role
+
+    if 'web' in ROLE_COMPONENTS[args.role]:
+        import uvicorn
+        from .main import create_app
+
+        uvicorn.run(
+            create_app(),
+            host=args.host,
+            port=args.port,
+            timeout_graceful_shutdown=settings.shutdown_grace_seconds,
+            # Real client IPs behind the proxy, for per-address rate limits (core/rate_limit.py)
+            proxy_headers=True,
+            forwarded_allow_ips=settings.forwarded_allow_ips,
+        )
+    else:
+        asyncio.run(run_worker(args.role, args.host, args.probe_port or None))
+
+
+if __name__ == '__main__':
+    main()
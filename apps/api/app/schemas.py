@@ -219,6 +219,39 @@ class JobOut(JobBase):
     class Config:
         from_attributes = True
 
+class BuilderName(BaseModel):
+    id: UUID
+    name: str
+
+    class Config:
+        from_attributes = True
+
+class JobListItem(BaseModel):
+    """Row of the job lists ('list' profile, core/query_profiles.py): no notes or warranty details"""
+    id: UUID
+    tenant_id: str
+    builder_id: UUID
+    community: str
+    lot_number: str
+    plan: Optional[str] = None
+    phase: str
+    status: str
+    address_line1: str
+    city: str
+    state: Optional[str] = None
+    zip: str
+    scheduled_start: Optional[datetime] = None
+    scheduled_end: Optional[datetime] = None
+    tech_name: Optional[str] = None
+    assigned_to: Optional[str] = None
+    completion_date: Optional[date] = None
+    created_at: datetime
+    updated_at: datetime
+    builder: Optional[BuilderName] = None
+
+    class Config:
+        from_attributes = True
+
 class ServiceCallBase(BaseModel):
     tenant_id: str
     builder_id: Optional[UUID]
@@ -357,6 +390,35 @@ class ServiceCallOut(ServiceCallBase):
     class Config:
         from_attributes = True
 
+class ServiceCallListItem(BaseModel):
+    """Row of the service call lists ('list' profile, core/query_profiles.py): no notes or payment details"""
+    id: UUID
+    tenant_id: str
+    builder_id: Optional[UUID] = None
+    customer_id: Optional[UUID] = None
+    customer_name: str
+    phone: Optional[str] = None
+    email: Optional[str] = None
+    address_line1: str
+    city: str
+    state: Optional[str] = None
+    zip: str
+    issue_description: str  # Shown truncated and searched client-side
+    priority: Optional[str] = None
+    status: str
+    scheduled_start: Optional[datetime] = None
+    scheduled_end: Optional[datetime] = None
+    assigned_to: Optional[str] = None
+    additional_techs: Optional[str] = None
+    payment_status: Optional[str] = None
+    billing_writeup_status: Optional[str] = None
+    paperwork_turned_in: Optional[bool] = None
+    created_at: datetime
+    updated_at: datetime
+
+    class Config:
+        from_attributes = True
+
 # Customer Schemas
 class CustomerBase(BaseModel):
     name: str
@@ -411,6 +473,14 @@ class AuditLogOut(BaseModel):
     class Config:
         from_attributes = True
 
+class SearchHitOut(BaseModel):
+    entity_type: str  # job, service_call, customer, builder, portal_account
+    id: UUID
+    tenant_id: Optional[str] = None  # None for builders (shared across tenants)
+    title: str
+    subtitle: Optional[str] = None
+    score: float
+
 # Review System Schemas
 
 class ReviewRequestBase(BaseModel):
@@ -513,7 +583,9 @@ class NotificationOut(BaseModel):
     entity_type: Optional[str] = None
     entity_id: Optional[UUID] = None
     read: bool
-    created_at: datetime
+    created_at: datetime  # Latest occurrence
+    occurrences: int = 1  # Repeats folded into this row
+    first_occurred_at: Optional[datetime] = None
 
     class Config:
         from_attributes = True
@@ -666,3 +738,32 @@ class SuggestedPortalsRequest(BaseModel):
     permit_required: Optional[bool] = None
     phase: Optional[JobPhase] = None
 
+class SuggestedPortalsBatchRequest(BaseModel):
+    applies_to: PortalRuleAppliesTo
+    ids: List[UUID] = Field(..., max_length=500)  # Job or service call IDs, e.g. one list page
+
+class SuggestedPortalsForRecord(BaseModel):
+    id: UUID
+    portals: List[PortalAccountOut]
+
+
+# Direct Upload Schemas
+
+class UploadFileSpec(BaseModel):
+    file_name: str
+    mime_type: str
+    file_size: int = Field(..., gt=0)  # Declared size in bytes, re-checked on confirm
+
+class UploadSlot(BaseModel):
+    upload_url: str  # Presigned PUT URL
+    method: str = "PUT"
+    headers: dict  # Headers the client must send with the PUT (Content-Type)
+    object_key: str
+    upload_token: str  # Pass back to the confirm endpoint
+    expires_in: int  # Seconds
+
+class PaperworkUploadRequest(BaseModel):
+    files: List[UploadFileSpec]
+
+class PaperworkUploadConfirm(BaseModel):
+    upload_tokens: List[str]
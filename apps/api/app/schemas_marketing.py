@@ -1,8 +1,10 @@
 from pydantic import BaseModel, Field, validator
-from typing import Optional, List
+from typing import Optional, List, Dict
 from datetime import datetime, date
 from uuid import UUID
 
+from .schemas import UploadFileSpec, UploadSlot
+
 # Marketing Channels
 
 class MarketingChannelBase(BaseModel):
@@ -159,11 +161,21 @@ class MediaAssetCreate(MediaAssetBase):
 
 class MediaAsset(MediaAssetBase):
     id: UUID
+    renditions: Optional[Dict[str, str]] = None  # {"thumbnail": url, "web": url, "instagram": url, "facebook": url}
+    derivatives_status: Optional[str] = None  # 'pending', 'ready', 'failed', 'skipped'
     created_at: datetime
 
     class Config:
         from_attributes = True
 
+class MediaUploadSlotRequest(UploadFileSpec):
+    tenant_id: str
+
+class MediaUploadConfirm(BaseModel):
+    upload_token: str
+    content_item_id: Optional[UUID] = None
+    intent_tags: Optional[List[str]] = None
+
 class ContentItem(ContentItemBase):
     id: UUID
     created_at: datetime
@@ -357,6 +369,14 @@ class ContentMixTracking(ContentMixTrackingBase):
     class Config:
         from_attributes = True
 
+class ContentMixWeek(BaseModel):
+    """Category counts for one channel account in one week"""
+    week_start_date: date
+    educational_count: int = 0
+    authority_count: int = 0
+    promo_count: int = 0
+    local_relevance_count: int = 0
+
 class ContentMixSummary(BaseModel):
     """Summary of content mix for a channel account"""
     channel_account_id: UUID
@@ -368,6 +388,7 @@ class ContentMixSummary(BaseModel):
     local_relevance: dict
     overall_health: str  # 'good', 'warning', 'critical'
     warnings: List[str]  # List of issues e.g., "Too many promo posts"
+    history: List[ContentMixWeek] = []  # Per-week counts for the requested weeks, oldest first
 
 # Seasonal Events Schemas
 
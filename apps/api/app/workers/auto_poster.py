@@ -4,11 +4,13 @@ Auto-posting worker that publishes scheduled posts when they're due
 import asyncio
 import logging
 from datetime import datetime, timezone
+from typing import Optional
 from sqlalchemy import select, and_
 from sqlalchemy.orm import joinedload
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from ..db.session import AsyncSessionLocal
+from ..core import metrics
 from .. import models
 
 logger = logging.getLogger(__name__)
@@ -19,17 +21,34 @@ class AutoPoster:
     
     CHECK_INTERVAL = 60  # Check every 60 seconds
     
+    def __init__(self):
+        self._stop = asyncio.Event()
+        self.last_check_at: Optional[datetime] = None
+    
+    @property
+    def stopping(self) -> bool:
+        return self._stop.is_set()
+    
+    def stop(self):
+        """Ask the loop to exit after the batch in flight (the current post finishes publishing)"""
+        self._stop.set()
+    
     async def run_forever(self):
-        """Main worker loop"""
+        """Main worker loop - runs until stop() is called"""
         logger.info("AutoPoster worker started")
         
-        while True:
+        while not self.stopping:
             try:
                 await self.check_and_publish()
-                await asyncio.sleep(self.CHECK_INTERVAL)
             except Exception as e:
                 logger.error(f"AutoPoster error: {e}", exc_info=True)
-                await asyncio.sleep(self.CHECK_INTERVAL)
+            self.last_check_at = datetime.now(timezone.utc)
+            try:
+                await asyncio.wait_for(self._stop.wait(), timeout=self.CHECK_INTERVAL)
+            except asyncio.TimeoutError:
+                pass
+        
+        logger.info("AutoPoster worker stopped")
     
     async def check_and_publish(self):
         """Find and publish posts that are due"""
@@ -49,7 +68,7 @@ class AutoPoster:
                 ).options(
                     joinedload(models.PostInstance.content_item).selectinload(models.ContentItem.media_assets),
                     joinedload(models.PostInstance.channel_account).joinedload(models.ChannelAccount.channel)
-                )
+                ).with_for_update(of=models.PostInstance, skip_locked=True)  # Lets several publishers run side by side
                 
                 result = await session.execute(query)
                 due_posts = result.unique().scalars().all()
@@ -58,6 +77,8 @@ class AutoPoster:
                     logger.info(f"Found {len(due_posts)} posts due for publishing")
                 
                 for post in due_posts:
+                    if self.stopping:
+                        break  # Unpublished posts are unlocked on commit and picked up next run
                     try:
                         await self.publish_post(post, session)
                     except Exception as e:
@@ -95,17 +116,25 @@ class AutoPoster:
             # Get caption (use override if available, otherwise use content item caption)
             caption = post.caption_override or (post.content_item.base_caption if post.content_item else '')
             
-            # Get media URLs
+            # Get media URLs (platform-sized rendition when one was generated)
             media_urls = []
             if post.content_item and post.content_item.media_assets:
-                media_urls = [asset.file_url for asset in post.content_item.media_assets]
+                from ..core.media_derivatives import get_platform_media_url
+                channel = post.channel_account.channel if post.channel_account else None
+                channel_key = (channel.key or channel.name) if channel else None
+                media_urls = [
+                    get_platform_media_url(asset, channel_key)
+                    for asset in post.content_item.media_assets
+                ]
             
             # Publish via platform-specific publisher
-            result = await publisher.publish(
-                caption=caption,
-                media_urls=media_urls,
-                account=post.channel_account
-            )
+            with metrics.autoposter_publish_duration.time(provider=publish_job.provider, outcome='error') as labels:
+                result = await publisher.publish(
+                    caption=caption,
+                    media_urls=media_urls,
+                    account=post.channel_account
+                )
+                labels['outcome'] = 'ok'
             
             # Update post status
             post.status = 'Posted'
@@ -165,12 +194,7 @@ async def main():
 
 
 if __name__ == "__main__":
-    # Configure logging
-    logging.basicConfig(
-        level=logging.INFO,
-        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-    )
-    
-    # Run the worker
-    asyncio.run(main())
+    # Same as `python -m app.runtime --role publisher` (probes + graceful shutdown)
+    from ..runtime import main as runtime_main
+    runtime_main(["--role", "publisher"])
 
@@ -0,0 +1,89 @@
+"""
+Benchmark fixtures - a seeded local Postgres, never the shared test database
+
+The suite runs in-process through httpx's ASGITransport so timings cover routing,
+validation, queries and serialization without network noise. Seed first:
+
+    python -m benchmarks.seed_bench_data
+    python -m pytest benchmarks
+"""
+import asyncio
+import os
+import statistics
+
+import pytest
+
+from .load import percentile
+from .seed_bench_data import BENCH_DATABASE_URL, BENCH_USERNAME, BENCH_PASSWORD
+
+# Before anything imports app.core.config
+os.environ["DATABASE_URL"] = os.getenv("BENCH_DATABASE_URL", BENCH_DATABASE_URL)
+# One log line per request would swamp the output
+os.environ.setdefault("QUERY_STATS", "false")
+# One admin token makes every request one rate limit key; 429s would fail the run
+os.environ.setdefault("RATE_LIMIT_BACKEND", "off")
+
+from httpx import AsyncClient, ASGITransport
+from sqlalchemy import text
+
+from app.db.session import engine
+from app.main import app
+
+
+class BenchClient:
+    """Synchronous wrapper so pytest-benchmark can time async requests on one event loop"""
+
+    def __init__(self, loop: asyncio.AbstractEventLoop, client: AsyncClient):
+        self.loop = loop
+        self.client = client
+
+    def get(self, path: str, params: dict = None):
+        res = self.loop.run_until_complete(self.client.get(f"/api/v1{path}", params=params))
+        assert res.status_code == 200, f"GET {path} -> {res.status_code}: {res.text[:200]}"
+        return res
+
+
+@pytest.fixture(scope='session')
+def bench_loop():
+    loop = asyncio.new_event_loop()
+    yield loop
+    loop.run_until_complete(engine.dispose())
+    loop.close()
+
+
+@pytest.fixture(scope='session')
+def bench_client(bench_loop):
+    async def connect():
+        async with engine.connect() as conn:
+            jobs = (await conn.execute(text("SELECT count(*) FROM jobs"))).scalar()
+        if not jobs:
+            pytest.exit("Benchmark database is empty - run `python -m benchmarks.seed_bench_data` first", returncode=1)
+        client = AsyncClient(transport=ASGITransport(app=app), base_url="http://bench", timeout=120)
+        res = await client.post("/api/v1/login", json={"username": BENCH_USERNAME, "password": BENCH_PASSWORD})
+        res.raise_for_status()
+        client.headers["Authorization"] = f"Bearer {res.json()['access_token']}"
+        return client
+
+    try:
+        client = bench_loop.run_until_complete(connect())
+    except OSError as e:
+        pytest.exit(f"Benchmark database unreachable ({e}) - start it with `make bench-db`", returncode=1)
+    yield BenchClient(bench_loop, client)
+    bench_loop.run_until_complete(client.aclose())
+
+
+def pytest_terminal_summary(terminalreporter):
+    """p50/p95 per endpoint - pytest-benchmark's own table stops at median/IQR"""
+    session = terminalreporter._session
+    bench_session = getattr(session.config, '_benchmarksession', None)
+    benchmarks = getattr(bench_session, 'benchmarks', None) or []
+    rows = [(b.name, b.stats.data) for b in benchmarks if b.stats and b.stats.data]
+    if not rows:
+        return
+    terminalreporter.section("endpoint latency (ms)")
+    terminalreporter.write_line(f"{'endpoint':<40} {'rounds':>7} {'p50':>9} {'p95':>9} {'max':>9}")
+    for name, data in sorted(rows):
+        ms = [value * 1000 for value in data]
+        terminalreporter.write_line(
+            f"{name:<40} {len(ms):>7} {statistics.median(ms):>9.1f} {percentile(ms, 95):>9.1f} {max(ms):>9.1f}"
+        )
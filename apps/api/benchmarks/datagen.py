@@ -0,0 +1,457 @@
+"""
+Deterministic synthetic data for performance testing
+
+Generates staff users, builders, customers, jobs, service calls, review requests, reviews,
+marketing channel accounts, post instances, notifications and audit logs with realistic
+distributions, and bulk-loads
+them with COPY. Status mixes follow the schedule: past work is mostly completed with a tail
+of overdue items, future work is scheduled. Techs get a skewed share of the work, dates
+cluster in recent months and on weekdays, and ratings lean positive.
+
+The same seed, scale and anchor date always produce the same rows, IDs included, so a
+plan or a regression can be reproduced anywhere:
+
+    python -m benchmarks.datagen --scale 0.1 --seed 7 --anchor 2026-01-01
+    python -m benchmarks.datagen --rows audit_log=5000000
+
+WIPES the tables it loads - only point it at a benchmark database.
+"""
+import argparse
+import asyncio
+import os
+import random
+import time
+from dataclasses import dataclass
+from datetime import date, datetime, time as dt_time, timedelta, timezone
+from decimal import Decimal
+from typing import Iterator, Optional
+from uuid import UUID
+
+from sqlalchemy import text
+
+JOBS_TENANT = "all_county"
+SERVICE_CALLS_TENANT = "h2o"
+
+# Rows at scale 1.0
+DEFAULT_ROWS = {
+    'builders': 200,
+    'customers': 25_000,
+    'jobs': 100_000,
+    'service_calls': 100_000,
+    'review_requests': 40_000,
+    'channel_accounts': 12,
+    'post_instances': 20_000,
+    'notifications': 200_000,
+    'audit_log': 1_000_000,
+}
+
+# Load order (parents first); truncated in reverse
+TABLES = [
+    'users', 'builders', 'customers', 'jobs', 'service_calls', 'review_requests', 'reviews',
+    'marketing_channels', 'channel_accounts', 'post_instances', 'notifications', 'audit_log',
+]
+
+COLUMNS = {
+    'users': ('id', 'username', 'email', 'hashed_password', 'full_name', 'role', 'is_active', 'created_at'),
+    'builders': ('id', 'name', 'notes', 'created_at'),
+    'customers': ('id', 'tenant_id', 'name', 'phone', 'email', 'address_line1', 'city', 'state', 'zip', 'tags',
+                  'created_at'),
+    'jobs': ('id', 'tenant_id', 'builder_id', 'community', 'lot_number', 'plan', 'phase', 'status', 'address_line1',
+             'city', 'state', 'zip', 'scheduled_start', 'scheduled_end', 'tech_name', 'assigned_to',
+             'completion_date', 'warranty_start_date', 'warranty_end_date', 'created_at', 'updated_at'),
+    'service_calls': ('id', 'tenant_id', 'builder_id', 'customer_id', 'customer_name', 'phone', 'email',
+                      'address_line1', 'city', 'state', 'zip', 'issue_description', 'priority', 'status',
+                      'scheduled_start', 'scheduled_end', 'assigned_to', 'payment_status', 'payment_amount',
+                      'paperwork_turned_in', 'created_at', 'updated_at'),
+    'review_requests': ('id', 'tenant_id', 'service_call_id', 'job_id', 'customer_name', 'customer_email',
+                        'customer_phone', 'token', 'status', 'sent_at', 'completed_at', 'expires_at',
+                        'reminder_sent', 'created_at', 'updated_at'),
+    'reviews': ('id', 'review_request_id', 'rating', 'comment', 'customer_name', 'customer_email', 'is_public',
+                'can_be_content', 'created_at', 'updated_at'),
+    'marketing_channels': ('id', 'key', 'display_name', 'supports_autopost'),
+    'channel_accounts': ('id', 'tenant_id', 'channel_id', 'name', 'oauth_connected', 'oauth_provider', 'status',
+                         'posts_per_week', 'schedule_timezone', 'schedule_times'),
+    'post_instances': ('id', 'tenant_id', 'channel_account_id', 'caption_override', 'scheduled_for', 'status',
+                       'posted_at', 'autopost_enabled', 'last_error', 'suggested_category', 'created_at',
+                       'updated_at'),
+    'notifications': ('id', 'user_id', 'tenant_id', 'type', 'title', 'message', 'entity_type', 'entity_id', 'read',
+                      'created_at'),
+    'audit_log': ('id', 'tenant_id', 'entity_type', 'entity_id', 'action', 'field', 'old_value', 'new_value',
+                  'changed_by', 'changed_at'),
+}
+
+TECHS = [f"tech{i}" for i in range(1, 21)]
+OFFICE = ["admin", "office1", "office2", "office3"]
+COMMUNITIES = ["Oak Ridge Estates", "Green Valley", "Sunset Hills", "Cedar Creek", "Riverside", "Maple Grove",
+               "Eagle Point", "Harbor View", "Fern Hollow", "Pine Meadows", "Heritage Park", "Salmon Creek"]
+CITIES = [("Vancouver", "98660"), ("Vancouver", "98683"), ("Camas", "98607"), ("Battle Ground", "98604"),
+          ("Ridgefield", "98642"), ("Washougal", "98671"), ("La Center", "98629"), ("Portland", "97201")]
+STREETS = ["Main St", "Oak Ave", "Cedar Ln", "Fir Ct", "Mill Plain Blvd", "Fourth Plain Blvd", "Hazel Dell Ave",
+           "Andresen Rd", "Covington Rd", "Evergreen Hwy"]
+FIRST_NAMES = ["James", "Mary", "Robert", "Patricia", "John", "Jennifer", "Michael", "Linda", "David", "Elizabeth",
+               "William", "Barbara", "Richard", "Susan", "Joseph", "Jessica", "Thomas", "Sarah", "Chris", "Karen"]
+LAST_NAMES = ["Smith", "Johnson", "Williams", "Brown", "Jones", "Garcia", "Miller", "Davis", "Rodriguez", "Martinez",
+              "Hernandez", "Lopez", "Wilson", "Anderson", "Thomas", "Taylor", "Moore", "Jackson", "Martin", "Lee"]
+BUILDER_WORDS = ["Summit", "Cascade", "Evergreen", "Pacific", "Columbia", "Timberline", "Ridge", "Harbor", "Lakeside",
+                 "Pioneer", "Meridian", "Keystone", "Northwest", "Silverline", "Frontier"]
+BUILDER_SUFFIXES = ["Homes", "Builders", "Construction", "Development", "Custom Homes", "Communities"]
+PLANS = ["2150", "2400", "2650", "Aspen", "Birch", "Cedar", "Douglas", None]
+ISSUES = ["Leaking faucet in kitchen", "Water heater not heating", "Clogged main line", "Toilet running constantly",
+          "Low water pressure upstairs", "Garbage disposal jammed", "Burst pipe under sink", "Sewer smell in basement",
+          "Frozen pipe in crawlspace", "Sump pump failure", "Shower valve replacement", "Tankless water heater install"]
+REVIEW_COMMENTS = ["Great service, on time and tidy.", "Fixed the problem fast.", "Friendly tech, fair price.",
+                   "Took longer than expected.", "Had to call twice before anyone came out.", None, None]
+POST_CATEGORIES = ["team_post", "diy", "coupon", "blog_post", "ad_content"]
+CUSTOMER_TAGS = [None, None, None, ['VIP'], ['Warranty'], ['Commercial'], ['VIP', 'Warranty']]
+
+# (value, weight) mixes
+PHASES = [("rough", 30), ("PB", 15), ("TO", 15), ("trim", 25), ("final", 15)]
+PRIORITIES = [("Low", 15), ("Normal", 65), ("High", 15), ("Emergency", 5)]
+PAYMENT_STATUSES = [("Paid", 75), ("Unpaid", 10), ("Pending", 10), ("Partial", 5)]
+RATINGS = [(5, 62), (4, 20), (3, 8), (2, 4), (1, 6)]
+NOTIFICATION_TYPES = [("overdue", 40), ("reminder", 25), ("status_change", 25), ("review_received", 5),
+                      ("escalation", 5)]
+AUDIT_ACTIONS = [("create", 15), ("update", 80), ("delete", 5)]
+AUDIT_FIELDS = [("status", 40), ("assigned_to", 20), ("scheduled_start", 15), ("scheduled_end", 10), ("notes", 10),
+                ("priority", 5)]
+
+JOB_STATUSES = ["Scheduled", "In Progress", "Completed", "On Hold"]
+SC_STATUSES = ["New", "Scheduled", "In Progress", "Completed", "Cancelled"]
+
+
+def pick(rng: random.Random, weighted: list[tuple]):
+    values, weights = zip(*weighted)
+    return rng.choices(values, weights)[0]
+
+
+def make_uuid(rng: random.Random) -> UUID:
+    return UUID(int=rng.getrandbits(128), version=4)
+
+
+@dataclass
+class Scale:
+    """Row counts per table: DEFAULT_ROWS times `factor`, with per-table overrides"""
+    factor: float = 1.0
+    overrides: Optional[dict] = None
+
+    def rows(self, table: str) -> int:
+        if self.overrides and table in self.overrides:
+            return self.overrides[table]
+        return max(1, int(DEFAULT_ROWS[table] * self.factor))
+
+
+class DataGenerator:
+    """
+    Yields rows (tuples in COLUMNS order) per table. Tables must be generated in TABLES order -
+    children draw their foreign keys from the parents generated before them.
+    """
+
+    def __init__(self, seed: int = 42, scale: Optional[Scale] = None, anchor: Optional[date] = None):
+        self.rng = random.Random(seed)
+        self.scale = scale or Scale()
+        anchor = anchor or datetime.now(timezone.utc).date()
+        # Midnight UTC of the anchor date - all timestamps are offsets from it
+        self.now = datetime.combine(anchor, dt_time(0), tzinfo=timezone.utc)
+        # Skewed workloads: the busiest tech gets several times the work of the quietest
+        self.tech_weights = [1 / (i + 1) ** 0.7 for i in range(len(TECHS))]
+
+        self.user_ids: list[UUID] = []           # TECHS + OFFICE order
+        self.builder_ids: list[UUID] = []
+        self.customers: list[tuple] = []
+        self.jobs: list[tuple] = []              # (id, created_at)
+        self.service_calls: list[tuple] = []     # (id, created_at, scheduled_end, status, customer row)
+        self.review_requests: list[tuple] = []   # completed only: (id, completed_at, customer_name, customer_email)
+        self.channels: list[tuple] = []          # (id, key, supports_autopost)
+        self.channel_accounts: list[tuple] = []  # (id, oauth_connected)
+
+    # Distributions
+
+    def tech(self) -> str:
+        return self.rng.choices(TECHS, self.tech_weights)[0]
+
+    def past_datetime(self, max_days: int) -> datetime:
+        """Recent-heavy spread into the past (exponential), snapped to weekday business hours"""
+        days = min(max_days, int(self.rng.expovariate(1 / (max_days / 4))))
+        return self.business_hours(self.now - timedelta(days=days))
+
+    def scheduled_datetime(self, past_days: int, future_days: int, future_share: float) -> datetime:
+        """Schedule dates: mostly past (recent-heavy), `future_share` spread over the coming days"""
+        if self.rng.random() < future_share:
+            return self.business_hours(self.now + timedelta(days=self.rng.randint(0, future_days)))
+        return self.past_datetime(past_days)
+
+    def business_hours(self, moment: datetime) -> datetime:
+        # 90% of weekend rows move to the nearest weekday (Saturday -> Friday, Sunday -> Monday)
+        if moment.weekday() >= 5 and self.rng.random() < 0.9:
+            moment += timedelta(days=-1 if moment.weekday() == 5 else 1)
+        return moment.replace(hour=self.rng.randint(7, 16), minute=self.rng.choice((0, 15, 30, 45)),
+                              second=0, microsecond=0)
+
+    def person(self) -> str:
+        return f"{self.rng.choice(FIRST_NAMES)} {self.rng.choice(LAST_NAMES)}"
+
+    def address(self) -> tuple[str, str, str]:
+        city, zip_code = self.rng.choice(CITIES)
+        return f"{self.rng.randint(100, 29999)} {self.rng.choice(STREETS)}", city, zip_code
+
+    # Tables
+
+    def users_rows(self) -> Iterator[tuple]:
+        # One login per tech and office user (the seed adds the bench login); the hash matches no password
+        for username in TECHS + OFFICE:
+            user_id = make_uuid(self.rng)
+            self.user_ids.append(user_id)
+            yield (user_id, username, f"{username}@example.com", '!', username.title(),
+                   'admin' if username == 'admin' else 'user', True, self.past_datetime(1500))
+
+    def builders_rows(self) -> Iterator[tuple]:
+        for i in range(self.scale.rows('builders')):
+            builder_id = make_uuid(self.rng)
+            self.builder_ids.append(builder_id)
+            name = f"{self.rng.choice(BUILDER_WORDS)} {self.rng.choice(BUILDER_SUFFIXES)} {i:04d}"
+            yield (builder_id, name, None, self.past_datetime(1500))
+
+    def customers_rows(self) -> Iterator[tuple]:
+        for i in range(self.scale.rows('customers')):
+            address, city, zip_code = self.address()
+            name = self.person()
+            row = (make_uuid(self.rng), SERVICE_CALLS_TENANT, name, f"360-555-{self.rng.randint(0, 9999):04d}",
+                   f"{name.lower().replace(' ', '.')}{i}@example.com", address, city, 'WA', zip_code,
+                   self.rng.choice(CUSTOMER_TAGS), self.past_datetime(1500))
+            self.customers.append(row)
+            yield row
+
+    def jobs_rows(self) -> Iterator[tuple]:
+        # Builders are not equally busy either
+        builder_weights = [1 / (i + 1) ** 0.5 for i in range(len(self.builder_ids))]
+        for i in range(self.scale.rows('jobs')):
+            start = self.scheduled_datetime(730, 45, 0.1)
+            end = start + timedelta(days=self.rng.randint(1, 10))
+            if end < self.now:
+                # Past work is done, except for a tail of overdue or paused jobs
+                status = self.rng.choices(JOB_STATUSES, [0, 4, 92, 4])[0]
+            elif start < self.now:
+                status = 'In Progress'
+            else:
+                status = 'Scheduled'
+            completion = warranty_start = warranty_end = None
+            if status == 'Completed':
+                completion = warranty_start = end.date()
+                warranty_end = completion + timedelta(days=365)
+            address, city, zip_code = self.address()
+            tech = self.tech()
+            job_id = make_uuid(self.rng)
+            created = start - timedelta(days=self.rng.randint(7, 90))
+            updated = min(self.now, end) if status == 'Completed' else created
+            self.jobs.append((job_id, created))
+            yield (job_id, JOBS_TENANT, self.rng.choices(self.builder_ids, builder_weights)[0],
+                   self.rng.choice(COMMUNITIES), str(i), self.rng.choice(PLANS), pick(self.rng, PHASES), status,
+                   address, city, 'WA', zip_code, start, end, tech, tech, completion, warranty_start, warranty_end,
+                   created, updated)
+
+    def service_calls_rows(self) -> Iterator[tuple]:
+        for _ in range(self.scale.rows('service_calls')):
+            customer = self.rng.choice(self.customers)
+            start = self.scheduled_datetime(730, 21, 0.05)
+            end = start + timedelta(hours=self.rng.randint(1, 4))
+            if end < self.now:
+                status = self.rng.choices(SC_STATUSES, [1, 1, 3, 88, 7])[0]
+            elif start < self.now + timedelta(days=1):
+                status = self.rng.choices(SC_STATUSES, [10, 40, 50, 0, 0])[0]
+            else:
+                status = self.rng.choices(SC_STATUSES, [35, 65, 0, 0, 0])[0]
+            completed = status == 'Completed'
+            payment_status = pick(self.rng, PAYMENT_STATUSES) if completed else None
+            amount = Decimal(f"{self.rng.lognormvariate(5.5, 0.7):.2f}") if payment_status else None
+            sc_id = make_uuid(self.rng)
+            created = start - timedelta(days=self.rng.randint(0, 14), hours=self.rng.randint(0, 8))
+            self.service_calls.append((sc_id, created, end, status, customer))
+            yield (sc_id, SERVICE_CALLS_TENANT,
+                   self.rng.choice(self.builder_ids) if self.rng.random() < 0.25 else None,
+                   customer[0], customer[2], customer[3], customer[4], customer[5], customer[6], 'WA', customer[8],
+                   self.rng.choice(ISSUES), pick(self.rng, PRIORITIES), status, start, end, self.tech(),
+                   payment_status, amount, completed and self.rng.random() < 0.9, created,
+                   min(self.now, end) if completed else created)
+
+    def review_requests_rows(self) -> Iterator[tuple]:
+        completed = [sc for sc in self.service_calls if sc[3] == 'Completed']
+        count = min(self.scale.rows('review_requests'), len(completed))
+        for sc_id, _, finished, _, customer in self.rng.sample(completed, count):
+            created = finished + timedelta(hours=self.rng.randint(1, 48))
+            expires = created + timedelta(days=30)
+            age = self.now - created
+            roll = self.rng.random()
+            if age > timedelta(days=30):
+                status = 'completed' if roll < 0.45 else 'expired'
+            elif age < timedelta(days=1):
+                status = 'pending' if roll < 0.7 else 'sent'
+            else:
+                status = 'completed' if roll < 0.3 else 'sent'
+            sent_at = None if status == 'pending' else created + timedelta(minutes=self.rng.randint(5, 240))
+            completed_at = None
+            if status == 'completed':
+                completed_at = min(self.now, sent_at + timedelta(hours=self.rng.expovariate(1 / 36)))
+            request_id = make_uuid(self.rng)
+            if completed_at:
+                self.review_requests.append((request_id, completed_at, customer[2], customer[4]))
+            yield (request_id, SERVICE_CALLS_TENANT, sc_id, None, customer[2], customer[4], customer[3],
+                   f"{self.rng.getrandbits(128):032x}", status, sent_at, completed_at, expires,
+                   status in ('sent', 'expired') and self.rng.random() < 0.5, created, completed_at or sent_at or created)
+
+    def reviews_rows(self) -> Iterator[tuple]:
+        for request_id, completed_at, name, email in self.review_requests:
+            rating = pick(self.rng, RATINGS)
+            comment = self.rng.choice(REVIEW_COMMENTS)
+            yield (make_uuid(self.rng), request_id, rating, comment, name, email,
+                   rating >= 4 and self.rng.random() < 0.8, rating == 5 and comment is not None,
+                   completed_at, completed_at)
+
+    def marketing_channels_rows(self) -> Iterator[tuple]:
+        from app.api.marketing import DEFAULT_CHANNELS
+
+        for channel in DEFAULT_CHANNELS:
+            channel_id = make_uuid(self.rng)
+            self.channels.append((channel_id, channel['key'], channel['supports_autopost']))
+            yield (channel_id, channel['key'], channel['display_name'], channel['supports_autopost'])
+
+    def channel_accounts_rows(self) -> Iterator[tuple]:
+        for i in range(self.scale.rows('channel_accounts')):
+            channel_id, key, autopost = self.channels[i % len(self.channels)]
+            account_id = make_uuid(self.rng)
+            connected = autopost and self.rng.random() < 0.8
+            self.channel_accounts.append((account_id, connected))
+            yield (account_id, SERVICE_CALLS_TENANT, channel_id, f"{key} #{i // len(self.channels) + 1}",
+                   connected, key.split('_')[0] if connected else None, 'active',
+                   self.rng.choice((3, 4, 5, 7)), 'America/Los_Angeles', ['09:00', '14:00'])
+
+    def post_instances_rows(self) -> Iterator[tuple]:
+        # One slot per account per day (two times a day) - unique per (tenant, account, scheduled_for)
+        total = self.scale.rows('post_instances')
+        per_account = max(1, total // len(self.channel_accounts))
+        for account_id, connected in self.channel_accounts:
+            # Two thirds history, one third ahead of the anchor
+            first_day = self.now - timedelta(days=per_account // 3)
+            for n in range(per_account):
+                slot = first_day + timedelta(days=n // 2, hours=9 if n % 2 == 0 else 14)
+                autopost = connected and self.rng.random() < 0.7
+                posted_at = last_error = None
+                if slot < self.now:
+                    status = self.rng.choices(['Posted', 'Failed', 'Planned'], [90, 4, 6])[0]
+                    if status == 'Posted':
+                        posted_at = slot + timedelta(minutes=self.rng.randint(0, 10))
+                    elif status == 'Failed':
+                        last_error = 'Token expired'
+                elif slot < self.now + timedelta(days=7):
+                    status = self.rng.choices(['Scheduled', 'Approved', 'Needs Approval', 'Draft'], [60, 15, 15, 10])[0]
+                else:
+                    status = self.rng.choices(['Planned', 'Draft', 'Scheduled'], [70, 20, 10])[0]
+                created = slot - timedelta(days=self.rng.randint(3, 30))
+                yield (make_uuid(self.rng), SERVICE_CALLS_TENANT, account_id, None, slot, status, posted_at,
+                       autopost, last_error, self.rng.choice(POST_CATEGORIES), created, posted_at or created)
+
+    def notifications_rows(self) -> Iterator[tuple]:
+        """Alerts about jobs and service calls - mostly per user (busy techs get more), some tenant-wide"""
+        user_weights = self.tech_weights + [0.5] * len(OFFICE)
+        for _ in range(self.scale.rows('notifications')):
+            if self.rng.random() < 0.5:
+                entity_type, tenant_id, (entity_id, _) = 'job', JOBS_TENANT, self.rng.choice(self.jobs)
+            else:
+                entity_type, tenant_id = 'service_call', SERVICE_CALLS_TENANT
+                entity_id = self.rng.choice(self.service_calls)[0]
+            user_id = None if self.rng.random() < 0.2 else self.rng.choices(self.user_ids, user_weights)[0]
+            kind = pick(self.rng, NOTIFICATION_TYPES)
+            created = self.past_datetime(180)
+            # Old alerts have been read; the last week's are mostly still unread
+            read = self.rng.random() < (0.95 if created < self.now - timedelta(days=7) else 0.4)
+            label = entity_type.replace('_', ' ').capitalize()
+            yield (make_uuid(self.rng), user_id, tenant_id, kind, f"{label} {kind.replace('_', ' ')}",
+                   f"{label} {entity_id} needs attention", entity_type, entity_id, read, created)
+
+    def audit_log_rows(self) -> Iterator[tuple]:
+        """History for jobs and service calls, spread between each entity's creation and the anchor"""
+        actors = TECHS + OFFICE
+        for _ in range(self.scale.rows('audit_log')):
+            if self.rng.random() < 0.5:
+                entity_type, tenant_id, (entity_id, created) = 'job', JOBS_TENANT, self.rng.choice(self.jobs)
+            else:
+                entity_type, tenant_id = 'service_call', SERVICE_CALLS_TENANT
+                entity_id, created = self.rng.choice(self.service_calls)[:2]
+            action = pick(self.rng, AUDIT_ACTIONS)
+            field = old_value = new_value = None
+            if action == 'update':
+                field = pick(self.rng, AUDIT_FIELDS)
+                if field == 'status':
+                    statuses = JOB_STATUSES if entity_type == 'job' else SC_STATUSES
+                    old_value, new_value = self.rng.sample(statuses, 2)
+                elif field == 'assigned_to':
+                    old_value, new_value = self.tech(), self.tech()
+            span = max(0.0, (self.now - created).total_seconds())
+            changed_at = created + timedelta(seconds=self.rng.random() * span)
+            yield (make_uuid(self.rng), tenant_id, entity_type, entity_id, action, field, old_value, new_value,
+                   self.rng.choice(actors), changed_at)
+
+    def rows(self, table: str) -> Iterator[tuple]:
+        return getattr(self, f"{table}_rows")()
+
+
+async def copy_rows(conn, table: str, rows: Iterator[tuple], batch_size: int = 50_000) -> int:
+    """COPY rows into `table` through the asyncpg connection behind a SQLAlchemy AsyncConnection"""
+    raw = await conn.get_raw_connection()
+    driver = raw.driver_connection
+    written = 0
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= batch_size:
+            await driver.copy_records_to_table(table, records=batch, columns=COLUMNS[table])
+            written += len(batch)
+            batch = []
+    if batch:
+        await driver.copy_records_to_table(table, records=batch, columns=COLUMNS[table])
+        written += len(batch)
+    return written
+
+
+async def load(engine, generator: DataGenerator, log=print) -> dict:
+    """Truncate the generated tables and COPY fresh rows into them in one transaction"""
+    counts = {}
+    async with engine.begin() as conn:
+        await conn.execute(text(f"TRUNCATE {', '.join(reversed(TABLES))} CASCADE"))
+        for table in TABLES:
+            started = time.perf_counter()
+            counts[table] = await copy_rows(conn, table, generator.rows(table))
+            log(f"   ✓ {counts[table]:>9,} {table} ({time.perf_counter() - started:.1f}s)")
+    return counts
+
+
+def parse_rows(values: list[str]) -> dict:
+    overrides = {}
+    for value in values or []:
+        table, _, count = value.partition('=')
+        if table not in DEFAULT_ROWS or not count.isdigit():
+            raise SystemExit(f"Invalid --rows '{value}'. Expected <table>=<count>, table one of: {', '.join(DEFAULT_ROWS)}")
+        overrides[table] = int(count)
+    return overrides
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--scale', type=float, default=1.0, help='Multiplier for the default row counts')
+    parser.add_argument('--rows', action='append', metavar='TABLE=COUNT', help='Override one table (repeatable)')
+    parser.add_argument('--seed', type=int, default=42, help='Random seed')
+    parser.add_argument('--anchor', type=date.fromisoformat, help="Date treated as 'today' (default: today)")
+    args = parser.parse_args()
+
+    from sqlalchemy.ext.asyncio import create_async_engine
+    from .seed_bench_data import BENCH_DATABASE_URL
+
+    generator = DataGenerator(args.seed, Scale(args.scale, parse_rows(args.rows)), args.anchor)
+    engine = create_async_engine(os.getenv("BENCH_DATABASE_URL", BENCH_DATABASE_URL))
+    try:
+        await load(engine, generator)
+    finally:
+        await engine.dispose()
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
@@ -0,0 +1,40 @@
+"""
+Dashboard endpoints exercised by the benchmarks and the load driver
+
+Each entry is name -> (path under /api/v1, query params). Tenants match datagen.py.
+"""
+from datetime import datetime, timedelta, timezone
+
+from .datagen import JOBS_TENANT, SERVICE_CALLS_TENANT
+
+
+def dashboard_endpoints() -> dict[str, tuple[str, dict]]:
+    now = datetime.now(timezone.utc)
+    calendar_window = {
+        'tenant_id': SERVICE_CALLS_TENANT,
+        'start_date': (now - timedelta(days=14)).isoformat(),
+        'end_date': (now + timedelta(days=28)).isoformat(),
+    }
+    return {
+        # Analytics
+        'analytics_overview': ('/analytics/overview', {'tenant_id': SERVICE_CALLS_TENANT}),
+        'analytics_performance': ('/analytics/performance', {'tenant_id': SERVICE_CALLS_TENANT, 'days': 30}),
+        'analytics_reviews': ('/analytics/reviews', {'tenant_id': SERVICE_CALLS_TENANT, 'days': 30}),
+        # Signals
+        'signals_all': ('/signals/all', {'tenant_id': SERVICE_CALLS_TENANT}),
+        # Tech stats
+        'tech_stats_all': ('/tech-stats/all', {'tenant_id': SERVICE_CALLS_TENANT, 'days': 30}),
+        # Calendar
+        'marketing_calendar': ('/marketing/calendar', calendar_window),
+        # Lists
+        'jobs_list': ('/jobs', {'tenant_id': JOBS_TENANT, 'limit': 25}),
+        'jobs_list_search': ('/jobs', {'tenant_id': JOBS_TENANT, 'search': 'Oak', 'limit': 25}),
+        'service_calls_list': ('/service-calls', {'tenant_id': SERVICE_CALLS_TENANT, 'limit': 25}),
+        'customers_list': ('/customers', {'tenant_id': SERVICE_CALLS_TENANT, 'limit': 100}),
+        'overdue_jobs': ('/jobs/overdue', {'tenant_id': JOBS_TENANT}),
+        'overdue_service_calls': ('/service-calls/overdue', {'tenant_id': SERVICE_CALLS_TENANT}),
+        'audit_list': ('/audit', {}),
+        # Dispatch type-ahead (target: < 50ms)
+        'search_typeahead': ('/search', {'q': 'Oak', 'limit': 10}),
+        'search_typeahead_tenant': ('/search', {'q': 'Hazel', 'tenant_id': SERVICE_CALLS_TENANT, 'limit': 10}),
+    }
@@ -0,0 +1,380 @@
+"""
+Index advisor: EXPLAIN (ANALYZE, BUFFERS) over the app's hot queries, with and without candidate indexes
+
+The catalog below mirrors the SQL the app sends for its hot filters (overdue scans, the AutoPoster
+due query, post instance range reads, notification lists). Each query runs twice against the
+benchmark database:
+
+- without its candidate indexes (dropped inside a transaction that is rolled back), and
+- with them (created inside a transaction that is rolled back),
+
+so the schema is left as it was. A candidate is recommended when it makes its queries at least
+--min-speedup times faster. The report also lists plain btree indexes made redundant by a wider one.
+Creating and dropping indexes takes table locks - run it against the benchmark database only.
+
+Run from apps/api, after `make bench-seed`:
+    python -m benchmarks.index_advisor                                  # markdown to stdout
+    python -m benchmarks.index_advisor --output benchmarks/reports/indexes.md
+    python -m benchmarks.index_advisor --only overdue_jobs --runs 10 --json
+"""
+import argparse
+import asyncio
+import json
+import os
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import text
+
+from .datagen import JOBS_TENANT, SERVICE_CALLS_TENANT
+
+# Migration 0034 ships the recommended ones with these same definitions
+CANDIDATE_INDEXES = {
+    'ix_jobs_overdue':
+        "CREATE INDEX ix_jobs_overdue ON jobs (tenant_id, scheduled_end) WHERE status <> 'Completed'",
+    'ix_service_calls_overdue':
+        "CREATE INDEX ix_service_calls_overdue ON service_calls (tenant_id, scheduled_end) WHERE status <> 'Completed'",
+    'ix_review_requests_pending':
+        "CREATE INDEX ix_review_requests_pending ON review_requests (tenant_id, created_at) WHERE status = 'pending'",
+    'ix_post_instances_autopost_due':
+        "CREATE INDEX ix_post_instances_autopost_due ON post_instances (scheduled_for) "
+        "WHERE status = 'Scheduled' AND autopost_enabled AND content_item_id IS NOT NULL",
+    'ix_notifications_user_read_created':
+        "CREATE INDEX ix_notifications_user_read_created ON notifications (user_id, read, created_at)",
+    'ix_notifications_tenant_broadcast':
+        "CREATE INDEX ix_notifications_tenant_broadcast ON notifications (tenant_id, read, created_at) "
+        "WHERE user_id IS NULL",
+}
+
+NOTIFICATIONS_FOR = """
+    (notifications.user_id = :user_id OR (notifications.user_id IS NULL AND notifications.tenant_id = :sc_tenant))
+"""
+
+
+@dataclass
+class CatalogQuery:
+    name: str
+    source: str  # Where the app sends it
+    sql: str
+    candidates: list[str] = field(default_factory=list)
+
+
+CATALOG = [
+    CatalogQuery(
+        'overdue_jobs', 'api/overdue.py get_overdue_jobs, core/tasks.py check_overdue_items',
+        """SELECT jobs.* FROM jobs
+           WHERE jobs.scheduled_end IS NOT NULL AND jobs.scheduled_end < :now
+             AND jobs.status != 'Completed' AND jobs.tenant_id = :jobs_tenant""",
+        ['ix_jobs_overdue'],
+    ),
+    CatalogQuery(
+        'overdue_jobs_all_tenants', 'core/tasks.py check_overdue_items, generate_daily_summary',
+        """SELECT jobs.* FROM jobs
+           WHERE jobs.scheduled_end IS NOT NULL AND jobs.scheduled_end < :now AND jobs.status != 'Completed'""",
+        ['ix_jobs_overdue'],
+    ),
+    CatalogQuery(
+        'overdue_service_calls', 'api/overdue.py get_overdue_service_calls',
+        """SELECT service_calls.* FROM service_calls
+           WHERE service_calls.scheduled_end IS NOT NULL AND service_calls.scheduled_end < :now
+             AND service_calls.status != 'Completed' AND service_calls.tenant_id = :sc_tenant""",
+        ['ix_service_calls_overdue'],
+    ),
+    CatalogQuery(
+        'overdue_review_requests', 'api/overdue.py get_overdue_review_requests',
+        """SELECT review_requests.* FROM review_requests
+           WHERE review_requests.status = 'pending' AND review_requests.created_at < :three_days_ago
+             AND review_requests.tenant_id = :sc_tenant""",
+        ['ix_review_requests_pending'],
+    ),
+    CatalogQuery(
+        'autopost_due', 'workers/auto_poster.py check_and_publish',
+        """SELECT post_instances.* FROM post_instances
+           WHERE post_instances.status = 'Scheduled' AND post_instances.scheduled_for <= :now
+             AND post_instances.autopost_enabled = true AND post_instances.content_item_id IS NOT NULL
+           FOR UPDATE OF post_instances SKIP LOCKED""",
+        ['ix_post_instances_autopost_due'],
+    ),
+    CatalogQuery(
+        'scheduler_account_slots', 'api/marketing_scheduler.py (existing slots per channel account)',
+        """SELECT post_instances.* FROM post_instances
+           WHERE post_instances.tenant_id = :sc_tenant AND post_instances.channel_account_id = :channel_account_id
+             AND post_instances.scheduled_for >= :week_start AND post_instances.scheduled_for <= :week_end""",
+    ),
+    CatalogQuery(
+        'calendar_window', 'api/marketing.py get_calendar',
+        """SELECT post_instances.* FROM post_instances
+           WHERE post_instances.tenant_id = :sc_tenant
+             AND post_instances.scheduled_for >= :window_start AND post_instances.scheduled_for <= :window_end
+             AND post_instances.scheduled_for IS NOT NULL
+           ORDER BY post_instances.scheduled_for NULLS LAST""",
+    ),
+    CatalogQuery(
+        'notifications_list', 'api/notifications.py list_notifications',
+        f"""SELECT notifications.* FROM notifications WHERE {NOTIFICATIONS_FOR}
+            ORDER BY notifications.created_at DESC LIMIT 50""",
+        ['ix_notifications_user_read_created', 'ix_notifications_tenant_broadcast'],
+    ),
+    CatalogQuery(
+        'notifications_unread', 'api/notifications.py list_notifications?read=false',
+        f"""SELECT notifications.* FROM notifications WHERE {NOTIFICATIONS_FOR} AND notifications.read = false
+            ORDER BY notifications.created_at DESC LIMIT 50""",
+        ['ix_notifications_user_read_created', 'ix_notifications_tenant_broadcast'],
+    ),
+]
+
+REDUNDANT_INDEXES_SQL = """
+    SELECT t.relname AS table_name, ic.relname AS index_name, i.indkey::int2[] AS columns,
+           i.indisunique AS is_unique, pg_relation_size(i.indexrelid) AS size
+    FROM pg_index i
+    JOIN pg_class ic ON ic.oid = i.indexrelid
+    JOIN pg_class t ON t.oid = i.indrelid
+    JOIN pg_namespace n ON n.oid = t.relnamespace
+    JOIN pg_am am ON am.oid = ic.relam
+    WHERE n.nspname = 'public' AND am.amname = 'btree' AND i.indpred IS NULL AND i.indexprs IS NULL
+"""
+
+
+@dataclass
+class Measurement:
+    execution_ms: float
+    planning_ms: float
+    shared_hit: int
+    shared_read: int
+    rows: int
+    scans: list[str]
+
+
+def walk(node: dict):
+    yield node
+    for child in node.get('Plans', []):
+        yield from walk(child)
+
+
+def summarize(explain: list) -> Measurement:
+    """Timings, buffers and the scan nodes of one EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) result"""
+    top = explain[0]
+    plan = top['Plan']
+    scans = []
+    for node in walk(plan):
+        node_type = node['Node Type']
+        if 'Scan' not in node_type:
+            continue
+        target = node.get('Index Name') or node.get('Relation Name') or ''
+        description = f"{node_type} {'using' if node.get('Index Name') else 'on'} {target}".strip()
+        removed = node.get('Rows Removed by Filter', 0) + node.get('Rows Removed by Index Recheck', 0)
+        if removed:
+            description += f" ({removed:,} rows filtered)"
+        scans.append(description)
+    return Measurement(
+        execution_ms=top['Execution Time'],
+        planning_ms=top['Planning Time'],
+        shared_hit=plan.get('Shared Hit Blocks', 0),
+        shared_read=plan.get('Shared Read Blocks', 0),
+        rows=plan.get('Actual Rows', 0),
+        scans=scans,
+    )
+
+
+async def explain(conn, query: CatalogQuery, params: dict, runs: int) -> Measurement:
+    """Median of `runs` executions after one warm-up run"""
+    statement = text(f"EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) {query.sql}")
+    results = []
+    for _ in range(runs + 1):
+        value = (await conn.execute(statement, params)).scalar()
+        results.append(summarize(json.loads(value) if isinstance(value, str) else value))
+    results = sorted(results[1:], key=lambda m: m.execution_ms)
+    return results[len(results) // 2]
+
+
+async def query_params(conn) -> dict:
+    """Bind values drawn from the seeded data (the busiest notification user and channel account)"""
+    now = datetime.now(timezone.utc)
+    user_id = (await conn.execute(text(
+        "SELECT user_id FROM notifications WHERE user_id IS NOT NULL GROUP BY user_id ORDER BY count(*) DESC LIMIT 1"
+    ))).scalar()
+    channel_account_id = (await conn.execute(text(
+        "SELECT channel_account_id FROM post_instances GROUP BY channel_account_id ORDER BY count(*) DESC LIMIT 1"
+    ))).scalar()
+    week_start = now - timedelta(days=now.weekday())
+    return {
+        'now': now,
+        'three_days_ago': now - timedelta(days=3),
+        'jobs_tenant': JOBS_TENANT,
+        'sc_tenant': SERVICE_CALLS_TENANT,
+        'user_id': user_id,
+        'channel_account_id': channel_account_id,
+        'week_start': week_start,
+        'week_end': week_start + timedelta(days=7),
+        'window_start': now - timedelta(days=14),
+        'window_end': now + timedelta(days=28),
+    }
+
+
+async def existing_indexes(conn) -> set[str]:
+    res = await conn.execute(text("SELECT indexname FROM pg_indexes WHERE schemaname = 'public'"))
+    return set(res.scalars().all())
+
+
+async def measure(engine, queries: list[CatalogQuery], runs: int, with_candidates: bool, params: dict) -> dict:
+    """Measure the queries with every candidate present (or absent), then roll the DDL back"""
+    async with engine.connect() as conn:
+        trans = await conn.begin()
+        try:
+            installed = await existing_indexes(conn)
+            for name in {c for q in queries for c in q.candidates}:
+                if with_candidates and name not in installed:
+                    await conn.execute(text(CANDIDATE_INDEXES[name]))
+                elif not with_candidates and name in installed:
+                    await conn.execute(text(f"DROP INDEX {name}"))
+            return {q.name: await explain(conn, q, params, runs) for q in queries}
+        finally:
+            await trans.rollback()
+
+
+async def redundant_indexes(conn) -> list[dict]:
+    """Non-unique btree indexes whose columns are a leading prefix of another index on the same table"""
+    rows = (await conn.execute(text(REDUNDANT_INDEXES_SQL))).mappings().all()
+    redundant = []
+    for index in rows:
+        if index['is_unique']:
+            continue
+        columns = list(index['columns'])
+        for other in rows:
+            other_columns = list(other['columns'])
+            if (other['table_name'] == index['table_name'] and other['index_name'] != index['index_name']
+                    and len(other_columns) > len(columns) and other_columns[:len(columns)] == columns):
+                redundant.append({'table': index['table_name'], 'index': index['index_name'],
+                                  'covered_by': other['index_name'], 'size': index['size']})
+                break
+    return redundant
+
+
+def verdict(query: CatalogQuery, without: Measurement, with_: Measurement, min_speedup: float) -> str:
+    if not query.candidates:
+        seq_scans = [s for s in with_.scans if s.startswith('Seq Scan')]
+        return f"review: {', '.join(seq_scans)}" if seq_scans else "covered by existing indexes"
+    used = [c for c in query.candidates if any(c in s for s in with_.scans)]
+    if not used:
+        return "candidate not used by the planner"
+    speedup = without.execution_ms / max(with_.execution_ms, 0.001)
+    if speedup >= min_speedup:
+        return f"recommend {', '.join(used)}"
+    return f"no significant gain ({speedup:.1f}x)"
+
+
+def render_markdown(report: dict) -> str:
+    lines = [
+        "# Index advisor report",
+        "",
+        f"Generated {report['generated_at']} by `python -m benchmarks.index_advisor` against "
+        f"`{report['database']}` ({report['server_version']}). Median of {report['runs']} runs per query "
+        "after a warm-up run; buffers are shared blocks hit + read.",
+        "",
+        "Table sizes: " + ", ".join(f"{table} {rows:,}" for table, rows in report['table_rows'].items()),
+        "",
+        "## Queries",
+        "",
+        "| Query | Without candidates (ms / buffers) | With candidates (ms / buffers) | Speedup | Verdict |",
+        "|---|---|---|---|---|",
+    ]
+    for entry in report['queries']:
+        without, with_ = entry['without'], entry['with']
+        lines.append(
+            f"| `{entry['name']}` | {without['execution_ms']:.2f} / {without['shared_hit'] + without['shared_read']:,} "
+            f"| {with_['execution_ms']:.2f} / {with_['shared_hit'] + with_['shared_read']:,} "
+            f"| {entry['speedup']:.1f}x | {entry['verdict']} |"
+        )
+    lines += ["", "## Plans", ""]
+    for entry in report['queries']:
+        lines += [
+            f"### `{entry['name']}`",
+            "",
+            f"Sent by {entry['source']}.",
+            "",
+            f"- without: {'; '.join(entry['without']['scans']) or '-'}",
+            f"- with: {'; '.join(entry['with']['scans']) or '-'}",
+            "",
+        ]
+    lines += ["## Redundant indexes", ""]
+    if report['redundant']:
+        lines += ["| Table | Index | Covered by | Size |", "|---|---|---|---|"]
+        lines += [f"| {r['table']} | `{r['index']}` | `{r['covered_by']}` | {r['size'] / 1024:,.0f} kB |"
+                  for r in report['redundant']]
+    else:
+        lines.append("None.")
+    return "\n".join(lines) + "\n"
+
+
+async def advise(engine, queries: list[CatalogQuery], runs: int = 5, min_speedup: float = 1.5) -> dict:
+    async with engine.connect() as conn:
+        params = await query_params(conn)
+        server_version = (await conn.execute(text("SHOW server_version"))).scalar()
+        database = (await conn.execute(text("SELECT current_database()"))).scalar()
+        table_rows = dict((await conn.execute(text(
+            "SELECT relname, reltuples::bigint FROM pg_class WHERE relname IN "
+            "('jobs', 'service_calls', 'review_requests', 'post_instances', 'notifications') ORDER BY relname"
+        ))).all())
+        redundant = await redundant_indexes(conn)
+
+    without = await measure(engine, queries, runs, False, params)
+    with_ = await measure(engine, queries, runs, True, params)
+
+    entries = []
+    for query in queries:
+        entries.append({
+            'name': query.name,
+            'source': query.source,
+            'candidates': query.candidates,
+            'without': vars(without[query.name]),
+            'with': vars(with_[query.name]),
+            'speedup': without[query.name].execution_ms / max(with_[query.name].execution_ms, 0.001),
+            'verdict': verdict(query, without[query.name], with_[query.name], min_speedup),
+        })
+    return {
+        'generated_at': datetime.now(timezone.utc).strftime('%Y-%m-%d %H:%M UTC'),
+        'database': database,
+        'server_version': server_version,
+        'runs': runs,
+        'table_rows': table_rows,
+        'queries': entries,
+        'redundant': redundant,
+    }
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--runs', type=int, default=5, help='Measured runs per query (median is reported)')
+    parser.add_argument('--min-speedup', type=float, default=1.5, help='Speedup needed to recommend a candidate')
+    parser.add_argument('--only', action='append', help='Catalog query name (repeatable)')
+    parser.add_argument('--output', help='Write the markdown report to this file')
+    parser.add_argument('--json', action='store_true', help='Print the raw report as JSON')
+    args = parser.parse_args()
+
+    queries = [q for q in CATALOG if not args.only or q.name in args.only]
+    if not queries:
+        raise SystemExit(f"No catalog query matches. Known: {', '.join(q.name for q in CATALOG)}")
+
+    from sqlalchemy.ext.asyncio import create_async_engine
+    from .seed_bench_data import BENCH_DATABASE_URL
+
+    engine = create_async_engine(os.getenv("BENCH_DATABASE_URL", BENCH_DATABASE_URL))
+    try:
+        report = await advise(engine, queries, args.runs, args.min_speedup)
+    finally:
+        await engine.dispose()
+
+    if args.json:
+        print(json.dumps(report, indent=2, default=str))
+        return
+    markdown = render_markdown(report)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(markdown)
+        print(f"✅ Report written to {args.output}")
+    else:
+        print(markdown)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
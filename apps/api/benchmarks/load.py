@@ -0,0 +1,148 @@
+"""
+Asyncio load driver for the dashboard endpoints
+
+N concurrent virtual users each loop over the endpoint mix for the given duration and
+the driver reports throughput and p50/p95/p99 latency per endpoint. By default it runs
+the app in-process against the benchmark database; --base-url targets a running server
+(e.g. `python -m app.runtime --role web` started with DATABASE_URL pointing at it).
+
+Run from apps/api:
+    python -m benchmarks.load --users 20 --duration 60
+    python -m benchmarks.load --base-url http://localhost:8000 --users 50 --only jobs_list --only tech_stats_all
+    python -m benchmarks.load --json > load-report.json
+"""
+import argparse
+import asyncio
+import json
+import math
+import os
+import random
+import statistics
+import time
+from collections import defaultdict
+
+from .endpoints import dashboard_endpoints
+from .seed_bench_data import BENCH_DATABASE_URL, BENCH_USERNAME, BENCH_PASSWORD
+
+
+def percentile(samples: list[float], pct: float) -> float:
+    """Nearest-rank percentile"""
+    ordered = sorted(samples)
+    return ordered[max(0, math.ceil(pct / 100 * len(ordered)) - 1)]
+
+
+def make_client(base_url: str | None, timeout: float):
+    from httpx import AsyncClient, ASGITransport, Limits
+
+    if base_url:
+        return AsyncClient(base_url=base_url, timeout=timeout, limits=Limits(max_connections=None))
+    # In-process: point the app at the benchmark database before it is imported
+    os.environ["DATABASE_URL"] = os.getenv("BENCH_DATABASE_URL", BENCH_DATABASE_URL)
+    os.environ.setdefault("QUERY_STATS", "false")
+    # Every virtual user shares one token, i.e. one rate limit key: measure the app, not 429s
+    os.environ.setdefault("RATE_LIMIT_BACKEND", "off")
+    from app.main import app
+
+    return AsyncClient(transport=ASGITransport(app=app), base_url="http://bench", timeout=timeout)
+
+
+async def virtual_user(client, endpoints: dict, deadline: float, results: dict, errors: dict, rng: random.Random):
+    names = list(endpoints)
+    while time.perf_counter() < deadline:
+        name = rng.choice(names)
+        path, params = endpoints[name]
+        started = time.perf_counter()
+        try:
+            res = await client.get(f"/api/v1{path}", params=params)
+            ok = res.status_code == 200
+        except Exception:
+            ok = False
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        if ok:
+            results[name].append(elapsed_ms)
+        else:
+            errors[name] += 1
+
+
+async def run_load(base_url: str | None, users: int, duration: float, only: list[str] | None, timeout: float, seed: int) -> dict:
+    endpoints = dashboard_endpoints()
+    if only:
+        unknown = set(only) - set(endpoints)
+        if unknown:
+            raise SystemExit(f"Unknown endpoint(s): {', '.join(sorted(unknown))}. Choose from: {', '.join(endpoints)}")
+        endpoints = {name: endpoints[name] for name in only}
+
+    client = make_client(base_url, timeout)
+    results: dict[str, list[float]] = defaultdict(list)
+    errors: dict[str, int] = defaultdict(int)
+    try:
+        res = await client.post("/api/v1/login", json={"username": BENCH_USERNAME, "password": BENCH_PASSWORD})
+        res.raise_for_status()
+        client.headers["Authorization"] = f"Bearer {res.json()['access_token']}"
+
+        # Warm-up pass (pool, statement cache, lazily mounted routers) outside the measurement
+        for path, params in endpoints.values():
+            await client.get(f"/api/v1{path}", params=params)
+
+        started = time.perf_counter()
+        deadline = started + duration
+        await asyncio.gather(*(
+            virtual_user(client, endpoints, deadline, results, errors, random.Random(seed + i))
+            for i in range(users)
+        ))
+        elapsed = time.perf_counter() - started
+    finally:
+        await client.aclose()
+        if not base_url:
+            from app.db.session import engine
+            await engine.dispose()
+
+    report = {'users': users, 'duration_s': round(elapsed, 1), 'endpoints': {}}
+    for name in endpoints:
+        samples = results.get(name, [])
+        report['endpoints'][name] = {
+            'requests': len(samples),
+            'errors': errors.get(name, 0),
+            'rps': round(len(samples) / elapsed, 1),
+            'p50_ms': round(statistics.median(samples), 1) if samples else None,
+            'p95_ms': round(percentile(samples, 95), 1) if samples else None,
+            'p99_ms': round(percentile(samples, 99), 1) if samples else None,
+            'max_ms': round(max(samples), 1) if samples else None,
+        }
+    total = sum(len(samples) for samples in results.values())
+    report['total_requests'] = total
+    report['total_errors'] = sum(errors.values())
+    report['total_rps'] = round(total / elapsed, 1)
+    return report
+
+
+def print_report(report: dict):
+    print(f"{report['users']} users for {report['duration_s']}s - {report['total_requests']} requests, "
+          f"{report['total_rps']} req/s, {report['total_errors']} errors\n")
+    print(f"{'endpoint':<24} {'reqs':>7} {'err':>5} {'req/s':>7} {'p50':>8} {'p95':>8} {'p99':>8} {'max':>8}")
+    for name, row in sorted(report['endpoints'].items(), key=lambda item: -(item[1]['p95_ms'] or 0)):
+        latencies = ''.join(f" {row[key]:>8.1f}" if row[key] is not None else f" {'-':>8}"
+                            for key in ('p50_ms', 'p95_ms', 'p99_ms', 'max_ms'))
+        print(f"{name:<24} {row['requests']:>7} {row['errors']:>5} {row['rps']:>7}{latencies}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--base-url', help='Target a running server instead of the in-process app')
+    parser.add_argument('--users', type=int, default=10, help='Concurrent virtual users')
+    parser.add_argument('--duration', type=float, default=30, help='Seconds to run')
+    parser.add_argument('--only', action='append', help='Endpoint name to include (repeatable; default: all)')
+    parser.add_argument('--timeout', type=float, default=60, help='Per-request timeout in seconds')
+    parser.add_argument('--seed', type=int, default=1, help='Seed for the per-user endpoint order')
+    parser.add_argument('--json', action='store_true', help='Print the report as JSON')
+    args = parser.parse_args()
+
+    report = asyncio.run(run_load(args.base_url, args.users, args.duration, args.only, args.timeout, args.seed))
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print_report(report)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,27 @@
+"""
+Latency of the dashboard endpoints against the seeded benchmark database
+
+    python -m pytest benchmarks                                  # all endpoints
+    BENCH_ROUNDS=100 python -m pytest benchmarks -k analytics
+    python -m pytest benchmarks --benchmark-autosave             # keep a baseline in .benchmarks/
+    python -m pytest benchmarks --benchmark-compare              # compare against the last saved run
+"""
+import os
+
+import pytest
+
+from .endpoints import dashboard_endpoints
+
+ENDPOINTS = dashboard_endpoints()
+# Timed calls per endpoint - enough samples for a stable p95
+ROUNDS = int(os.getenv('BENCH_ROUNDS', '30'))
+
+
+@pytest.mark.parametrize('name', list(ENDPOINTS))
+def test_endpoint_latency(benchmark, bench_client, name):
+    path, params = ENDPOINTS[name]
+    # One unmeasured call warms the pool, the statement cache and lazily built state
+    bench_client.get(path, params)
+    benchmark.group = name.split('_')[0]
+    benchmark.extra_info['path'] = path
+    benchmark.pedantic(bench_client.get, args=(path, params), rounds=ROUNDS, iterations=1)
@@ -0,0 +1,125 @@
+"""
+JSON serialization cost of large list responses, without the database
+
+Compares, per response size, the ways a route can turn rows into a response body:
+
+- stdlib: hand-built dicts (str() ids, isoformat() dates) through jsonable_encoder and json.dumps,
+  the old path of list_customers / overdue / tech stats
+- orjson_default: the same dicts through jsonable_encoder and FastJSONResponse, what any route
+  returning plain data gets now that it is the app's default response class
+- orjson_direct: raw row values straight into FastJSONResponse (core/responses.py), what the
+  heavy list routes return
+- pydantic_*: a list of slim schema instances (JobListItem), through jsonable_encoder + json.dumps
+  versus FastJSONResponse
+
+    python -m pytest benchmarks/test_serialization.py
+    BENCH_SERIALIZATION_ROWS=1000,50000 python -m pytest benchmarks/test_serialization.py
+"""
+import json
+import os
+import random
+import uuid
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+from app import schemas
+from app.core.responses import FastJSONResponse
+
+ROW_COUNTS = [int(n) for n in os.getenv('BENCH_SERIALIZATION_ROWS', '1000,5000,10000').split(',')]
+ROUNDS = int(os.getenv('BENCH_ROUNDS', '30'))
+ANCHOR = datetime(2026, 1, 1, tzinfo=timezone.utc)
+
+
+def customer_rows(count: int) -> list:
+    """Raw values, as list_customers reads them from its rows"""
+    rng = random.Random(7)
+    rows = []
+    for i in range(count):
+        created_at = ANCHOR - timedelta(minutes=rng.randint(0, 500_000), microseconds=rng.randint(0, 999_999))
+        rows.append({
+            'id': uuid.UUID(int=rng.getrandbits(128)),
+            'tenant_id': 'h2o',
+            'name': f"Customer {i}",
+            'phone': f"360-555-{i % 10000:04d}",
+            'email': f"customer{i}@example.com",
+            'address_line1': f"{rng.randint(100, 99999)} NE {rng.randint(1, 200)}th St",
+            'city': rng.choice(['Vancouver', 'Camas', 'Battle Ground', 'Ridgefield']),
+            'state': 'WA',
+            'zip': f"98{rng.randint(600, 699)}",
+            'notes': None if i % 3 else "Gate code on file, dog in yard",
+            'tags': ['repeat'] if i % 5 == 0 else None,
+            'created_at': created_at,
+            'updated_at': created_at + timedelta(days=1),
+            'service_calls_count': rng.randint(0, 12),
+        })
+    return rows
+
+
+def stringified(rows: list) -> list:
+    """The same rows as the routes used to build them: str() ids, isoformat() dates"""
+    return [
+        {
+            **row,
+            'id': str(row['id']),
+            'created_at': row['created_at'].isoformat() if row['created_at'] else None,
+            'updated_at': row['updated_at'].isoformat() if row['updated_at'] else None,
+        }
+        for row in rows
+    ]
+
+
+def job_items(count: int) -> list:
+    rng = random.Random(7)
+    builder = schemas.BuilderName(id=uuid.uuid4(), name='Acme Homes')
+    return [
+        schemas.JobListItem(
+            id=uuid.UUID(int=rng.getrandbits(128)), tenant_id='all_county', builder_id=builder.id,
+            community='Riverview', lot_number=str(i), phase='rough', status='Scheduled',
+            address_line1=f"{i} Main St", city='Vancouver', state='WA', zip='98660',
+            scheduled_start=ANCHOR + timedelta(hours=i), created_at=ANCHOR, updated_at=ANCHOR, builder=builder,
+        )
+        for i in range(count)
+    ]
+
+
+def stdlib_body(content) -> bytes:
+    return JSONResponse(jsonable_encoder(content)).body
+
+
+def orjson_default_body(content) -> bytes:
+    return FastJSONResponse(jsonable_encoder(content)).body
+
+
+def orjson_direct_body(content) -> bytes:
+    return FastJSONResponse(content).body
+
+
+@pytest.mark.parametrize('rows', ROW_COUNTS)
+@pytest.mark.parametrize('path', ['stdlib', 'orjson_default', 'orjson_direct'])
+def test_dict_rows(benchmark, rows, path):
+    raw = customer_rows(rows)
+    content, render = {
+        'stdlib': (stringified(raw), stdlib_body),
+        'orjson_default': (stringified(raw), orjson_default_body),
+        'orjson_direct': (raw, orjson_direct_body),
+    }[path]
+    # Same document whichever way it is produced
+    assert json.loads(render(content)) == json.loads(stdlib_body(stringified(raw)))
+
+    benchmark.group = f"dict rows x{rows}"
+    benchmark.extra_info['bytes'] = len(render(content))
+    benchmark.pedantic(render, args=(content,), rounds=ROUNDS, iterations=1)
+
+
+@pytest.mark.parametrize('rows', ROW_COUNTS)
+@pytest.mark.parametrize('path', ['stdlib', 'orjson_direct'])
+def test_pydantic_rows(benchmark, rows, path):
+    items = job_items(rows)
+    render = {'stdlib': stdlib_body, 'orjson_direct': orjson_direct_body}[path]
+    assert json.loads(render(items)) == json.loads(stdlib_body(items))
+
+    benchmark.group = f"JobListItem x{rows}"
+    benchmark.pedantic(render, args=(items,), rounds=ROUNDS, iterations=1)
@@ -64,7 +64,8 @@ python fix_admin.py || {
 }
 
 echo "=========================================="
-echo "Starting uvicorn server..."
+echo "Starting role: ${APP_ROLE:-all}"
 echo "=========================================="
 PORT=${PORT:-8000}
-exec uvicorn app.main:app --host 0.0.0.0 --port $PORT
+# APP_ROLE: web | scheduler | publisher | all (see app/runtime.py)
+exec python -m app.runtime --host 0.0.0.0 --port $PORT
@@ -19,3 +19,65 @@ async def test_audit_on_update():
         assert res3.status_code == 200
         logs = res3.json()
         assert any(l['action'] == 'update' for l in logs)
+
+@pytest.mark.asyncio
+async def test_audit_rows_written_in_one_insert_at_commit():
+    from uuid import uuid4
+    from sqlalchemy import event, func, select
+    from app import crud, models
+    from app.db.session import AsyncSessionLocal, engine
+
+    entity_id = uuid4()
+    inserts = []
+
+    def count_audit_inserts(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith('INSERT INTO AUDIT_LOG'):
+            inserts.append(statement)
+
+    event.listen(engine.sync_engine, 'before_cursor_execute', count_audit_inserts)
+    try:
+        async with AsyncSessionLocal() as db:
+            for field in ('status', 'notes', 'assigned_to'):
+                await crud.write_audit(db, 'h2o', 'job', entity_id, 'update', 'admin', field, 'old', 'new')
+            # Buffered, nothing written yet
+            assert inserts == []
+            await db.commit()
+
+            # A rollback discards what was buffered
+            await crud.write_audit(db, 'h2o', 'job', entity_id, 'delete', 'admin')
+            await db.rollback()
+
+            rows = await db.execute(select(func.count()).select_from(models.AuditLog).where(models.AuditLog.entity_id == entity_id))
+            assert rows.scalar() == 3
+    finally:
+        event.remove(engine.sync_engine, 'before_cursor_execute', count_audit_inserts)
+    assert len(inserts) == 1
+
+@pytest.mark.asyncio
+async def test_outbox_mode_defers_audit_rows_to_drainer(monkeypatch):
+    from uuid import uuid4
+    from sqlalchemy import func, select
+    from app import crud, models
+    from app.core import audit
+    from app.core.config import settings
+    from app.db.session import AsyncSessionLocal
+
+    monkeypatch.setattr(settings, 'audit_mode', 'outbox')
+    entity_id = uuid4()
+
+    async def count(model):
+        async with AsyncSessionLocal() as db:
+            res = await db.execute(select(func.count()).select_from(model).where(model.entity_id == entity_id))
+            return res.scalar()
+
+    async with AsyncSessionLocal() as db:
+        await crud.write_audit(db, 'h2o', 'service_call', entity_id, 'update', 'admin', 'status', 'New', 'Scheduled')
+        await crud.write_audit(db, 'h2o', 'service_call', entity_id, 'update', 'admin', 'assigned_to', None, 'tech1')
+        await db.commit()
+
+    assert await count(models.AuditLog) == 0
+    assert await count(models.AuditOutbox) == 2
+
+    assert await audit.AuditDrainer('outbox').drain_once() >= 2
+    assert await count(models.AuditLog) == 2
+    assert await count(models.AuditOutbox) == 0
@@ -0,0 +1,48 @@
+import pytest
+
+from app.core import cache, pg_listener
+
+
+@pytest.mark.asyncio
+async def test_cache_evicts_least_recently_used_and_expired_entries(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(cache.time, 'monotonic', lambda: now[0])
+    lru = cache.Cache('test_lru', maxsize=2, ttl=60)
+
+    lru.set('a', 1)
+    lru.set('b', 2)
+    assert lru.get('a') == 1  # 'a' is now the most recent
+    lru.set('c', 3)
+    assert lru.get('b') is None
+    assert lru.get('a') == 1 and lru.get('c') == 3
+
+    now[0] += 61
+    assert lru.get('a') is None
+    assert len(lru) == 1
+
+    loads = []
+
+    async def load():
+        loads.append(1)
+        return 'loaded'
+
+    assert await lru.get_or_load('d', load) == 'loaded'
+    assert await lru.get_or_load('d', load) == 'loaded'
+    assert len(loads) == 1
+
+    lru.invalidate('d')
+    assert lru.get('d') is None
+
+
+@pytest.mark.asyncio
+async def test_invalidation_reaches_registered_caches():
+    builders = cache.register('builder_ids')
+    builders.set('acme homes', 'some-id')
+    await cache.invalidate(None, 'builder_ids', 'acme homes')
+    assert builders.get('acme homes') is None
+
+    # Notifications from other processes, through the shared LISTEN connection
+    cache.listen()
+    builders.set('acme homes', 'some-id')
+    pg_listener.listener._on_notify(None, 0, cache.CHANNEL, '{"cache": "builder_ids", "key": null}')
+    assert len(builders) == 0
@@ -0,0 +1,71 @@
+from datetime import date, datetime, time, timedelta, timezone
+
+import pytest
+from httpx import AsyncClient, ASGITransport
+from sqlalchemy import func, select
+from app import models
+from app.core.content_mix import TRACKED_WEEKS, get_week_start, track_content_mix
+from app.db.session import AsyncSessionLocal
+from app.main import app
+
+
+@pytest.mark.asyncio
+async def test_content_mix_groups_posts_by_week_and_bucket():
+    this_week = get_week_start(date.today())
+    last_week = this_week - timedelta(weeks=1)
+
+    async with AsyncSessionLocal() as db:
+        channel = models.MarketingChannel(key='gbp', display_name='Google Business Profile')
+        db.add(channel)
+        await db.flush()
+        account = models.ChannelAccount(tenant_id='h2o', channel_id=channel.id, name='H2O GBP')
+        db.add(account)
+        await db.flush()
+
+        posts = [(this_week, category) for category in ('diy', 'diy', 'blog_post', 'coupon', 'coupon', 'ad_content')]
+        posts += [(last_week, 'team_post'), (last_week, 'local')]
+        posts.append((last_week - timedelta(weeks=2), 'diy'))  # Outside the requested weeks
+        for hour, (week, category) in enumerate(posts):
+            # Midweek, one hour apart: an account has one post per slot
+            scheduled_for = datetime.combine(week + timedelta(days=2), time(hour), tzinfo=timezone.utc)
+            item = models.ContentItem(tenant_id='h2o', title=category, content_category=category, owner='admin')
+            db.add(models.PostInstance(tenant_id='h2o', content_item=item, channel_account_id=account.id, scheduled_for=scheduled_for))
+        await db.commit()
+        account_id = account.id
+
+    async with AsyncClient(transport=ASGITransport(app=app), base_url='http://test') as ac:
+        login = await ac.post('/api/v1/login', json={'username': 'admin', 'password': 'adminpassword'})
+        headers = {"Authorization": f"Bearer {login.json()['access_token']}"}
+
+        res = await ac.get('/api/v1/marketing/content-mix/summary', params={'tenant_id': 'h2o', 'weeks': 2}, headers=headers)
+        assert res.status_code == 200
+        [summary] = res.json()
+
+    assert summary['week_start_date'] == this_week.isoformat()
+    assert [
+        (week['week_start_date'], week['educational_count'], week['authority_count'], week['promo_count'], week['local_relevance_count'])
+        for week in summary['history']
+    ] == [
+        (last_week.isoformat(), 0, 1, 0, 1),
+        (this_week.isoformat(), 3, 0, 2, 0),
+    ]
+    # Current week totals against the default targets
+    assert summary['educational'] == {'actual': 3, 'target': 2, 'percentage': 150.0}
+    assert summary['promo'] == {'actual': 2, 'target': 1, 'percentage': 200.0}
+    assert summary['authority']['actual'] == 0
+    assert summary['overall_health'] == 'warning'
+
+    async with AsyncSessionLocal() as db:
+        # The summary only reads
+        tracked = select(func.count()).select_from(models.ContentMixTracking)
+        assert (await db.execute(tracked)).scalar() == 0
+
+        # The daily task records the weeks it covers
+        await track_content_mix(db, 'h2o', TRACKED_WEEKS)
+        rows = (await db.execute(
+            select(models.ContentMixTracking).order_by(models.ContentMixTracking.week_start_date)
+        )).scalars().all()
+        assert [(row.channel_account_id, row.week_start_date, row.educational_count, row.promo_count) for row in rows] == [
+            (account_id, last_week, 0, 0),
+            (account_id, this_week, 3, 2),
+        ]
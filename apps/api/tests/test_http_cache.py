@@ -0,0 +1,46 @@
+import pytest
+from httpx import AsyncClient, ASGITransport
+from app.main import app
+# Database setup and admin user are now in conftest.py
+
+@pytest.mark.asyncio
+async def test_portal_definitions_revalidate_with_etag():
+    async with AsyncClient(transport=ASGITransport(app=app), base_url='http://test') as ac:
+        login = await ac.post('/api/v1/login', json={'username': 'admin', 'password': 'adminpassword'})
+        headers = {"Authorization": f"Bearer {login.json()['access_token']}"}
+
+        await ac.post('/api/v1/directory/portal-definitions', headers=headers, json={
+            'name': 'Clark County Permits', 'category': 'permit', 'base_url': 'https://permits.example.com'
+        })
+        res = await ac.get('/api/v1/directory/portal-definitions', headers=headers)
+        assert res.status_code == 200
+        etag = res.headers['etag']
+        assert etag.startswith('W/"')
+        assert 'last-modified' in res.headers
+
+        res = await ac.get('/api/v1/directory/portal-definitions', headers={**headers, 'If-None-Match': etag})
+        assert res.status_code == 304
+        assert res.content == b''
+
+        # Different query, different representation
+        res = await ac.get('/api/v1/directory/portal-definitions?category=permit', headers={**headers, 'If-None-Match': etag})
+        assert res.status_code == 200
+
+        # A write changes the version
+        await ac.post('/api/v1/directory/portal-definitions', headers=headers, json={
+            'name': 'City Utilities', 'category': 'utility', 'base_url': 'https://utilities.example.com'
+        })
+        res = await ac.get('/api/v1/directory/portal-definitions', headers={**headers, 'If-None-Match': etag})
+        assert res.status_code == 200
+        assert len(res.json()) == 2
+        assert res.headers['etag'] != etag
+
+
+@pytest.mark.asyncio
+async def test_public_reviews_are_cdn_cacheable():
+    async with AsyncClient(transport=ASGITransport(app=app), base_url='http://test') as ac:
+        res = await ac.get('/api/v1/public/reviews')
+        assert res.status_code == 200
+        assert res.headers['cache-control'].startswith('public')
+        res = await ac.get('/api/v1/public/reviews', headers={'If-None-Match': res.headers['etag']})
+        assert res.status_code == 304
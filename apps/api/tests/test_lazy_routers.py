@@ -0,0 +1,23 @@
+from app.main import create_app
+
+
+def route_paths(app):
+    return [(route.path, tuple(sorted(getattr(route, 'methods', None) or ()))) for route in app.router.routes]
+
+
+def test_lazy_mount_matches_eager_route_order():
+    eager = create_app(lazy_routers=False)
+    lazy = create_app(lazy_routers=True)
+    mounts = lazy.state.router_mounts
+    assert '/api/v1/jobs/overdue' not in [path for path, _ in route_paths(lazy)]
+
+    # Mount in a different order than registration; precedence must still match eager mounting
+    mounts.mount_for_path('/api/v1/customers')
+    mounts.mount_for_path('/api/v1/jobs/overdue')
+    assert mounts.is_mounted('overdue') and mounts.is_mounted('customers')
+    assert not mounts.is_mounted('marketing')
+    paths = [path for path, _ in route_paths(lazy)]
+    assert paths.index('/api/v1/jobs/overdue') < paths.index('/api/v1/jobs/{id}')
+
+    mounts.mount_for_path(lazy.openapi_url)
+    assert route_paths(lazy) == route_paths(eager)
@@ -0,0 +1,86 @@
+import os
+import pytest
+from httpx import AsyncClient, ASGITransport
+from app.main import app
+from app.core.config import settings
+# Database setup and admin user are now in conftest.py
+
+@pytest.mark.asyncio
+async def test_media_upload_streams_to_local_storage():
+    async with AsyncClient(transport=ASGITransport(app=app), base_url='http://test') as ac:
+        login = await ac.post('/api/v1/login', json={'username': 'admin', 'password': 'adminpassword'})
+        token = login.json()['access_token']
+        headers = {"Authorization": f"Bearer {token}"}
+        content = b'\x89PNG\r\n\x1a\n' + b'0' * 1024
+        res = await ac.post(
+            '/api/v1/marketing/media/upload',
+            params={'tenant_id': 'h2o'},
+            files={'file': ('photo.png', content, 'image/png')},
+            headers=headers,
+        )
+        assert res.status_code == 201, res.text
+        asset = res.json()
+        assert asset['file_size'] == len(content)
+        assert asset['file_type'] == 'image'
+        # local backend writes under STORAGE_LOCAL_PATH/<tenant>/media/
+        assert asset['file_url'].startswith('file://')
+        stored_path = asset['file_url'][len('file://'):]
+        assert stored_path.startswith(os.path.abspath(settings.storage_local_path))
+        with open(stored_path, 'rb') as f:
+            assert f.read() == content
+
+@pytest.mark.asyncio
+async def test_media_upload_rejects_disallowed_type():
+    async with AsyncClient(transport=ASGITransport(app=app), base_url='http://test') as ac:
+        login = await ac.post('/api/v1/login', json={'username': 'admin', 'password': 'adminpassword'})
+        token = login.json()['access_token']
+        headers = {"Authorization": f"Bearer {token}"}
+        res = await ac.post(
+            '/api/v1/marketing/media/upload',
+            params={'tenant_id': 'h2o'},
+            files={'file': ('notes.txt', b'hello', 'text/plain')},
+            headers=headers,
+        )
+        assert res.status_code == 400
+
+@pytest.mark.asyncio
+async def test_direct_upload_slot_and_confirm():
+    async with AsyncClient(transport=ASGITransport(app=app), base_url='http://test') as ac:
+        login = await ac.post('/api/v1/login', json={'username': 'admin', 'password': 'adminpassword'})
+        token = login.json()['access_token']
+        headers = {"Authorization": f"Bearer {token}"}
+        content = b'\xff\xd8\xff' + b'1' * 2048
+        res = await ac.post('/api/v1/marketing/media/upload-url', json={
+            'tenant_id': 'h2o', 'file_name': 'crew.jpg', 'mime_type': 'image/jpeg', 'file_size': len(content)
+        }, headers=headers)
+        assert res.status_code == 200, res.text
+        slot = res.json()
+        # Confirming before the PUT fails
+        res = await ac.post('/api/v1/marketing/media/confirm', json={'upload_token': slot['upload_token']}, headers=headers)
+        assert res.status_code == 400
+        # The local backend hands out a file:// URL in place of a presigned PUT
+        with open(slot['upload_url'][len('file://'):], 'wb') as f:
+            f.write(content)
+        res = await ac.post('/api/v1/marketing/media/confirm', json={
+            'upload_token': slot['upload_token'], 'intent_tags': ['crew']
+        }, headers=headers)
+        assert res.status_code == 201, res.text
+        asset = res.json()
+        assert asset['file_size'] == len(content)
+        assert asset['file_type'] == 'image'
+        assert asset['intent_tags'] == ['crew']
+
+def test_render_derivatives_sizes():
+    Image = pytest.importorskip('PIL.Image')
+    import io
+    from app.core.media_derivatives import render_derivatives, rendition_key
+    buffer = io.BytesIO()
+    Image.new('RGBA', (3000, 1000), (0, 128, 255, 128)).save(buffer, 'PNG')
+    renditions = render_derivatives(buffer.getvalue())
+    sizes = {name: Image.open(io.BytesIO(data)).size for name, data in renditions.items()}
+    assert sizes['thumbnail'] == (400, 133)
+    assert sizes['web'] == (1600, 533)
+    # 3:1 is wider than Instagram allows, so it is center-cropped to 1.91:1
+    assert sizes['instagram'][0] == 1080
+    assert 1.85 < sizes['instagram'][0] / sizes['instagram'][1] < 1.92
+    assert rendition_key('h2o/media/abc.png', 'thumbnail') == 'h2o/media/abc.thumbnail.jpg'
@@ -0,0 +1,35 @@
+import pytest
+from httpx import AsyncClient, ASGITransport
+from app.main import app
+from app.core.metrics import Histogram
+from app.db.session import engine
+
+@pytest.mark.asyncio
+async def test_metrics_endpoint_reports_route_latency():
+    # One checkout of our own, so the pool wait histogram has a sample whatever ran before
+    async with engine.connect():
+        pass
+    await engine.dispose()  # Don't keep a connection bound to this test's event loop
+    async with AsyncClient(transport=ASGITransport(app=app), base_url='http://test') as ac:
+        login = await ac.post('/api/v1/login', json={'username': 'admin', 'password': 'adminpassword'})
+        token = login.json()['access_token']
+        await ac.get('/api/v1/builders', headers={"Authorization": f"Bearer {token}"})
+        res = await ac.get('/metrics')
+        assert res.status_code == 200
+        assert res.headers['content-type'].startswith('text/plain')
+        body = res.text
+        # Labelled by route template, not raw path
+        assert 'http_request_duration_seconds_count{method="GET",route="/api/v1/builders",status="200"}' in body
+        assert 'db_pool_connections{state="size"}' in body
+        assert 'db_pool_checkout_wait_seconds_count' in body
+
+def test_histogram_buckets_are_cumulative():
+    h = Histogram('test_seconds', 'test', ('kind',), buckets=(0.1, 1.0))
+    h.observe(0.05, kind='a')
+    h.observe(0.5, kind='a')
+    h.observe(5, kind='a')
+    lines = h.samples()
+    assert 'test_seconds_bucket{kind="a",le="0.1"} 1' in lines
+    assert 'test_seconds_bucket{kind="a",le="1"} 2' in lines
+    assert 'test_seconds_bucket{kind="a",le="+Inf"} 3' in lines
+    assert 'test_seconds_count{kind="a"} 3' in lines
@@ -0,0 +1,100 @@
+import pytest
+from httpx import AsyncClient, ASGITransport
+from app.main import app
+# Database setup and admin user are now in conftest.py
+
+@pytest.mark.asyncio
+async def test_unread_count_follows_create_and_read():
+    # Served from notification_unread_counts (triggers)
+    from sqlalchemy import select
+    from app import models
+    from app.core.notifications import create_notification
+    from app.db.session import AsyncSessionLocal
+
+    async with AsyncSessionLocal() as db:
+        admin = (await db.execute(select(models.User).where(models.User.username == 'admin'))).scalar_one()
+        first = await create_notification(db, 'h2o', 'reminder', 'Call back', 'Call the customer back', user_id=admin.id)
+        await create_notification(db, 'h2o', 'overdue', 'Job overdue', 'Lot 4 is overdue', user_id=admin.id)
+
+    async with AsyncClient(transport=ASGITransport(app=app), base_url='http://test') as ac:
+        login = await ac.post('/api/v1/login', json={'username': 'admin', 'password': 'adminpassword'})
+        headers = {"Authorization": f"Bearer {login.json()['access_token']}"}
+
+        res = await ac.get('/api/v1/notifications/unread-count', headers=headers)
+        assert res.json() == {'count': 2}
+
+        res = await ac.post(f'/api/v1/notifications/{first.id}/read', headers=headers)
+        assert res.status_code == 200
+        res = await ac.get('/api/v1/notifications/unread-count', headers=headers)
+        assert res.json() == {'count': 1}
+
+        # Read again: still 200, counted once
+        res = await ac.post(f'/api/v1/notifications/{first.id}/read', headers=headers)
+        assert res.status_code == 200
+        assert res.json()['read'] is True
+
+        res = await ac.post('/api/v1/notifications/read-all', headers=headers)
+        assert res.json() == {'marked_read': 1}
+        res = await ac.get('/api/v1/notifications/unread-count', headers=headers)
+        assert res.json() == {'count': 0}
+
+
+def test_hub_fans_out_events_to_their_recipients():
+    from app.core.notification_stream import NotificationHub
+
+    hub = NotificationHub()
+    mine = hub.subscribe('u1', 'h2o')
+    other = hub.subscribe('u2', 'all_county')
+
+    hub.dispatch({'event': 'created', 'id': 'n1', 'tenant_id': 'h2o', 'user_id': 'u1'})
+    hub.dispatch({'event': 'created', 'id': 'n2', 'tenant_id': 'h2o', 'user_id': None})
+    hub.dispatch({'event': 'read', 'tenant_id': 'h2o', 'user_id': 'u1', 'count': 2})
+    hub.dispatch({'event': 'created', 'id': 'n3', 'tenant_id': 'h2o', 'user_id': 'u3'})
+
+    # Personal events and the tenant's broadcasts, without a count that could be stale
+    assert [mine.queue.get_nowait() for _ in range(3)] == [
+        {'event': 'created', 'id': 'n1', 'tenant_id': 'h2o', 'user_id': 'u1'},
+        {'event': 'created', 'id': 'n2', 'tenant_id': 'h2o', 'user_id': None},
+        {'event': 'read', 'tenant_id': 'h2o', 'user_id': 'u1', 'count': 2},
+    ]
+    assert mine.queue.empty() and other.queue.empty()
+
+
+@pytest.mark.asyncio
+async def test_repeated_alerts_fold_into_one_digest_row_and_purge():
+    from datetime import datetime, timedelta, timezone
+    from uuid import uuid4
+    from sqlalchemy import select, update
+    from app import models
+    from app.core.notifications import create_notification, purge_read_notifications
+    from app.core.notification_stream import count_unread
+    from app.db.session import AsyncSessionLocal
+
+    job_id = str(uuid4())
+    async with AsyncSessionLocal() as db:
+        admin = (await db.execute(select(models.User).where(models.User.username == 'admin'))).scalar_one()
+        first = await create_notification(db, 'h2o', 'overdue', 'Job Overdue', '1 day(s) overdue', 'job', job_id, admin.id)
+        again = await create_notification(db, 'h2o', 'overdue', 'Job Overdue', '2 day(s) overdue', 'job', job_id, admin.id)
+        assert again.id == first.id
+        assert again.occurrences == 2 and again.message == '2 day(s) overdue'
+        assert await count_unread(db, str(admin.id), 'h2o') == (1, 0)
+
+        # Once read, the next occurrence reopens the same row
+        await db.execute(update(models.Notification).values(read=True))
+        await db.commit()
+        assert await count_unread(db, str(admin.id), 'h2o') == (0, 0)
+        again = await create_notification(db, 'h2o', 'overdue', 'Job Overdue', '3 day(s) overdue', 'job', job_id, admin.id)
+        assert again.id == first.id and not again.read and again.occurrences == 3
+        assert await count_unread(db, str(admin.id), 'h2o') == (1, 0)
+
+        # Only read notifications past the retention window are purged
+        await create_notification(db, 'h2o', 'reminder', 'Daily Summary', 'Nothing overdue', user_id=admin.id)
+        await db.execute(
+            update(models.Notification)
+            .where(models.Notification.type == 'reminder')
+            .values(read=True, created_at=datetime.now(timezone.utc) - timedelta(days=45))
+        )
+        await db.commit()
+        assert await purge_read_notifications(db, 30) == 1
+        remaining = (await db.execute(select(models.Notification.id))).scalars().all()
+        assert remaining == [first.id]
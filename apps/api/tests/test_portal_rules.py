@@ -0,0 +1,107 @@
+import uuid
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+import pytest
+from httpx import AsyncClient, ASGITransport
+
+from app import schemas
+from app.main import app
+from app.core.portal_rules import PortalQuery, PortalRuleIndex
+
+NOW = datetime(2026, 1, 1, tzinfo=timezone.utc)
+
+
+def account(tenant_id='h2o', is_active=True, age=0):
+    return schemas.PortalAccountOut(
+        id=uuid.uuid4(), portal_definition_id=uuid.uuid4(), tenant_id=tenant_id, login_identifier='ops@example.com',
+        is_active=is_active, created_at=NOW - timedelta(days=age), updated_at=NOW,
+    )
+
+
+def rule(account, priority=100, **fields):
+    values = dict(applies_to='job', tenant_id=None, builder_id=None, city=None, county=None, phase=None,
+                  permit_required=None, is_active=True, created_at=NOW)
+    values.update(fields)
+    return SimpleNamespace(portal_account_id=account.id, priority=priority, **values)
+
+
+def test_suggestions_follow_builder_links_then_rule_priority():
+    builder_id = uuid.uuid4()
+    linked, city, county, fallback, other_tenant, inactive = (
+        account(age=5), account(age=4), account(age=3), account(age=2), account('all_county'), account(is_active=False)
+    )
+    index = PortalRuleIndex(
+        [linked, city, county, fallback, other_tenant, inactive],
+        [(builder_id, linked.id)],
+        [
+            rule(fallback, priority=200),
+            rule(county, priority=50, county='Clark'),
+            rule(city, priority=10, city='Vancouver', permit_required=True),
+            rule(linked, priority=1),
+            rule(other_tenant, priority=1),
+            rule(inactive, priority=1),
+            rule(fallback, priority=1, applies_to='service_call'),
+        ],
+    )
+
+    suggested = index.suggest(PortalQuery('job', 'h2o', builder_id=builder_id, city='Vancouver', county='Clark', permit_required=True))
+    assert [a.id for a in suggested] == [linked.id, city.id, county.id, fallback.id]
+
+    # Rule fields must match when the query names them, and anything goes when it doesn't
+    suggested = index.suggest(PortalQuery('job', 'h2o', city='Portland', permit_required=False))
+    assert [a.id for a in suggested] == [linked.id, county.id, fallback.id]
+    assert [a.id for a in index.suggest(PortalQuery('job', 'h2o', city=''))] == [linked.id, city.id, county.id, fallback.id]
+
+    # Exact (stored records): a field the record doesn't state only matches rules that leave it open
+    assert [a.id for a in index.suggest(PortalQuery('job', 'h2o', city='Vancouver', exact=True))] == [linked.id, fallback.id]
+    suggested = index.suggest(PortalQuery('job', 'h2o', city='Vancouver', county='Clark', permit_required=True, exact=True))
+    assert [a.id for a in suggested] == [linked.id, city.id, county.id, fallback.id]
+
+    assert [[a.id for a in s] for s in index.suggest_many([
+        PortalQuery('service_call', 'h2o'),
+        PortalQuery('job', 'all_county'),
+    ])] == [[fallback.id], [other_tenant.id]]
+
+
+@pytest.mark.asyncio
+async def test_batch_suggestions_for_jobs():
+    async with AsyncClient(transport=ASGITransport(app=app), base_url='http://test') as ac:
+        login = await ac.post('/api/v1/login', json={'username': 'admin', 'password': 'adminpassword'})
+        headers = {"Authorization": f"Bearer {login.json()['access_token']}"}
+
+        builder = (await ac.post('/api/v1/builders', json={'name': 'B1'}, headers=headers)).json()
+        definition = (await ac.post('/api/v1/directory/portal-definitions', headers=headers, json={
+            'name': 'Vancouver Permits', 'category': 'permit', 'base_url': 'https://permits.example.com'
+        })).json()
+        portal = (await ac.post('/api/v1/directory/portal-accounts', headers=headers, json={
+            'portal_definition_id': definition['id'], 'tenant_id': 'all_county', 'login_identifier': 'ops@example.com'
+        })).json()
+        res = await ac.post('/api/v1/directory/portal-rules', headers=headers, json={
+            'applies_to': 'job', 'city': 'Vancouver', 'phase': 'rough', 'portal_account_id': portal['id']
+        })
+        assert res.status_code == 200
+        # Jobs record no county, so a county-scoped rule must not match every job
+        res = await ac.post('/api/v1/directory/portal-rules', headers=headers, json={
+            'applies_to': 'job', 'county': 'Clark', 'portal_account_id': portal['id']
+        })
+        assert res.status_code == 200
+
+        job_ids = []
+        for lot, city in (('1', 'Vancouver'), ('2', 'Camas')):
+            res = await ac.post('/api/v1/jobs', headers=headers, json={
+                'tenant_id': 'all_county', 'builder_id': builder['id'], 'community': 'C', 'lot_number': lot,
+                'phase': 'Rough', 'status': 'Pending', 'address_line1': '1 Road St', 'city': city, 'zip': '98000'
+            })
+            job_ids.append(res.json()['id'])
+
+        res = await ac.post('/api/v1/directory/suggested-portals/batch', headers=headers, json={
+            'applies_to': 'job', 'ids': [job_ids[1], job_ids[0], str(uuid.uuid4())]
+        })
+        assert res.status_code == 200
+        body = res.json()
+        # Request order, unknown IDs left out
+        assert [item['id'] for item in body] == [job_ids[1], job_ids[0]]
+        assert body[0]['portals'] == []
+        assert [p['id'] for p in body[1]['portals']] == [portal['id']]
+        assert body[1]['portals'][0]['portal_definition']['name'] == 'Vancouver Permits'
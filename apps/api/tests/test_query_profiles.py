@@ -0,0 +1,31 @@
+import pytest
+from httpx import AsyncClient, ASGITransport
+from app.main import app
+# Database setup and admin user are now in conftest.py
+
+@pytest.mark.asyncio
+async def test_job_list_profiles():
+    async with AsyncClient(transport=ASGITransport(app=app), base_url='http://test') as ac:
+        login = await ac.post('/api/v1/login', json={'username': 'admin', 'password': 'adminpassword'})
+        headers = {"Authorization": f"Bearer {login.json()['access_token']}"}
+        builder = (await ac.post('/api/v1/builders', json={'name': 'B1'}, headers=headers)).json()
+        res = await ac.post('/api/v1/jobs', headers=headers, json={
+            'tenant_id': 'all_county', 'builder_id': builder['id'], 'community': 'C', 'lot_number': '1',
+            'phase': 'rough', 'status': 'Pending', 'address_line1': '1 Road St', 'city': 'City', 'zip': '98000',
+            'notes': 'Gate code 1234', 'warranty_notes': 'One year'
+        })
+        assert res.status_code == 200
+
+        # Slim rows by default: builder name, no notes
+        res = await ac.get('/api/v1/jobs?tenant_id=all_county', headers=headers)
+        assert res.status_code == 200
+        [job] = res.json()
+        assert job['builder'] == {'id': builder['id'], 'name': 'B1'}
+        assert job['lot_number'] == '1'
+        assert 'notes' not in job and 'warranty_notes' not in job
+
+        res = await ac.get('/api/v1/jobs?tenant_id=all_county&profile=export', headers=headers)
+        assert res.json()[0]['notes'] == 'Gate code 1234'
+
+        res = await ac.get('/api/v1/jobs?tenant_id=all_county&profile=everything', headers=headers)
+        assert res.status_code == 400
@@ -0,0 +1,28 @@
+import pytest
+from httpx import AsyncClient, ASGITransport
+from app.main import app
+from app.core.query_stats import track_queries
+from app.db.session import AsyncSessionLocal
+from sqlalchemy import text
+
+@pytest.mark.asyncio
+async def test_server_timing_reports_query_count():
+    async with AsyncClient(transport=ASGITransport(app=app), base_url='http://test') as ac:
+        login = await ac.post('/api/v1/login', json={'username': 'admin', 'password': 'adminpassword'})
+        token = login.json()['access_token']
+        res = await ac.get('/api/v1/builders', headers={"Authorization": f"Bearer {token}"})
+        assert res.status_code == 200
+        timing = res.headers['server-timing']
+        assert timing.startswith('db;dur=')
+        assert 'queries"' in timing
+        assert '"0 queries"' not in timing
+
+@pytest.mark.asyncio
+async def test_track_queries_counts_statements():
+    with track_queries() as stats:
+        async with AsyncSessionLocal() as db:
+            await db.execute(text("SELECT 1"))
+            await db.execute(text("SELECT pg_sleep(0.01)"))
+    assert stats.count == 2
+    assert stats.slowest_statement == "SELECT pg_sleep(0.01)"
+    assert stats.total_ms >= stats.slowest_ms >= 10
@@ -0,0 +1,73 @@
+import pytest
+from fastapi import FastAPI, Request
+from httpx import AsyncClient, ASGITransport
+
+from app.core.auth import create_access_token
+from app.core.rate_limit import Limiter, MemoryBackend, RateLimitMiddleware, limit_class, parse_rate, rate_limit_key
+
+
+def limited_app(limits):
+    app = FastAPI()
+
+    @app.get('/api/v1/jobs')
+    async def jobs():
+        return []
+
+    @app.post('/api/v1/login')
+    async def login():
+        return {}
+
+    @app.get('/health')
+    async def health():
+        return {'status': 'ok'}
+
+    app.add_middleware(RateLimitMiddleware, prefix='/api/v1', limiter=Limiter(MemoryBackend(), limits))
+    return app
+
+
+def test_limit_classes():
+    assert parse_rate('200/minute').period == 60
+    assert limit_class('POST', '/login') == 'auth'
+    assert limit_class('GET', '/marketing/calendar') == 'marketing'
+    assert limit_class('GET', '/jobs') == 'read'
+    assert limit_class('PATCH', '/jobs/1') == 'write'
+
+
+def test_tenantless_users_are_keyed_per_user():
+    token = create_access_token({'username': 'admin', 'user_id': 'u0', 'tenant_id': None})
+
+    def request(query: bytes) -> Request:
+        return Request({
+            'type': 'http', 'method': 'GET', 'path': '/jobs', 'query_string': query,
+            'headers': [(b'authorization', f'Bearer {token}'.encode())], 'client': ('10.0.0.1', 1234),
+        })
+
+    # The tenant a client asks for must not hand it a fresh budget
+    assert rate_limit_key(request(b'tenant_id=h2o'), 'read') == rate_limit_key(request(b'tenant_id=all_county'), 'read')
+    assert rate_limit_key(request(b''), 'read') == 'read:t:-:u:u0'
+
+
+@pytest.mark.asyncio
+async def test_limits_are_per_user_and_class():
+    app = limited_app({'auth': '2/minute', 'read': '3/minute', 'write': '3/minute', 'marketing': '3/minute'})
+    alice = {'Authorization': f"Bearer {create_access_token({'username': 'alice', 'user_id': 'u1', 'tenant_id': 'h2o'})}"}
+    bob = {'Authorization': f"Bearer {create_access_token({'username': 'bob', 'user_id': 'u2', 'tenant_id': 'h2o'})}"}
+
+    async with AsyncClient(transport=ASGITransport(app=app), base_url='http://test') as ac:
+        statuses = [(await ac.get('/api/v1/jobs', headers=alice)).status_code for _ in range(4)]
+        assert statuses == [200, 200, 200, 429]
+
+        # Same address, different user: own budget
+        res = await ac.get('/api/v1/jobs', headers=bob)
+        assert res.status_code == 200
+        assert res.headers['x-ratelimit-limit'] == '3'
+        assert res.headers['x-ratelimit-remaining'] == '2'
+
+        # Login is limited per address, whoever claims to be calling
+        statuses = [(await ac.post('/api/v1/login', headers=alice)).status_code for _ in range(3)]
+        assert statuses == [200, 200, 429]
+        res = await ac.post('/api/v1/login')
+        assert res.status_code == 429 and 'Retry-After' in res.headers
+
+        # Outside the API prefix nothing is counted
+        assert all([(await ac.get('/health')).status_code == 200 for _ in range(5)])
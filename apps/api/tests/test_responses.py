@@ -0,0 +1,102 @@
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+from uuid import uuid4
+
+import pytest
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from httpx import AsyncClient, ASGITransport
+from sqlalchemy import select
+from app import models
+from app.core.responses import FastJSONResponse
+from app.db.session import AsyncSessionLocal
+from app.main import app
+
+
+def stdlib_body(content) -> bytes:
+    """What a route returning `content` rendered before FastJSONResponse"""
+    return JSONResponse(jsonable_encoder(content)).body
+
+
+def test_fast_json_matches_fastapi_encoding():
+    content = [{
+        'id': uuid4(),
+        'at': datetime(2026, 3, 1, 9, 30, 15, 120, tzinfo=timezone.utc),
+        'amounts': [Decimal('12'), Decimal('12.50'), Decimal('0.1'), Decimal('1E+2')],
+        'name': 'Peña Plumbing',
+        'missing': None,
+    }]
+    assert FastJSONResponse(content).body == stdlib_body(content)
+
+
+@pytest.mark.asyncio
+async def test_overdue_lists_match_previous_output():
+    now = datetime.now(timezone.utc)
+    async with AsyncSessionLocal() as db:
+        builder = models.Builder(name='Oakwood Homes')
+        db.add(builder)
+        await db.flush()
+        for i, days in enumerate((3, 10, 1)):
+            scheduled_end = now - timedelta(days=days, hours=5, microseconds=i)
+            db.add(models.Job(
+                tenant_id='all_county', builder_id=builder.id, community='Riverside', lot_number=str(i),
+                phase='rough', status='Scheduled', address_line1=f'{i} Maple Ave', city='City', zip='98000',
+                scheduled_end=scheduled_end, assigned_to='tech1' if i else None
+            ))
+            db.add(models.ServiceCall(
+                tenant_id='h2o', customer_name=f'Customer Peña {i}', address_line1=f'{i} Birch St', city='City',
+                zip='98000', issue_description='Leak', status='Scheduled', scheduled_end=scheduled_end,
+                assigned_to='tech1' if i else None
+            ))
+        db.add(models.ServiceCall(
+            tenant_id='h2o', customer_name='Done', address_line1='1 Elm St', city='City', zip='98000',
+            issue_description='Leak', status='Completed', scheduled_end=now - timedelta(days=2)
+        ))
+        await db.commit()
+
+        jobs = (await db.execute(select(models.Job))).scalars().all()
+        calls = (await db.execute(select(models.ServiceCall))).scalars().all()
+
+    # The dicts the routes built from ORM objects before they returned raw row values
+    previous_jobs = sorted((
+        {
+            'id': str(job.id),
+            'community': job.community,
+            'lot_number': job.lot_number,
+            'phase': job.phase,
+            'status': job.status,
+            'scheduled_end': job.scheduled_end.isoformat() if job.scheduled_end else None,
+            'assigned_to': job.assigned_to,
+            'days_overdue': (now - job.scheduled_end).days,
+            'address_line1': job.address_line1,
+            'city': job.city,
+        }
+        for job in jobs
+    ), key=lambda x: x['days_overdue'], reverse=True)
+    previous_calls = sorted((
+        {
+            'id': str(call.id),
+            'customer_name': call.customer_name,
+            'issue_description': call.issue_description,
+            'status': call.status,
+            'priority': call.priority,
+            'scheduled_end': call.scheduled_end.isoformat() if call.scheduled_end else None,
+            'assigned_to': call.assigned_to,
+            'days_overdue': (now - call.scheduled_end).days,
+            'address_line1': call.address_line1,
+            'city': call.city,
+        }
+        for call in calls if call.status != 'Completed'
+    ), key=lambda x: x['days_overdue'], reverse=True)
+
+    async with AsyncClient(transport=ASGITransport(app=app), base_url='http://test') as ac:
+        login = await ac.post('/api/v1/login', json={'username': 'admin', 'password': 'adminpassword'})
+        headers = {"Authorization": f"Bearer {login.json()['access_token']}"}
+
+        res = await ac.get('/api/v1/jobs/overdue', headers=headers)
+        assert res.status_code == 200
+        assert res.content == stdlib_body(previous_jobs)
+
+        res = await ac.get('/api/v1/service-calls/overdue', headers=headers)
+        assert res.status_code == 200
+        assert res.content == stdlib_body(previous_calls)
@@ -0,0 +1,73 @@
+from uuid import UUID
+
+import pytest
+from httpx import AsyncClient, ASGITransport
+from app import models
+from app.db.session import AsyncSessionLocal
+from app.main import app
+# Database setup and admin user are now in conftest.py
+
+@pytest.mark.asyncio
+async def test_search_ranks_hits_across_entity_types():
+    async with AsyncClient(transport=ASGITransport(app=app), base_url='http://test') as ac:
+        login = await ac.post('/api/v1/login', json={'username': 'admin', 'password': 'adminpassword'})
+        headers = {"Authorization": f"Bearer {login.json()['access_token']}"}
+
+        builder = (await ac.post('/api/v1/builders', json={'name': 'Oakwood Homes'}, headers=headers)).json()
+
+        # Seeded through the ORM: this test is about search, not the create endpoints
+        async with AsyncSessionLocal() as db:
+            db.add(models.Job(
+                tenant_id='all_county',
+                builder_id=UUID(builder['id']),
+                community='Riverside',
+                lot_number='14',
+                phase='rough',
+                status='Pending',
+                address_line1='14 Maple Ave',
+                city='City',
+                zip='98000'
+            ))
+            db.add(models.ServiceCall(
+                tenant_id='h2o',
+                customer_name='Dana Whitfield',
+                phone='555-0142',
+                address_line1='9 Birch St',
+                city='City',
+                zip='98000',
+                issue_description='Leaking water heater',
+                status='New'
+            ))
+            await db.commit()
+
+        res = await ac.get('/api/v1/search', params={'q': 'oakwood'}, headers=headers)
+        assert res.status_code == 200
+        hits = res.json()
+        assert [h['entity_type'] for h in hits] == ['builder']
+        assert hits[0]['title'] == 'Oakwood Homes'
+
+        # Community is part of the job's search document
+        res = await ac.get('/api/v1/search', params={'q': 'riversi', 'tenant_id': 'all_county'}, headers=headers)
+        hits = res.json()
+        assert [(h['entity_type'], h['title']) for h in hits] == [('job', '14 Maple Ave')]
+
+        # Same document backs the list filter
+        res = await ac.get('/api/v1/jobs', params={'search': 'riverside'}, headers=headers)
+        assert len(res.json()) == 1
+
+        res = await ac.get('/api/v1/search', params={'q': 'maple', 'tenant_id': 'h2o'}, headers=headers)
+        assert res.json() == []
+
+        # Service call documents include the phone number
+        res = await ac.get('/api/v1/search', params={'q': '0142'}, headers=headers)
+        hits = res.json()
+        assert [(h['entity_type'], h['title']) for h in hits] == [('service_call', 'Dana Whitfield')]
+
+        res = await ac.get('/api/v1/search', params={'q': 'oakwood', 'types': ['job']}, headers=headers)
+        assert res.json() == []
+
+        res = await ac.get('/api/v1/search', params={'q': 'oak', 'types': ['invoice']}, headers=headers)
+        assert res.status_code == 400
+
+        res = await ac.get('/api/v1/search', params={'q': 'oa'}, headers=headers)
+        assert res.status_code == 422
@@ -20,7 +20,7 @@ interface PostInstance {
     id: string
     title: string
     base_caption: string
-    media_assets?: Array<{ file_url: string; file_type: string }>
+    media_assets?: Array<{ file_url: string; file_type: string; renditions?: Record<string, string> }>
   }
   channel_account?: {
     id: string
@@ -13,20 +13,37 @@ export function NotificationCenter() {
   const [loading, setLoading] = useState(false)
   const dropdownRef = useRef<HTMLDivElement>(null)
 
+  const isOpenRef = useRef(isOpen)
+  isOpenRef.current = isOpen
+
   useEffect(() => {
     loadNotifications()
     loadUnreadCount()
-    
-    // Poll for updates every 30 seconds
-    const interval = setInterval(() => {
+
+    // Pushed updates; the count is re-read on each (a primary key lookup server-side)
+    const closeStream = notificationApi.subscribe({
+      onUnread: setUnreadCount,
+      onEvent: (event) => {
+        loadUnreadCount()
+        if (event.event === 'created' && isOpenRef.current) {
+          loadNotifications()
+        }
+      }
+    })
+
+    // No EventSource: poll for updates every 30 seconds
+    const interval = closeStream ? null : setInterval(() => {
       loadUnreadCount()
-      if (isOpen) {
+      if (isOpenRef.current) {
         loadNotifications()
       }
     }, 30000)
 
-    return () => clearInterval(interval)
-  }, [isOpen])
+    return () => {
+      closeStream?.()
+      if (interval) clearInterval(interval)
+    }
+  }, [])
 
   // Close dropdown when clicking outside
   useEffect(() => {
@@ -272,6 +289,7 @@ export function NotificationCenter() {
                     color: 'var(--color-text-secondary)'
                   }}>
                     {new Date(notification.created_at).toLocaleString()}
+                    {(notification.occurrences ?? 1) > 1 && ` · ${notification.occurrences} times`}
                   </div>
                 </div>
               ))
@@ -1,7 +1,7 @@
 'use client'
 
 import React, { useState, useCallback, useRef } from 'react'
-import { marketingApi, MediaAsset } from '../../lib/api/marketing'
+import { marketingApi, MediaAsset, getMediaUrl } from '../../lib/api/marketing'
 
 interface PhotoUploadProps {
   tenantId: string
@@ -58,7 +58,7 @@ export function PhotoUpload({
       // Convert existing assets to FileWithPreview format (read-only)
       const existing = existingAssets.map(asset => ({
         file: new File([], asset.file_name),
-        preview: asset.file_url,
+        preview: getMediaUrl(asset),
         uploadedAsset: asset
       }))
       setFiles(existing)
@@ -163,12 +163,15 @@ export function PhotoUpload({
             }
           )
 
+          // Thumbnails are rendered in the background; until then keep the local blob
+          // preview rather than downloading the full-size original
+          const thumbnailReady = Boolean(asset.renditions?.thumbnail)
           setFiles(prev => prev.map(f => 
             f === fileWithPreview 
               ? { 
                   ...f, 
                   uploadedAsset: asset,
-                  preview: asset.file_url, // Use the uploaded URL
+                  preview: thumbnailReady ? getMediaUrl(asset) : f.preview,
                   uploadProgress: 100,
                   intentTags: asset.intent_tags || fileWithPreview.intentTags || []
                 }
@@ -178,7 +181,7 @@ export function PhotoUpload({
           uploadedAssets.push(asset)
 
           // Revoke old preview URL
-          if (fileWithPreview.preview.startsWith('blob:')) {
+          if (thumbnailReady && fileWithPreview.preview.startsWith('blob:')) {
             URL.revokeObjectURL(fileWithPreview.preview)
           }
         } catch (error) {
@@ -273,10 +276,11 @@ export function PhotoUpload({
               className="relative group bg-[var(--color-card)] border border-[var(--color-border)] rounded-lg overflow-hidden"
             >
               {/* Image/Video Preview */}
-              {fileWithPreview.file.type.startsWith('image/') ? (
+              {fileWithPreview.file.type.startsWith('image/') || fileWithPreview.uploadedAsset?.file_type === 'image' ? (
                 <img
                   src={fileWithPreview.preview}
                   alt={fileWithPreview.file.name}
+                  loading="lazy"
                   className="w-full h-32 object-cover"
                 />
               ) : (
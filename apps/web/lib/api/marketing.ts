@@ -1,3 +1,4 @@
+import axios from 'axios'
 import { apiGet, apiPost, apiPatch, apiDelete, apiClient } from './client'
 import { API_BASE_URL } from '../config'
 import { handleApiError } from '../error-handler'
@@ -38,9 +39,30 @@ export interface MediaAsset {
   file_size?: number
   mime_type?: string
   intent_tags?: string[]
+  renditions?: Partial<Record<MediaRendition, string>>
+  derivatives_status?: 'pending' | 'ready' | 'failed' | 'skipped'
   created_at: string
 }
 
+export type MediaRendition = 'thumbnail' | 'web' | 'instagram' | 'facebook'
+
+/** URL of a rendition (thumbnail by default), falling back to the original upload */
+export function getMediaUrl(
+  asset: Pick<MediaAsset, 'file_url' | 'renditions'>,
+  rendition: MediaRendition = 'thumbnail'
+): string {
+  return asset.renditions?.[rendition] || asset.file_url
+}
+
+export interface UploadSlot {
+  upload_url: string
+  method: 'PUT'
+  headers: Record<string, string>
+  object_key: string
+  upload_token: string
+  expires_in: number
+}
+
 export interface PostInstance {
   id: string
   tenant_id: string
@@ -291,6 +313,40 @@ export const marketingApi = {
     }
   },
 
+  // Direct-to-bucket upload: get a presigned slot, PUT the file to S3/R2, then confirm
+  uploadMediaDirect: async (
+    file: File,
+    tenantId: string,
+    contentItemId?: string,
+    intentTags?: string[],
+    onProgress?: (progress: number) => void
+  ): Promise<MediaAsset> => {
+    try {
+      const slot = await apiPost<UploadSlot>('/marketing/media/upload-url', {
+        tenant_id: tenantId,
+        file_name: file.name,
+        mime_type: file.type,
+        file_size: file.size,
+      })
+      await axios.put(slot.upload_url, file, {
+        headers: slot.headers,
+        onUploadProgress: (progressEvent) => {
+          if (onProgress && progressEvent.total) {
+            onProgress(Math.round((progressEvent.loaded * 100) / progressEvent.total))
+          }
+        }
+      })
+      return await apiPost<MediaAsset>('/marketing/media/confirm', {
+        upload_token: slot.upload_token,
+        content_item_id: contentItemId,
+        intent_tags: intentTags,
+      })
+    } catch (error) {
+      handleApiError(error, 'Upload media')
+      throw error
+    }
+  },
+
   // Calendar
   getCalendar: async (
     tenantId: string,
@@ -655,6 +711,15 @@ export interface ContentMixSummary {
   local_relevance: { actual: number; target: number; percentage: number }
   overall_health: 'good' | 'warning' | 'critical'
   warnings: string[]
+  history: ContentMixWeek[]
+}
+
+export interface ContentMixWeek {
+  week_start_date: string
+  educational_count: number
+  authority_count: number
+  promo_count: number
+  local_relevance_count: number
 }
 
 export interface SeasonalEvent {
@@ -12,12 +12,27 @@ export interface Notification {
   entity_id?: string
   read: boolean
   created_at: string
+  occurrences?: number
+  first_occurred_at?: string
 }
 
 export interface NotificationCount {
   count: number
 }
 
+// Pushed by /notifications/stream; `unread` is null while the server cannot vouch for the count
+export interface NotificationEvent {
+  event: 'created' | 'read'
+  id?: string
+  tenant_id: string
+  user_id?: string | null
+  type?: string
+  title?: string
+  entity_type?: string
+  entity_id?: string
+  count?: number
+}
+
 export const notificationApi = {
   list: async (read?: boolean, limit: number = 50, offset: number = 0): Promise<Notification[]> => {
     try {
@@ -68,6 +83,26 @@ export const notificationApi = {
     return res.data
   },
 
+  // Server-sent events (authenticated by the access_token cookie). Returns a function that closes
+  // the stream, or null when the browser has no EventSource (callers fall back to polling).
+  subscribe: (handlers: {
+    onUnread: (count: number) => void
+    onEvent?: (event: NotificationEvent) => void
+  }): (() => void) | null => {
+    if (typeof EventSource === 'undefined') return null
+    const source = new EventSource(`${API_BASE_URL}/notifications/stream`, { withCredentials: true })
+    source.addEventListener('unread', (e) => {
+      handlers.onUnread(JSON.parse((e as MessageEvent).data).count)
+    })
+    const onChange = (e: Event) => {
+      const data: NotificationEvent = JSON.parse((e as MessageEvent).data)
+      handlers.onEvent?.(data)
+    }
+    source.addEventListener('notification', onChange)
+    source.addEventListener('read', onChange)
+    return () => source.close()
+  },
+
   markAllRead: async (): Promise<{ marked_read: number }> => {
     const token = localStorage.getItem('token')
     const headers = token ? { 'Authorization': `Bearer ${token}` } : {}